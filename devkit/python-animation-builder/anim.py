@@ -0,0 +1,140 @@
+"""
+Builds the animation files played on the ESP32 by framework.components.animation_player.AnimationPlayer.
+
+    python anim.py build examples/nutrient_waves.py anims/nutrient.anim --pixels 200 --fps 30 --duration-ms 4200 --loop
+    python anim.py info anims/nutrient.anim
+
+A source is a Python file with a `render(t_ms, pixels)` function returning the frame at `t_ms`:
+a list of `pixels` (r, g, b) tuples. Identical consecutive frames are stored once, with a hold count.
+
+File layout (little endian), same as the player:
+
+    header  "MYAN", version (B), flags (B, bit 0: loop), pixels (H), frame_ms (H), records (I), reserved (H)
+    records hold (H: number of frame_ms periods the frame stays on), then pixels * 3 bytes, GRB
+"""
+import argparse
+import os
+import struct
+import sys
+
+MAGIC = b"MYAN"
+VERSION = 1
+HEADER = "<4sBBHHIH"
+HEADER_SIZE = struct.calcsize(HEADER)
+FLAG_LOOP = 1
+MAX_HOLD = 0xFFFF
+
+
+def pack_frame(frame, pixels):
+    """
+    (r, g, b) tuples -> GRB bytes, missing pixels off, values clamped to 0..255.
+    """
+    out = bytearray(pixels * 3)
+    for i, c in enumerate(frame[:pixels]):
+        r, g, b = (max(0, min(255, int(v))) for v in c[:3])
+        out[3 * i] = g
+        out[3 * i + 1] = r
+        out[3 * i + 2] = b
+    return bytes(out)
+
+
+def encode(frames, pixels, frame_ms, loop=False):
+    """
+    Frames (lists of (r, g, b)), one per `frame_ms` -> animation file bytes.
+    """
+    records = []
+    for frame in frames:
+        data = pack_frame(frame, pixels)
+        if records and records[-1][1] == data and records[-1][0] < MAX_HOLD:
+            records[-1][0] += 1
+        else:
+            records.append([1, data])
+
+    out = bytearray(struct.pack(HEADER, MAGIC, VERSION, FLAG_LOOP if loop else 0, pixels, frame_ms, len(records), 0))
+    for hold, data in records:
+        out += struct.pack("<H", hold)
+        out += data
+    return bytes(out)
+
+
+def decode(data):
+    """
+    Animation file bytes -> (header dict, [(hold, GRB bytes), ...]).
+    """
+    magic, version, flags, pixels, frame_ms, count, _ = struct.unpack_from(HEADER, data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a version %d animation" % VERSION)
+    size = 2 + pixels * 3
+    if len(data) != HEADER_SIZE + count * size:
+        raise ValueError("expected %d bytes, got %d" % (HEADER_SIZE + count * size, len(data)))
+    records = []
+    for k in range(count):
+        offset = HEADER_SIZE + k * size
+        hold, = struct.unpack_from("<H", data, offset)
+        records.append((hold, data[offset + 2:offset + size]))
+    header = {"pixels": pixels, "frame_ms": frame_ms, "loop": bool(flags & FLAG_LOOP), "records": count}
+    return header, records
+
+
+def load_source(path):
+    scope = {"__name__": "animation_source", "__file__": path}
+    with open(path, "r", encoding="utf-8") as f:
+        exec(compile(f.read(), path, "exec"), scope)
+    if "render" not in scope:
+        raise SystemExit("%s: no render(t_ms, pixels) function" % path)
+    return scope["render"]
+
+
+def build(args):
+    render = load_source(args.source)
+    frame_ms = max(1, round(1000 / args.fps))
+    count = max(1, args.duration_ms // frame_ms)
+    frames = (render(k * frame_ms, args.pixels) for k in range(count))
+    data = encode(frames, args.pixels, frame_ms, args.loop)
+
+    folder = os.path.dirname(args.out)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    header, records = decode(data)
+    print("%s: %d frames in %d records, %d bytes" % (args.out, count, header["records"], len(data)))
+
+
+def info(args):
+    with open(args.file, "rb") as f:
+        data = f.read()
+    header, records = decode(data)
+    frames = sum(hold for hold, _ in records)
+    print("pixels:   %d" % header["pixels"])
+    print("frame_ms: %d (%.1f fps)" % (header["frame_ms"], 1000 / header["frame_ms"]))
+    print("loop:     %s" % header["loop"])
+    print("frames:   %d in %d records" % (frames, header["records"]))
+    print("duration: %d ms" % (frames * header["frame_ms"]))
+    print("size:     %d bytes" % len(data))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="render a source into an animation file")
+    p.add_argument("source")
+    p.add_argument("out")
+    p.add_argument("--pixels", type=int, required=True)
+    p.add_argument("--fps", type=float, default=30)
+    p.add_argument("--duration-ms", type=int, default=5000)
+    p.add_argument("--loop", action="store_true")
+    p.set_defaults(func=build)
+
+    p = sub.add_parser("info", help="describe an animation file")
+    p.add_argument("file")
+    p.set_defaults(func=info)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""
+Shroom forest: a slow warm breathing glow, each LED slightly out of phase so the light drifts along the strip.
+4 s per breath: build 4000 ms with --loop.
+"""
+import math
+
+WARM = (255, 140, 30)
+BREATH_MS = 4000
+
+
+def render(t_ms, pixels):
+    frame = []
+    for i in range(pixels):
+        phase = 2 * math.pi * (t_ms / BREATH_MS - i / 120)
+        k = 0.15 + 0.85 * (0.5 + 0.5 * math.sin(phase)) ** 2
+        frame.append(tuple(int(c * k) for c in WARM))
+    return frame
@@ -0,0 +1,26 @@
+"""
+The nutrient flow of interaction 3 (src/nurtient_flow.py), pre-rendered:
+green packets of 20 LEDs every 35, moving at 50 LEDs/s, with soft edges.
+One period takes 700 ms: build 700 ms (or a multiple) with --loop for a seamless loop.
+"""
+COLOR = (0, 255, 0)
+WAVE_LEN = 20
+GAP_LEN = 15
+SPEED = 50.0
+PERIOD = WAVE_LEN + GAP_LEN
+
+
+def _k(j):
+    if j == 0 or j == WAVE_LEN - 1:
+        return 0.2
+    if j == 1 or j == WAVE_LEN - 2:
+        return 0.6
+    return 1.0
+
+
+PATTERN = [tuple(int(c * _k(j)) for c in COLOR) if j < WAVE_LEN else (0, 0, 0) for j in range(PERIOD)]
+
+
+def render(t_ms, pixels):
+    base = int(SPEED * t_ms / 1000) % PERIOD
+    return [PATTERN[(i - base) % PERIOD] for i in range(pixels)]
@@ -0,0 +1,225 @@
+"""
+Vectorized NumPy ports of the device detectors.
+
+Each kernel runs one recorded trace through P parameter combinations at once (arrays of shape (P,)
+or (P, C)) and returns the trigger events. The integer math is the device math, step by step:
+same Q12 coefficients, same Q6 states, same shifts and floor divisions, so a combination triggers
+here exactly where it triggers on the board.
+
+Coefficients and lookup tables are built in float32, like MicroPython on the ESP32.
+
+    - light_drop   : interaction-1/shrooms LightDropDetectorBank
+    - wind_turbine : interaction-1/wind-turbine WindTurbineController.on_mic_level
+"""
+from typing import Dict
+
+import numpy as np
+
+COEF_BITS = 12
+COEF_ONE = 1 << COEF_BITS
+VALUE_BITS = 6
+HALF = COEF_ONE >> 1
+
+LIGHT_DROP_DEFAULTS = {
+    "drop_trigger": 50,
+    "cooldown_ms": 1000,
+    "ema_alpha": 0.35,
+    "baseline_alpha": 0.02,
+    "min_drop_rate": 0.0,
+    "init_samples": 4,
+}
+
+WIND_TURBINE_DEFAULTS = {
+    "min_level": 20,
+    "peak_cap": 200,
+    "peak_min": 80,
+    "peak_margin": 1.08,
+    "peak_decay": 0.995,
+    "progress_up": 0.22,
+    "progress_down": 0.20,
+    "curve_gamma": 0.25,
+    # Updates per audio block the constants above are tuned for (16 ms block / 1 ms)
+    "block_steps": 16,
+}
+
+
+def coef(alpha) -> np.ndarray:
+    """
+    framework.utils.dsp.coef, in single precision.
+    """
+    a = np.asarray(alpha, dtype=np.float32)
+    return (a * np.float32(COEF_ONE) + np.float32(0.5)).astype(np.int64)
+
+
+def per_block(alpha, steps) -> np.ndarray:
+    """
+    framework.utils.dsp.per_block, in single precision.
+    """
+    one = np.float32(1)
+    return one - (one - np.asarray(alpha, dtype=np.float32)) ** np.asarray(steps, dtype=np.float32)
+
+
+def _params(params: Dict[str, np.ndarray], defaults: Dict[str, float]) -> Dict[str, np.ndarray]:
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    p = max((len(np.atleast_1d(v)) for v in params.values()), default=1)
+    out = {}
+    for key, default in defaults.items():
+        value = np.atleast_1d(np.asarray(params.get(key, default)))
+        out[key] = np.broadcast_to(value, (p,)).copy()
+    return out
+
+
+def light_drop(t: np.ndarray, v: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    t: (T,) device ms, v: (T, C) samples.
+    Returns the triggers as an (N, 3) array of (sample index, combination, channel).
+    """
+    p = _params(params, LIGHT_DROP_DEFAULTS)
+    P = len(p["drop_trigger"])
+    T, C = v.shape
+
+    trigger = p["drop_trigger"].astype(np.int64)[:, None]
+    release = (trigger * 2) // 5
+    cooldown_ms = p["cooldown_ms"].astype(np.int64)[:, None]
+    a_ema = coef(p["ema_alpha"])[:, None]
+    a_up = coef(p["baseline_alpha"])[:, None]
+    a_down = coef(p["baseline_alpha"].astype(np.float32) * np.float32(0.25))[:, None]
+    min_rate = (p["min_drop_rate"].astype(np.float32) * np.float32(1000)).astype(np.int64)[:, None]
+
+    shape = (P, C)
+    ema = np.broadcast_to(v[0] << VALUE_BITS, shape).copy()
+    base = ema.copy()
+    last = ema.copy()
+    cooldown = np.zeros(shape, dtype=np.int64)
+    warmup = np.broadcast_to(p["init_samples"].astype(np.int64)[:, None], shape).copy()
+    armed = np.ones(shape, dtype=bool)
+
+    events = []
+    for k in range(1, T):
+        dt = max(int(t[k] - t[k - 1]), 1)
+        xq = v[k] << VALUE_BITS
+
+        ema += ((xq - ema) * a_ema + HALF) >> COEF_BITS
+        base += ((ema - base) * np.where(ema > base, a_up, a_down) + HALF) >> COEF_BITS
+
+        d_ema = last - ema
+        last[...] = ema
+
+        np.subtract(cooldown, dt, out=cooldown, where=cooldown > 0)
+
+        active = warmup == 0
+        np.subtract(warmup, 1, out=warmup, where=~active)
+
+        drop = (base - ema) >> VALUE_BITS
+        eligible = active & (cooldown <= 0)
+
+        fire = eligible & armed & (drop >= trigger)
+        if (min_rate > 0).any():
+            fire &= (min_rate <= 0) | ((((d_ema >> VALUE_BITS) * 1000) // dt) >= min_rate)
+        rearm = eligible & ~armed & (drop <= release)
+
+        armed[fire] = False
+        armed[rearm] = True
+        if fire.any():
+            cooldown = np.where(fire, cooldown_ms, cooldown)
+            combo, channel = np.nonzero(fire)
+            events.append(np.stack([np.full_like(combo, k), combo, channel], axis=1))
+
+    if not events:
+        return np.zeros((0, 3), dtype=np.int64)
+    return np.concatenate(events)
+
+
+def gamma_lut(gamma, in_max=1024, out_max=1024, size=256) -> np.ndarray:
+    """
+    framework.utils.dsp.GammaLut tables for every gamma: (P, size).
+    """
+    g = np.asarray(gamma, dtype=np.float32)[:, None]
+    i = np.arange(size, dtype=np.float32)[None, :] / np.float32(size - 1)
+    return (np.float32(out_max) * i ** g + np.float32(0.5)).astype(np.int64)
+
+
+def wind_turbine(t: np.ndarray, level: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    t: (T,) device ms, level: (T,) mic levels as received by on_mic_level.
+    After a trigger the combination is reset, like an `01-reset` would.
+    Returns the triggers as an (N, 2) array of (sample index, combination).
+    """
+    ONE = 1024
+    MAX_LEVEL = 5
+    LUT_LAST = 255
+    full_on = int(0.80 * ONE)
+    hyst = int(0.05 * ONE)
+
+    p = _params(params, WIND_TURBINE_DEFAULTS)
+    P = len(p["min_level"])
+    rows = np.arange(P)
+
+    min_level = p["min_level"].astype(np.int64)
+    floor = p["peak_min"].astype(np.int64) << VALUE_BITS
+    cap = p["peak_cap"].astype(np.int64) << VALUE_BITS
+    steps = p["block_steps"]
+    decay = coef(np.asarray(p["peak_decay"], dtype=np.float32) ** np.asarray(steps, dtype=np.float32))
+    margin = coef(p["peak_margin"])
+    up = coef(per_block(p["progress_up"], steps))
+    down = coef(per_block(p["progress_down"], steps))
+    lut = gamma_lut(p["curve_gamma"], in_max=ONE, out_max=ONE)
+
+    peak = floor.copy()
+    ramp = np.zeros(P, dtype=np.int64)
+    current = np.zeros(P, dtype=np.int64)
+
+    events = []
+    for k in range(len(level)):
+        m = int(level[k])
+
+        # 1) Peak, only fed above min_level
+        xq = np.minimum(m << VALUE_BITS, cap)
+        new_peak = np.where(xq > peak, xq, (peak * decay) >> COEF_BITS)
+        peak = np.where(m > min_level, np.maximum(new_peak, floor), peak)
+
+        dyn_max = ((peak >> VALUE_BITS) * margin) >> COEF_BITS
+
+        # 2) Normalize (combinations with a collapsed span skip the sample)
+        span = dyn_max - min_level
+        live = span > 1
+        x = ((m - min_level) * ONE) // np.where(live, span, 1)
+        x = np.clip(x, 0, ONE)
+
+        # 3) Ease curve
+        idx = np.where(x >= ONE, LUT_LAST, (x * LUT_LAST) // ONE)
+        eased = np.where(x <= 0, lut[:, 0], lut[rows, idx])
+
+        # 4) Ramp
+        xq = eased << VALUE_BITS
+        a = np.where(xq > ramp, up, down)
+        ramp = np.where(live, ramp + (((xq - ramp) * a + HALF) >> COEF_BITS), ramp)
+        progress = ramp >> VALUE_BITS
+
+        # 5) Target level
+        target = np.clip((progress * MAX_LEVEL + ONE // 2) // ONE, 0, MAX_LEVEL)
+        target = np.where(progress >= full_on, MAX_LEVEL, target)
+
+        # 6) Hysteresis, one level at a time
+        nxt = np.minimum(current + 1, MAX_LEVEL)
+        up_ok = progress >= ((2 * nxt - 1) * ONE) // (2 * MAX_LEVEL) + hyst
+        down_ok = progress <= ((2 * current - 1) * ONE) // (2 * MAX_LEVEL) - hyst
+        new = np.where(target > current, np.where(up_ok, nxt, current),
+                       np.where(target < current, np.where(down_ok, current - 1, current), current))
+        new = np.where(progress >= full_on, MAX_LEVEL, new)
+        current = np.where(live, new, current)
+
+        # 7) Trigger at full charge, then reset
+        fire = current == MAX_LEVEL
+        if fire.any():
+            combo = np.nonzero(fire)[0]
+            events.append(np.stack([np.full_like(combo, k), combo], axis=1))
+            peak = np.where(fire, floor, peak)
+            ramp = np.where(fire, 0, ramp)
+            current = np.where(fire, 0, current)
+
+    if not events:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.concatenate(events)
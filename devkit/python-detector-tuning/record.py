@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+record.py — records the `00-trace` frames broadcast by the server into a JSON lines file.
+
+Enable the trace on the device first (`trace_light` in ShroomsController, `trace_mic` in WindTurbineController).
+
+Run:
+  python record.py --url ws://192.168.1.10:8000/ws --out traces/shrooms.jsonl
+  python record.py --url ws://192.168.1.10:8000/ws --name wind-turbine --out traces/wind.jsonl
+
+While recording, press Enter to mark an event (a real light drop, a real blow),
+or type a channel number then Enter to mark an event on that channel only. Ctrl+C stops.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Optional, TextIO
+
+import websockets
+
+TRACE_ACTION = "00-trace"
+
+
+def write_line(out: TextIO, entry: dict) -> None:
+    out.write(json.dumps(entry) + "\n")
+    out.flush()
+
+
+async def receive_loop(url: str, name: Optional[str], out: TextIO) -> None:
+    async with websockets.connect(url, max_size=2**22) as ws:
+        print(f"Connected to {url}, recording ...")
+        count = 0
+        async for msg in ws:
+            if not isinstance(msg, str):
+                continue
+            try:
+                data = json.loads(msg)
+            except ValueError:
+                continue
+            # Batches are JSON arrays of frames
+            for frame in data if isinstance(data, list) else [data]:
+                if not isinstance(frame, dict) or frame.get("action") != TRACE_ACTION:
+                    continue
+                trace = frame.get("value") or {}
+                if name is not None and trace.get("name") != name:
+                    continue
+                write_line(out, {"host": time.time(), "trace": trace})
+                count += len(trace.get("dt", []))
+                print(f"\r{count} samples", end="", flush=True)
+
+
+async def mark_loop(out: TextIO) -> None:
+    while True:
+        line = (await asyncio.to_thread(sys.stdin.readline)).strip()
+        channel = int(line) if line.isdigit() else None
+        write_line(out, {"host": time.time(), "mark": channel})
+        print(f"\nmark{'' if channel is None else f' channel {channel}'}")
+
+
+async def run(url: str, name: Optional[str], path: str) -> None:
+    with open(path, "a", encoding="utf-8") as out:
+        marks = asyncio.create_task(mark_loop(out))
+        try:
+            await receive_loop(url, name, out)
+        finally:
+            marks.cancel()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Record device sensor traces")
+    p.add_argument("--url", default="ws://localhost:8000/ws", help="WebSocket URL of the server")
+    p.add_argument("--name", default=None, help="Only keep the traces with this name")
+    p.add_argument("--out", required=True, help="JSON lines file (appended)")
+    args = p.parse_args()
+
+    try:
+        asyncio.run(run(args.url, args.name, args.out))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+sweep.py — runs a recorded trace through every combination of a parameter grid and reports,
+for each combination, how many marked events were detected, the trigger latency and the false positives.
+
+Run:
+  python sweep.py light-drop traces/shrooms.jsonl \
+      --grid drop_trigger=30:90:5 --grid ema_alpha=0.2,0.35,0.5 --grid baseline_alpha=0.01,0.02,0.04
+  python sweep.py wind-turbine traces/wind.jsonl \
+      --grid peak_decay=0.99,0.995,0.998 --grid curve_gamma=0.2:0.6:0.05 --grid progress_up=0.1:0.4:0.05
+
+A trigger matches a mark when it falls in [mark - before, mark + window] (same channel when the mark has one).
+Every other trigger is a false positive.
+"""
+import argparse
+import csv
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import kernels
+from traces import Recording, load
+
+
+def parse_grid(specs: List[str]) -> Dict[str, np.ndarray]:
+    """
+    "name=start:stop:step" (stop included) or "name=v1,v2,..."
+    """
+    axes = {}
+    for spec in specs:
+        if "=" not in spec:
+            raise ValueError(f"Expected name=values, got: {spec}")
+        key, raw = spec.split("=", 1)
+        if ":" in raw:
+            start, stop, step = (float(x) for x in raw.split(":"))
+            values = np.arange(start, stop + step / 2, step)
+        else:
+            values = np.array([float(x) for x in raw.split(",")])
+        axes[key.strip()] = values
+
+    keys = list(axes)
+    combos = list(itertools.product(*(axes[k] for k in keys)))
+    return {k: np.array([c[i] for c in combos]) for i, k in enumerate(keys)}
+
+
+def score(
+    triggers: List[Tuple[int, Optional[int]]],
+    marks: List[Tuple[int, Optional[int]]],
+    before_ms: int,
+    window_ms: int,
+) -> Tuple[int, Optional[float], int]:
+    """
+    Returns (detected events, mean latency in ms, false positives) for one combination.
+    """
+    used = [False] * len(triggers)
+    latencies = []
+    for mark_t, mark_ch in marks:
+        for i, (t, ch) in enumerate(triggers):
+            if used[i] or (mark_ch is not None and ch != mark_ch):
+                continue
+            if mark_t - before_ms <= t <= mark_t + window_ms:
+                used[i] = True
+                latencies.append(t - mark_t)
+                break
+    latency = float(np.mean(latencies)) if latencies else None
+    return len(latencies), latency, used.count(False)
+
+
+def run_sweep(kind: str, rec: Recording, grid: Dict[str, np.ndarray]) -> List[List[Tuple[int, Optional[int]]]]:
+    """
+    Trigger list (device ms, channel) of every combination.
+    """
+    P = len(next(iter(grid.values()))) if grid else 1
+    per_combo: List[List[Tuple[int, Optional[int]]]] = [[] for _ in range(P)]
+
+    if kind == "light-drop":
+        for k, combo, channel in kernels.light_drop(rec.t, rec.v, grid):
+            per_combo[combo].append((int(rec.t[k]), int(channel)))
+    else:
+        for k, combo in kernels.wind_turbine(rec.t, rec.v[:, 0], grid):
+            per_combo[combo].append((int(rec.t[k]), None))
+    return per_combo
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Sweep detector parameters on a recorded trace")
+    p.add_argument("kind", choices=("light-drop", "wind-turbine"))
+    p.add_argument("trace", help="JSON lines file written by record.py")
+    p.add_argument("--name", default=None, help="Trace name, when the file holds several")
+    p.add_argument("--grid", action="append", default=[], help="name=start:stop:step or name=v1,v2 (repeatable)")
+    p.add_argument("--before", type=int, default=300, help="ms a trigger may precede its mark (reaction time)")
+    p.add_argument("--window", type=int, default=1500, help="ms after a mark to detect it")
+    p.add_argument("--top", type=int, default=20, help="Rows to print")
+    p.add_argument("--csv", default=None, help="Write every combination to this CSV file")
+    args = p.parse_args()
+
+    rec = load(args.trace, args.name)
+    grid = parse_grid(args.grid)
+    P = len(next(iter(grid.values()))) if grid else 1
+    minutes = max(rec.duration_ms / 60000.0, 1e-9)
+
+    print(f"{rec.name}: {len(rec.t)} samples x {rec.channels} channels, "
+          f"{rec.duration_ms / 1000:.1f} s, {len(rec.marks)} marks, {P} combinations")
+    if not rec.marks:
+        print("No marks: every trigger is counted as a false positive")
+
+    results = []
+    for combo, triggers in enumerate(run_sweep(args.kind, rec, grid)):
+        detected, latency, fp = score(triggers, rec.marks, args.before, args.window)
+        results.append((combo, detected, latency, fp))
+
+    # Most events detected, then fewest false positives, then fastest
+    results.sort(key=lambda r: (-r[1], r[3], r[2] if r[2] is not None else float("inf")))
+
+    keys = list(grid)
+    header = keys + ["detected", "latency_ms", "false_pos", "fp_per_min"]
+    rows = []
+    for combo, detected, latency, fp in results:
+        rows.append([f"{grid[k][combo]:g}" for k in keys] + [
+            f"{detected}/{len(rec.marks)}",
+            "-" if latency is None else f"{latency:.0f}",
+            str(fp),
+            f"{fp / minutes:.2f}",
+        ])
+
+    widths = [max(len(h), *(len(r[i]) for r in rows)) for i, h in enumerate(header)]
+    print("  ".join(h.rjust(w) for h, w in zip(header, widths)))
+    for row in rows[:args.top]:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        print(f"{len(rows)} rows written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Recorded traces (JSON lines written by record.py).
+
+Each line is either a trace block received from a device:
+    {"host": <host time, s>, "trace": {"name", "channels", "t0", "dt", "v"}}
+or a mark typed on the host while recording:
+    {"host": <host time, s>, "mark": <channel or null>}
+"""
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# MicroPython ticks_ms wraps at 2**30
+TICKS_PERIOD = 1 << 30
+
+
+@dataclass
+class Recording:
+    name: str
+    channels: int
+    t: np.ndarray                     # (T,) int64, device ms since the first sample
+    v: np.ndarray                     # (T, C) int64, raw samples
+    marks: List[Tuple[int, Optional[int]]] = field(default_factory=list)   # (device ms, channel or None)
+
+    @property
+    def duration_ms(self) -> int:
+        return int(self.t[-1] - self.t[0]) if len(self.t) else 0
+
+
+def load(path: str, name: Optional[str] = None) -> Recording:
+    blocks = []
+    marks_host = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "mark" in entry:
+                marks_host.append((entry["host"], entry["mark"]))
+                continue
+            trace = entry["trace"]
+            if name is not None and trace["name"] != name:
+                continue
+            if name is None:
+                name = trace["name"]
+            blocks.append((entry["host"], trace))
+
+    if not blocks:
+        raise ValueError(f"No trace found in {path}" + (f" for '{name}'" if name else ""))
+
+    channels = blocks[0][1]["channels"]
+    times = []
+    values = []
+    sync = []   # (host ms, device ms of the last sample of the block)
+    origin = blocks[0][1]["t0"]
+    unwrapped = 0
+    for host, trace in blocks:
+        if trace["channels"] != channels:
+            raise ValueError(f"Trace '{name}' changes from {channels} to {trace['channels']} channels")
+        # Block start relative to the first block, unwrapping ticks_ms
+        unwrapped += (trace["t0"] - origin) % TICKS_PERIOD
+        origin = trace["t0"]
+        t = unwrapped + np.asarray(trace["dt"], dtype=np.int64)
+        times.append(t)
+        values.append(np.asarray(trace["v"], dtype=np.int64).reshape(-1, channels))
+        sync.append((host * 1000.0, int(t[-1])))
+
+    t = np.concatenate(times)
+    v = np.concatenate(values)
+
+    # Host marks to device time: the closest block gives the host/device offset
+    sync_host = np.array([s[0] for s in sync])
+    marks = []
+    for host, channel in marks_host:
+        i = int(np.argmin(np.abs(sync_host - host * 1000.0)))
+        marks.append((int(round(host * 1000.0 - sync[i][0] + sync[i][1])), channel))
+
+    return Recording(name=name, channels=channels, t=t, v=v, marks=marks)
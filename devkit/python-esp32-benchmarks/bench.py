@@ -0,0 +1,285 @@
+"""
+bench.py — micro-benchmarks of the framework hot paths, on CPython or the MicroPython unix port.
+
+Run (from this directory):
+  python3 bench.py                                  # every case
+  python3 bench.py ws. led_strip                    # cases whose name contains one of the words
+  python3 bench.py --out results/after.json --baseline results/before.json --threshold 10
+  micropython bench.py --out results/upy.json
+
+The framework runs on the emulator stand-ins (devkit/python-esp32-emulator), with the virtual clock.
+Every case reports ops/s (best of --repeat runs of at least --time seconds) and bytes allocated per op:
+  - MicroPython: gc.mem_alloc() difference over a run with the collector disabled
+  - CPython: tracemalloc peak of one op, averaged (what the op needs at once, not what it churns)
+With --baseline, exits with 1 when a case got slower or allocates more than --threshold percent.
+Only compare results from the same runtime on the same machine.
+"""
+import sys
+import os
+import json
+import gc
+
+# Host clock and collector, taken before the emulator swaps `time` and `gc`
+try:
+    from time import perf_counter_ns
+
+    def now_us():
+        return perf_counter_ns() // 1000
+except ImportError:
+    from time import ticks_us, ticks_diff
+
+    def now_us():
+        return ticks_us()
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+MICROPYTHON = sys.implementation.name == "micropython"
+
+USAGE = "usage: bench.py [WORD ...] [--out FILE] [--baseline FILE] [--threshold PCT] [--time S] [--repeat N] [--list]"
+
+CONFIG = {
+    "device_id": "ESP32-BENCH",
+    "debug": False,
+    "slowed": False,
+    "wifi": {"SSID": "bench", "password": "bench", "timeout": 10000},
+    "websocket": {"server": "ws://127.0.0.1:8000/ws", "reconnect": False, "debug": False},
+}
+
+# Allowed growth of bytes/op before it counts as a regression, on top of the percentage
+ALLOC_SLACK = 16
+
+
+def _dirname(path):
+    i = path.rfind("/")
+    return path[:i] if i > 0 else "."
+
+
+def _abspath(path):
+    return path if path.startswith("/") else os.getcwd() + "/" + path
+
+
+HERE = _abspath(_dirname(globals().get("__file__", sys.argv[0])))
+REPO_ROOT = HERE + "/../.."
+TEMPLATE_APP = REPO_ROOT + "/devkit/python-esp32-template/app"
+EMULATOR = REPO_ROOT + "/devkit/python-esp32-emulator"
+WORK_DIR = HERE + "/.work"
+
+
+def parse_args(argv):
+    args = {"words": [], "out": None, "baseline": None, "threshold": 10.0, "time": 0.2, "repeat": 3, "list": False}
+    options = {"--out": str, "--baseline": str, "--threshold": float, "--time": float, "--repeat": int}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-h", "--help"):
+            print(USAGE)
+            sys.exit(0)
+        elif arg == "--list":
+            args["list"] = True
+        elif arg in options:
+            if i + 1 >= len(argv):
+                raise SystemExit(USAGE)
+            args[arg[2:]] = options[arg](argv[i + 1])
+            i += 1
+        elif arg.startswith("--"):
+            raise SystemExit(USAGE)
+        else:
+            args["words"].append(arg)
+        i += 1
+    return args
+
+
+def _mkdir(path):
+    try:
+        os.mkdir(path)
+    except OSError:
+        pass
+
+
+def prepare_work_dir():
+    """
+    Directory the App loads its config from: config.json and the config template.
+    """
+    _mkdir(WORK_DIR)
+    _mkdir(WORK_DIR + "/templates")
+    with open(TEMPLATE_APP + "/templates/config.template.json", "r") as f:
+        template = f.read()
+    with open(WORK_DIR + "/templates/config.template.json", "w") as f:
+        f.write(template)
+    with open(WORK_DIR + "/config.json", "w") as f:
+        f.write(json.dumps(CONFIG))
+    os.chdir(WORK_DIR)
+
+
+def install():
+    sys.path.insert(0, EMULATOR)
+    sys.path.insert(0, TEMPLATE_APP)
+    import emulator
+    emulator.install()
+
+    import cases
+    cases.REPO_ROOT = REPO_ROOT
+    return cases
+
+
+def reset_app():
+    from framework.app import App
+    del App.setup[:]
+    del App.update[:]
+    del App.shutdown[:]
+    del App.on_frame_received[:]
+
+
+def _run(op, n):
+    t0 = now_us()
+    for _ in range(n):
+        op()
+    return now_us() - t0
+
+
+def measure_time(op, min_time, repeat):
+    """
+    ops/s: n doubles until one run lasts min_time, then the best of `repeat` runs.
+    """
+    min_us = int(min_time * 1000000)
+    n = 1
+    while True:
+        elapsed = _run(op, n)
+        if elapsed >= min_us or n >= 1 << 24:
+            break
+        n *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _run(op, n))
+    return n, n * 1000000 / max(best, 1)
+
+
+def measure_alloc(op, n=64):
+    """
+    Bytes allocated per op, or None when the runtime cannot tell.
+    """
+    if MICROPYTHON:
+        gc.collect()
+        gc.disable()
+        try:
+            before = gc.mem_alloc()
+            for _ in range(n):
+                op()
+            after = gc.mem_alloc()
+        finally:
+            gc.enable()
+        return (after - before) / n
+
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(n):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            op()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / n
+
+
+def run_cases(cases, args):
+    results = {}
+    for name, setup in cases.CASES:
+        if args["words"] and not any(w in name for w in args["words"]):
+            continue
+        reset_app()
+        op = setup()
+        op()  # warm up (first calls, lazy imports)
+        n, ops = measure_time(op, args["time"], args["repeat"])
+        alloc = measure_alloc(op)
+        results[name] = {
+            "ops_per_s": round(ops, 1),
+            "bytes_per_op": None if alloc is None else round(alloc, 1),
+            "n": n,
+        }
+        print("%-32s %14.1f ops/s %10s B/op" % (name, ops, "-" if alloc is None else "%.1f" % alloc))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the changes against the baseline, return the regressed case names.
+    """
+    regressions = []
+    print()
+    print("%-32s %10s %10s" % ("case", "ops/s", "B/op"))
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            print("%-32s %10s %10s" % (name, "new", ""))
+            continue
+        speed = (r["ops_per_s"] / b["ops_per_s"] - 1) * 100 if b["ops_per_s"] else 0.0
+        alloc = ""
+        slower = speed < -threshold
+        heavier = False
+        if r["bytes_per_op"] is not None and b.get("bytes_per_op") is not None:
+            delta = r["bytes_per_op"] - b["bytes_per_op"]
+            alloc = "%+.1f" % delta
+            heavier = delta > ALLOC_SLACK + b["bytes_per_op"] * threshold / 100
+        flag = "  REGRESSION" if slower or heavier else ""
+        print("%-32s %+9.1f%% %10s%s" % (name, speed, alloc, flag))
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    cwd = os.getcwd()
+    out = _abspath(args["out"]) if args["out"] else None
+    baseline_path = _abspath(args["baseline"]) if args["baseline"] else None
+
+    cases = install()
+    if args["list"]:
+        for name, _ in cases.CASES:
+            print(name)
+        return 0
+
+    prepare_work_dir()
+    # The first App() loads (and prints) the config
+    from framework.app import App
+    App()
+    print()
+
+    results = run_cases(cases, args)
+    os.chdir(cwd)
+
+    from framework.utils import kernels
+    report = {
+        "runtime": "%s %s" % (sys.implementation.name, ".".join(str(v) for v in sys.implementation.version[:3])),
+        "platform": sys.platform,
+        "kernels": kernels.IMPLEMENTATION,
+        "results": results,
+    }
+    if out:
+        with open(out, "w") as f:
+            f.write(json.dumps(report))
+        print("\nResults written to", out)
+
+    if baseline_path:
+        with open(baseline_path, "r") as f:
+            baseline = json.loads(f.read())
+        if baseline.get("runtime") != report["runtime"]:
+            print("\nWarning: baseline runtime is", baseline.get("runtime"))
+        if baseline.get("kernels", report["kernels"]) != report["kernels"]:
+            print("\nWarning: baseline kernels are", baseline.get("kernels"))
+        regressions = compare(results, baseline["results"], args["threshold"])
+        if regressions:
+            print("\n%d regression(s) above %.0f%%" % (len(regressions), args["threshold"]))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
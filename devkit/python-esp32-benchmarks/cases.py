@@ -0,0 +1,334 @@
+"""
+Benchmark cases: the framework hot paths, with the sizes the apps use.
+
+A case is a setup function registered with @case(name). It builds its objects once and returns
+the operation to time (a function without arguments). The App hook lists are emptied before
+every setup, so the components a case creates do not leak into the next one.
+"""
+import json
+
+CASES = []
+
+PAYLOAD_SIZES = (16, 125, 1024, 4096)
+STRIP_SIZES = (100, 200, 430)
+HOOK_COUNTS = (0, 10, 50)
+
+EAGAIN = 11
+
+# Repository root, set by bench.py (the cases run from the work directory)
+REPO_ROOT = "../.."
+
+
+def case(name):
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+
+def app_file(path):
+    return REPO_ROOT + "/" + path
+
+
+def load(path, name):
+    """
+    Load one class from an app source file, without importing the app `src` package
+    (every app has its own).
+    """
+    scope = {"__name__": name}
+    with open(path, "r") as f:
+        exec(f.read(), scope)
+    return scope[name]
+
+
+class LoopbackSocket:
+    """
+    In-memory socket: recv() replays `data` from `pos`, write() only counts the bytes.
+    """
+
+    def __init__(self, data=b""):
+        self.data = data
+        self.pos = 0
+        self.written = 0
+
+    def setblocking(self, flag):
+        pass
+
+    def recv(self, n):
+        chunk = self.data[self.pos:self.pos + n]
+        if not chunk:
+            raise OSError(EAGAIN)
+        self.pos += len(chunk)
+        return chunk
+
+    def write(self, data):
+        self.written += len(data)
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def _server_frame(payload):
+    """
+    Unmasked text frame, as the server sends them.
+    """
+    import struct
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x81, n)
+    elif n < (1 << 16):
+        header = struct.pack("!BBH", 0x81, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, n)
+    return header + payload
+
+
+# --- Websocket ---------------------------------------------------------------------------
+
+def _read_frame(size):
+    def setup():
+        from framework.utils.ws.protocol import Websocket
+        sock = LoopbackSocket(_server_frame(b"x" * size))
+        ws = Websocket(sock)
+
+        def op():
+            sock.pos = 0
+            ws.read_frame()
+        return op
+    return setup
+
+
+def _write_frame(size):
+    def setup():
+        from framework.utils.ws.client import WebsocketClient
+        from framework.utils.ws.protocol import OP_TEXT
+        ws = WebsocketClient(LoopbackSocket())
+        data = b"x" * size
+
+        def op():
+            ws.write_frame(OP_TEXT, data)
+        return op
+    return setup
+
+
+for _size in PAYLOAD_SIZES:
+    case("ws.read_frame[%d]" % _size)(_read_frame(_size))
+    case("ws.write_frame[%d]" % _size)(_write_frame(_size))
+
+
+# --- Frames ------------------------------------------------------------------------------
+
+FRAME = {
+    "metadata": {"senderId": "ESP32-010101", "timestamp": 1700000000.5},
+    "action": "01-shroom-forest-lighten",
+    "value": True,
+}
+
+
+@case("frame_parser.parse")
+def frame_parser_parse():
+    from framework.utils.frames.frame_parser import FrameParser
+    raw = json.dumps(FRAME)
+
+    def op():
+        FrameParser(raw).parse()
+    return op
+
+
+@case("frame.to_json")
+def frame_to_json():
+    from framework.utils.frames.frame_parser import FrameParser
+    frame = FrameParser(json.dumps(FRAME)).parse()
+
+    def op():
+        frame.to_json()
+    return op
+
+
+# --- LED strips --------------------------------------------------------------------------
+
+def _strip_fill(n):
+    def setup():
+        from framework.components.led_strip import LedStrip
+        strip = LedStrip(27, n, max_current=2)
+
+        def op():
+            strip.fill((224, 156, 24))
+        return op
+    return setup
+
+
+def _strip_display(n):
+    def setup():
+        from framework.components.led_strip import LedStrip
+        strip = LedStrip(27, n, max_current=2)
+        strip.fill((224, 156, 24))
+
+        def op():
+            strip.display()
+        return op
+    return setup
+
+
+def _nutrient_flow(n):
+    def setup():
+        NutrientFlow = load(app_file("interaction-3/nutrient/app/src/nurtient_flow.py"), "NutrientFlow")
+        flow = NutrientFlow(num_pixels=n, color=(0, 255, 0), wave_len=20, gap_len=15, speed=50.0, fade=True)
+        pixels = [(0, 0, 0)] * n
+
+        def op():
+            flow.step(pixels)
+        return op
+    return setup
+
+
+def _animation_frame(n):
+    def setup():
+        import struct
+        from time import ticks_ms
+        from framework.components.led_strip import LedStrip
+        from framework.components.animation_player import AnimationPlayer, HEADER, MAGIC, VERSION
+        # 16 distinct frames, one frame period each
+        path = "bench-%d.anim" % n
+        with open(path, "wb") as f:
+            f.write(struct.pack(HEADER, MAGIC, VERSION, 1, n, 1, 16, 0))
+            for k in range(16):
+                f.write(struct.pack("<H", 1))
+                f.write(bytes([k * 8]) * (3 * n))
+        strip = LedStrip(27, n, max_current=2)
+        player = AnimationPlayer(strip, path)
+        player.play()
+
+        # One frame per call: the next one is always due
+        def op():
+            player._next = ticks_ms()
+            player.update()
+        return op
+    return setup
+
+
+for _n in STRIP_SIZES:
+    case("led_strip.fill[%d]" % _n)(_strip_fill(_n))
+    case("led_strip.display[%d]" % _n)(_strip_display(_n))
+    case("nutrient_flow.step[%d]" % _n)(_nutrient_flow(_n))
+    case("animation_player.frame[%d]" % _n)(_animation_frame(_n))
+
+
+# --- Sensors -----------------------------------------------------------------------------
+
+def _light_levels():
+    # Slow drift with a shadow every 64 samples
+    return [700 + (i & 7) - (300 if i & 63 > 56 else 0) for i in range(256)]
+
+
+@case("light_drop_detector.update")
+def light_drop_detector_update():
+    LightDropDetector = load(app_file("interaction-1/shrooms/app/src/shrooms/light_drop_detector.py"), "LightDropDetector")
+    detector = LightDropDetector(drop_trigger=50, cooldown_ms=1000)
+    levels = _light_levels()
+    state = [0, 0]
+
+    def op():
+        i = state[0] = (state[0] + 1) & 255
+        state[1] += 10
+        detector.update(levels[i], state[1])
+    return op
+
+
+@case("light_drop_bank.update[4]")
+def light_drop_bank_update():
+    from array import array
+    LightDropDetectorBank = load(app_file("interaction-1/shrooms/app/src/shrooms/light_drop_detector.py"), "LightDropDetectorBank")
+    bank = LightDropDetectorBank(drop_trigger=[50, 50, 60, 60])
+    levels = _light_levels()
+    scan = array("H", [0, 0, 0, 0])
+    state = [0, 0]
+
+    def op():
+        i = state[0] = (state[0] + 1) & 255
+        state[1] += 10
+        for ch in range(4):
+            scan[ch] = levels[(i + 16 * ch) & 255]
+        bank.update(scan, state[1])
+    return op
+
+
+def _mic_samples():
+    # 150 Hz airflow sampled at 2 kHz, on the 12-bit ADC midpoint
+    import math
+    return [2048 + int(400 * math.sin(2 * math.pi * 150 * i / 2000)) for i in range(256)]
+
+
+@case("microphone.envelope")
+def microphone_envelope():
+    from framework.components.microphone import Microphone
+    mic = Microphone(pin=32, alpha_base=0.01, attack=0.45, release=0.05, gate_offset=8)
+    samples = _mic_samples()
+    state = [0]
+
+    def op():
+        i = state[0] = (state[0] + 1) & 255
+        mic._filter(samples[i])
+    return op
+
+
+@case("microphone.block[32]")
+def microphone_block():
+    from framework.components.microphone import Microphone
+    mic = Microphone(pin=32, sample_rate=2000, block=32, bands=(150, 1000), on_block=lambda f: None)
+    mic.sampler.stop()
+    samples = _mic_samples()
+    for i in range(32):
+        mic.block[i] = samples[i]
+
+    def op():
+        mic._filter_block()
+    return op
+
+
+# --- App ---------------------------------------------------------------------------------
+
+@case("timer.churn")
+def timer_churn():
+    from framework.utils.timer import Timer
+
+    def noop():
+        pass
+
+    # Timers already armed by the app, in front of the churned one
+    for _ in range(8):
+        Timer(60000, noop, autostart=True)
+
+    def op():
+        t = Timer(1000, noop, autostart=True)
+        t.update()
+        t.quit()
+    return op
+
+
+def _app_run(hooks):
+    def setup():
+        from framework.app import App
+        app = App()
+        app.SLOWED = False
+
+        def noop():
+            pass
+
+        def stop():
+            app.shutdown_request = True
+
+        App.update.extend([noop] * hooks)
+        App.update.append(stop)
+
+        # One main loop iteration per run()
+        def op():
+            app.shutdown_request = False
+            app.run()
+        return op
+    return setup
+
+
+for _hooks in HOOK_COUNTS:
+    case("app.run[%d hooks]" % _hooks)(_app_run(_hooks))
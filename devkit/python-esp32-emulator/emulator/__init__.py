@@ -0,0 +1,71 @@
+"""
+Host emulator for the ESP32 MicroPython framework.
+
+`install()` registers stand-ins for the MicroPython-only modules (machine, neopixel, network, esp32,
+dht, micropython, usocket, uselect, time.ticks_*, ...) so framework and controller code runs unchanged
+on CPython. It must be called before anything imports the framework.
+"""
+import builtins
+import sys
+
+from emulator import board as _board
+from emulator.board import Board
+from emulator.clock import VirtualClock, RealClock
+
+_STUBS = ("machine", "neopixel", "network", "esp32", "dht", "micropython", "usocket", "uselect")
+
+# MicroPython `u` names of standard modules
+_ALIASES = {
+    "ure": "re",
+    "ustruct": "struct",
+    "ucollections": "collections",
+    "urandom": "random",
+    "ubinascii": "binascii",
+    "uerrno": "errno",
+    "ujson": "json",
+    "uos": "os",
+    "uio": "io",
+    "uhashlib": "hashlib",
+    "uasyncio": "asyncio",
+}
+
+
+def _stub(name):
+    return __import__("emulator.stubs." + name, None, None, ["_"])
+
+
+def install(clock=None, seed=0):
+    """
+    Create the board on `clock` (a VirtualClock by default) and register the modules.
+    Returns the board.
+    """
+    if clock is None:
+        clock = VirtualClock()
+    _board.BOARD = Board(clock)
+
+    # Host modules the stubs wrap are imported before `time`, `gc` and `_thread` are swapped
+    for name in set(_ALIASES.values()) | {"socket", "select", "threading"}:
+        try:
+            __import__(name)
+        except ImportError:
+            # Missing on the MicroPython unix port (threading, hashlib, ...)
+            pass
+
+    for name in _STUBS:
+        sys.modules[name] = _stub(name)
+    utime = _stub("utime")
+    sys.modules["time"] = utime
+    sys.modules["utime"] = utime
+    sys.modules["gc"] = _stub("gc")
+    sys.modules["_thread"] = _stub("_thread")
+    for alias, name in _ALIASES.items():
+        if name in sys.modules:
+            sys.modules[alias] = sys.modules[name]
+
+    sys.modules["random"].seed(seed)
+    builtins.const = lambda x: x
+    return _board.BOARD
+
+
+def get_board():
+    return _board.BOARD
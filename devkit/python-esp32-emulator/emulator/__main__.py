@@ -0,0 +1,168 @@
+"""
+python -m emulator APP_DIR [options]
+
+Runs an app (its main.py) on the emulated board, on a copy of the app directory
+(like `mpremote cp -r app/* :`), until --duration-ms of emulated time.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import emulator
+from emulator.clock import VirtualClock, RealClock
+
+DEFAULT_CONFIG = {
+    "device_id": "ESP32-010101",
+    "debug": False,
+    "slowed": False,
+    "wifi": {"SSID": "emulator", "password": "emulator", "timeout": 10000},
+    "websocket": {"server": "ws://127.0.0.1:8000/ws", "reconnect": True, "debug": False},
+}
+
+# Modules reloaded on every boot: the app and the framework keep their state in module and class attributes
+_APP_MODULES = ("framework", "src", "main")
+
+
+def _purge_app_modules():
+    for name in list(sys.modules):
+        if name.split(".")[0] in _APP_MODULES:
+            del sys.modules[name]
+
+
+def prepare_fs(app_dir, fs_dir, config_path=None, server=None, device_id=None):
+    """
+    Copy the app into `fs_dir` and write its config.json.
+    """
+    if os.path.exists(fs_dir):
+        shutil.rmtree(fs_dir)
+    shutil.copytree(app_dir, fs_dir, ignore=shutil.ignore_patterns("__pycache__"))
+
+    path = os.path.join(fs_dir, "config.json")
+    if config_path:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    elif os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    else:
+        config = json.loads(json.dumps(DEFAULT_CONFIG))
+    if server:
+        config["websocket"]["server"] = server
+    if device_id:
+        config["device_id"] = device_id
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+def boot(fs_dir, hooks=()):
+    """
+    Run main.py once, like the board does after a reset. `hooks` are added to App.update first.
+    """
+    _purge_app_modules()
+    from framework.app import App
+    App.update.extend(hooks)
+    code = compile(open(os.path.join(fs_dir, "main.py"), "r", encoding="utf-8").read(), "main.py", "exec")
+    exec(code, {"__name__": "__main__"})
+
+
+def run(app_dir, duration_ms=10000, clock=None, script=None, fs_dir=None, config=None, server=None,
+        device_id=None, reboot=True, seed=0):
+    """
+    Returns the board report (see emulator.board.Board.report) plus the host time spent.
+    """
+    board = emulator.install(clock, seed=seed)
+    from emulator.stubs import machine
+
+    fs_dir = fs_dir or tempfile.mkdtemp(prefix="esp32-fs-")
+    prepare_fs(app_dir, fs_dir, config, server, device_id)
+    cwd = os.getcwd()
+    os.chdir(fs_dir)
+    sys.path.insert(0, fs_dir)
+
+    # Scenario: scripts the inputs before boot (setup(board, clock))
+    if script:
+        scope = {"__name__": "scenario"}
+        exec(compile(open(script, "r", encoding="utf-8").read(), script, "exec"), scope)
+        if "setup" in scope:
+            scope["setup"](board, board.clock)
+
+    stop = {"done": False}
+
+    def deadline(clock):
+        if not stop["done"] and clock.now_ms() >= duration_ms:
+            stop["done"] = True
+            from framework.app import App
+            App().shutdown_request = True
+
+    board.clock.hooks.append(deadline)
+
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                # One main loop iteration costs `loop_us` of emulated time
+                boot(fs_dir, (board.clock.loop, _count_loop))
+                break
+            except machine.Reset as e:
+                board.resets.append({"ms": board.clock.now_ms(), "cause": e.cause})
+                machine._reset_cause = e.cause
+                machine.WDT.disarm_all()
+                if not reboot or stop["done"]:
+                    break
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(fs_dir)
+
+    report = board.report()
+    report["host_s"] = round(time.perf_counter() - start, 3)
+    if report["host_s"] > 0:
+        report["loops_per_host_s"] = round(board.loops / report["host_s"])
+    return report
+
+
+def _count_loop():
+    emulator.get_board().loops += 1
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m emulator", description="Run an ESP32 app on the host emulator")
+    p.add_argument("app", help="App directory (the one holding main.py)")
+    p.add_argument("--duration-ms", type=int, default=10000, help="Emulated time to run")
+    p.add_argument("--clock", choices=("virtual", "real"), default="virtual")
+    p.add_argument("--loop-us", type=int, default=1000, help="Emulated cost of one main loop iteration (virtual clock)")
+    p.add_argument("--script", default=None, help="Scenario file defining setup(board, clock)")
+    p.add_argument("--config", default=None, help="config.json to use instead of the app one")
+    p.add_argument("--server", default=None, help="Override websocket.server")
+    p.add_argument("--device-id", default=None, help="Override device_id")
+    p.add_argument("--fs", default=None, help="Directory for the emulated filesystem (default: temporary)")
+    p.add_argument("--no-reboot", action="store_true", help="Stop at the first machine reset / watchdog")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--report", default=None, help="Write the run report to this JSON file")
+    args = p.parse_args()
+
+    clock = VirtualClock(args.loop_us) if args.clock == "virtual" else RealClock()
+    report = run(
+        os.path.abspath(args.app),
+        duration_ms=args.duration_ms,
+        clock=clock,
+        script=os.path.abspath(args.script) if args.script else None,
+        fs_dir=args.fs,
+        config=args.config,
+        server=args.server,
+        device_id=args.device_id,
+        reboot=not args.no_reboot,
+        seed=args.seed,
+    )
+
+    print(json.dumps(report, indent=2), file=sys.__stdout__)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+The emulated board: scriptable inputs and captured outputs.
+
+Inputs are "sources": an int (constant), a callable `f(t_ms) -> int` (t_ms = emulated time),
+or a list of values (one per read, the last one sticks).
+"""
+
+
+class Source:
+    def __init__(self, value):
+        self.value = value
+        self._i = 0
+
+    def read(self, t_ms):
+        v = self.value
+        if callable(v):
+            return int(v(t_ms))
+        if isinstance(v, (list, tuple)):
+            if not v:
+                return 0
+            i = self._i
+            if i < len(v) - 1:
+                self._i += 1
+            return int(v[i])
+        return int(v)
+
+
+class Strip:
+    """
+    NeoPixel capture: every `write()` stores the buffer (GRB bytes) with its time.
+    Only the last `keep` frames are kept, `writes` counts them all.
+    """
+
+    def __init__(self, pin, n, bpp, keep=256):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.keep = keep
+        self.frames = []
+        self.writes = 0
+
+    def capture(self, t_ms, buf):
+        self.writes += 1
+        self.frames.append((t_ms, bytes(buf)))
+        if len(self.frames) > self.keep:
+            del self.frames[0]
+
+    def pixels(self, frame=-1):
+        """
+        RGB tuples of a captured frame (the last one by default).
+        """
+        if not self.frames:
+            return []
+        buf = self.frames[frame][1]
+        return [(buf[i + 1], buf[i], buf[i + 2]) for i in range(0, self.n * self.bpp, self.bpp)]
+
+
+class Mcp3008:
+    """
+    MCP3008 on a SPI bus: answers the 3-byte single-ended conversion with the channel source (0..1023).
+    """
+
+    def __init__(self, board, channels=None):
+        self.board = board
+        self.channels = {}
+        for ch, value in (channels or {}).items():
+            self.set(ch, value)
+
+    def set(self, ch, value):
+        self.channels[ch] = Source(value)
+
+    def transfer(self, tx, rx):
+        ch = (tx[1] >> 4) & 0x07
+        src = self.channels.get(ch)
+        value = src.read(self.board.clock.now_ms()) if src is not None else 0
+        value = max(0, min(1023, value))
+        rx[0] = 0
+        rx[1] = (value >> 8) & 0x03
+        rx[2] = value & 0xFF
+
+
+class Board:
+    def __init__(self, clock):
+        self.clock = clock
+
+        # Inputs
+        self.adc = {}             # pin -> Source (0..4095)
+        self.pins = {}            # pin -> Source (0/1) for inputs
+        self.spi = {}             # SPI id -> device with transfer(tx, rx)
+        self.temperature_f = Source(120)
+        self.dht = {"temperature": Source(20), "humidity": Source(40), "fail": False}
+        self.wifi_connect_ms = 0
+        self.heap_size = 110 * 1024
+
+        # Outputs
+        self.strips = {}          # pin -> Strip
+        self.outputs = {}         # pin -> last value written
+        self.pin_writes = 0
+        self.irqs = {}            # pin -> [(trigger, handler, pin object)]
+
+        # Stats
+        self.loops = 0
+        self.net = {"sent": 0, "received": 0, "connects": 0}
+        self.wdt_feeds = 0
+        self.resets = []
+
+    # --- scripting helpers ----------------------------------------------------------------
+    def set_adc(self, pin, value):
+        self.adc[pin] = Source(value)
+
+    def set_pin(self, pin, value):
+        """
+        Drive an input pin. Fires the registered IRQ handlers on the edge.
+        """
+        old = self.read_pin(pin)
+        self.pins[pin] = Source(value)
+        new = self.read_pin(pin)
+        if old == new:
+            return
+        from emulator.stubs.machine import Pin
+        trigger = Pin.IRQ_RISING if new else Pin.IRQ_FALLING
+        for mask, handler, obj in self.irqs.get(pin, ()):
+            if mask & trigger:
+                handler(obj)
+
+    def mcp3008(self, spi_id=2, channels=None):
+        dev = Mcp3008(self, channels)
+        self.spi[spi_id] = dev
+        return dev
+
+    # --- used by the stubs ----------------------------------------------------------------
+    def read_adc(self, pin):
+        src = self.adc.get(pin)
+        return src.read(self.clock.now_ms()) if src is not None else 0
+
+    def read_pin(self, pin):
+        src = self.pins.get(pin)
+        if src is not None:
+            return 1 if src.read(self.clock.now_ms()) else 0
+        return self.outputs.get(pin, 0)
+
+    def write_pin(self, pin, value):
+        self.outputs[pin] = 1 if value else 0
+        self.pin_writes += 1
+
+    def strip(self, pin, n, bpp):
+        s = self.strips.get(pin)
+        if s is None or s.n != n:
+            s = self.strips[pin] = Strip(pin, n, bpp)
+        return s
+
+    def report(self):
+        return {
+            "emulated_ms": self.clock.now_ms(),
+            "loops": self.loops,
+            "strips": {str(pin): s.writes for pin, s in self.strips.items()},
+            "pin_writes": self.pin_writes,
+            "net": dict(self.net),
+            "wdt_feeds": self.wdt_feeds,
+            "resets": list(self.resets),
+        }
+
+
+# Set by emulator.install()
+BOARD = None
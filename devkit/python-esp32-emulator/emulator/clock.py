@@ -0,0 +1,156 @@
+"""
+Clocks behind the emulated `time.ticks_*`, `time.sleep*` and `machine.Timer`.
+
+VirtualClock only moves when the emulator says so (sleeps, main loop iterations, `advance`):
+a run with the same inputs gives the same ticks, the same timer callbacks and the same output.
+RealClock follows the host monotonic clock, for runs against a real server.
+"""
+import heapq
+import time as _time
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD >> 1
+
+# time.time() of a virtual run starts at a fixed date
+VIRTUAL_EPOCH = 1700000000
+
+
+def ticks_diff(a, b):
+    return ((a - b + TICKS_HALF) & TICKS_MAX) - TICKS_HALF
+
+
+def ticks_add(a, delta):
+    return (a + delta) & TICKS_MAX
+
+
+class _Clock:
+    def __init__(self):
+        self._timers = []
+        self._seq = 0
+        self._firing = False
+        self.hooks = []          # called with the clock after every move (watchdog, deadline)
+
+    # --- time base (microseconds) -----------------------------------------------------
+    def now_us(self):
+        raise NotImplementedError
+
+    def ticks_ms(self):
+        self.poll()
+        return (self.now_us() // 1000) & TICKS_MAX
+
+    def ticks_us(self):
+        self.poll()
+        return self.now_us() & TICKS_MAX
+
+    def now_ms(self):
+        return self.now_us() // 1000
+
+    # --- timers -----------------------------------------------------------------------
+    def schedule(self, due_us, callback):
+        self._seq += 1
+        heapq.heappush(self._timers, (due_us, self._seq, callback))
+        return self._seq
+
+    def cancel(self, seq):
+        self._timers = [t for t in self._timers if t[1] != seq]
+        heapq.heapify(self._timers)
+
+    def at(self, ms, callback):
+        """
+        Run `callback()` at `ms` of emulated time (scenario scripts).
+        """
+        return self.schedule(ms * 1000, callback)
+
+    def _fire_until(self, now_us):
+        if self._firing:
+            return
+        self._firing = True
+        try:
+            while self._timers and self._timers[0][0] <= now_us:
+                due, _seq, callback = heapq.heappop(self._timers)
+                self._set(due)
+                callback()
+        finally:
+            self._firing = False
+
+    def _set(self, now_us):
+        pass
+
+    def poll(self):
+        self._fire_until(self.now_us())
+        for hook in self.hooks:
+            hook(self)
+
+
+class VirtualClock(_Clock):
+    """
+    Deterministic clock. `loop_us` is the emulated cost of one main loop iteration.
+    """
+
+    def __init__(self, loop_us=1000):
+        super().__init__()
+        self._now = 0
+        self.loop_us = loop_us
+
+    def now_us(self):
+        return self._now
+
+    def _set(self, now_us):
+        if now_us > self._now:
+            self._now = now_us
+
+    def advance_us(self, us):
+        target = self._now + max(int(us), 0)
+        self._fire_until(target)
+        self._now = target
+        self.poll()
+
+    def sleep_us(self, us):
+        self.advance_us(us)
+
+    def loop(self):
+        self.advance_us(self.loop_us)
+
+    def time(self):
+        return VIRTUAL_EPOCH + self._now / 1000000
+
+    def idle(self):
+        # Until the next timer, at most one RTOS tick
+        nxt = self._timers[0][0] - self._now if self._timers else 1000
+        self.advance_us(min(max(nxt, 1), 1000))
+
+
+class RealClock(_Clock):
+    """
+    Host monotonic time, timers fired whenever the emulated code reads the clock or sleeps.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._t0 = _time.monotonic()
+
+    def now_us(self):
+        return int((_time.monotonic() - self._t0) * 1000000)
+
+    def advance_us(self, us):
+        self.sleep_us(us)
+
+    def sleep_us(self, us):
+        end = self.now_us() + max(int(us), 0)
+        while True:
+            self.poll()
+            left = end - self.now_us()
+            if left <= 0:
+                return
+            nxt = self._timers[0][0] - self.now_us() if self._timers else left
+            _time.sleep(max(min(left, nxt), 0) / 1000000)
+
+    def loop(self):
+        self.poll()
+
+    def time(self):
+        return _time.time()
+
+    def idle(self):
+        self.sleep_us(1000)
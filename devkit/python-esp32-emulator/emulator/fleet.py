@@ -0,0 +1,59 @@
+"""
+python -m emulator.fleet APP_DIR [APP_DIR ...] --server ws://... [--copies N]
+
+Runs several emulated boards at once, one process each, against the same server (load tests).
+Every board gets its own device id and temporary filesystem. Prints the reports as one JSON list.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m emulator.fleet", description="Run many emulated boards")
+    p.add_argument("apps", nargs="+", help="App directories")
+    p.add_argument("--server", required=True, help="websocket.server of every board")
+    p.add_argument("--copies", type=int, default=1, help="Boards per app")
+    p.add_argument("--duration-ms", type=int, default=10000)
+    p.add_argument("--clock", choices=("virtual", "real"), default="real")
+    p.add_argument("--script", default=None, help="Scenario file given to every board")
+    args = p.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix="esp32-fleet-")
+    procs = []
+    for a, app in enumerate(args.apps):
+        for c in range(args.copies):
+            n = a * args.copies + c
+            report = os.path.join(out_dir, f"{n}.json")
+            cmd = [
+                sys.executable, "-m", "emulator", os.path.abspath(app),
+                "--server", args.server,
+                "--device-id", f"ESP32-{n:06d}",
+                "--duration-ms", str(args.duration_ms),
+                "--clock", args.clock,
+                "--seed", str(n),
+                "--report", report,
+            ]
+            if args.script:
+                cmd += ["--script", os.path.abspath(args.script)]
+            log = open(os.path.join(out_dir, f"{n}.log"), "w")
+            procs.append((app, report, subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)))
+
+    reports = []
+    for app, report, proc in procs:
+        proc.wait()
+        entry = {"app": app, "exit": proc.returncode}
+        if os.path.exists(report):
+            with open(report, "r", encoding="utf-8") as f:
+                entry.update(json.load(f))
+        reports.append(entry)
+
+    print(json.dumps(reports, indent=2))
+    print(f"Logs in {out_dir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
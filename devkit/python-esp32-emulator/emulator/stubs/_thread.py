@@ -0,0 +1,16 @@
+"""
+`_thread` stand-in: CPython refuses stacks under 32 KiB, the ESP32 port takes them.
+"""
+import _thread as _host
+
+for _name in dir(_host):
+    if not _name.startswith("__"):
+        globals()[_name] = getattr(_host, _name)
+
+_MIN_STACK = 32 * 1024
+
+
+def stack_size(size=0):
+    if 0 < size < _MIN_STACK:
+        size = _MIN_STACK
+    return _host.stack_size(size)
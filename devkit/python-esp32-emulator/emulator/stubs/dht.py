@@ -0,0 +1,33 @@
+"""
+`dht` stand-in: values from board.dht, `board.dht["fail"] = True` makes measure() raise.
+"""
+from emulator import board as _board
+
+
+class DHTBase:
+    def __init__(self, pin):
+        self.pin = pin
+        self._t = 0
+        self._h = 0
+
+    def measure(self):
+        b = _board.BOARD
+        if b.dht["fail"]:
+            raise OSError(110)
+        now = b.clock.now_ms()
+        self._t = b.dht["temperature"].read(now)
+        self._h = b.dht["humidity"].read(now)
+
+    def temperature(self):
+        return self._t
+
+    def humidity(self):
+        return self._h
+
+
+class DHT11(DHTBase):
+    pass
+
+
+class DHT22(DHTBase):
+    pass
@@ -0,0 +1,12 @@
+"""
+`esp32` stand-in.
+"""
+from emulator import board as _board
+
+
+def raw_temperature():
+    return _board.BOARD.temperature_f.read(_board.BOARD.clock.now_ms())
+
+
+def mcu_temperature():
+    return (raw_temperature() - 32) * 5 // 9
@@ -0,0 +1,37 @@
+"""
+`gc` stand-in: the host collector plus the MicroPython heap counters.
+
+collect() only runs a young-generation pass: a full CPython collection on every main loop
+iteration would dominate the emulated timings.
+"""
+import gc as _gc
+
+from emulator import board as _board
+
+for _name in dir(_gc):
+    if not _name.startswith("__"):
+        globals()[_name] = getattr(_gc, _name)
+
+collections = 0
+
+
+def collect(generation=0):
+    global collections
+    collections += 1
+    try:
+        return _gc.collect(generation)
+    except TypeError:
+        # MicroPython unix port: no generations
+        return _gc.collect()
+
+
+def mem_alloc():
+    return _board.BOARD.heap_size // 4
+
+
+def mem_free():
+    return _board.BOARD.heap_size - mem_alloc()
+
+
+def threshold(amount=None):
+    return -1 if amount is None else None
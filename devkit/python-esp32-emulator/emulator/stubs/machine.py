@@ -0,0 +1,255 @@
+"""
+`machine` stand-in backed by the emulated board.
+"""
+from emulator import board as _board
+
+
+class Reset(SystemExit):
+    """
+    Raised by machine.reset(), soft_reset() and an expired WDT: the emulated board reboots.
+    """
+
+    def __init__(self, cause):
+        super().__init__(cause)
+        self.cause = cause
+
+
+PWRON_RESET = 1
+HARD_RESET = 2
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+
+_reset_cause = PWRON_RESET
+
+
+def _b():
+    return _board.BOARD
+
+
+def _id(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None, **kwargs):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        if value is not None:
+            _b().write_pin(id, value)
+
+    def init(self, mode=-1, pull=-1, value=None, **kwargs):
+        self.mode = mode
+        self.pull = pull
+        if value is not None:
+            _b().write_pin(self.id, value)
+
+    def value(self, v=None):
+        if v is None:
+            return _b().read_pin(self.id)
+        _b().write_pin(self.id, v)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def on(self):
+        _b().write_pin(self.id, 1)
+
+    def off(self):
+        _b().write_pin(self.id, 0)
+
+    def irq(self, handler=None, trigger=IRQ_RISING | IRQ_FALLING, **kwargs):
+        handlers = _b().irqs.setdefault(self.id, [])
+        handlers[:] = [h for h in handlers if h[2] is not self]
+        if handler is not None:
+            handlers.append((trigger, handler, self))
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_9BIT = 0
+    WIDTH_10BIT = 1
+    WIDTH_11BIT = 2
+    WIDTH_12BIT = 3
+
+    def __init__(self, pin, atten=ATTN_0DB):
+        self.pin = _id(pin)
+        self.bits = 12
+
+    def atten(self, atten):
+        pass
+
+    def width(self, width):
+        self.bits = 9 + width
+
+    def read(self):
+        v = max(0, min(4095, _b().read_adc(self.pin)))
+        return v >> (12 - self.bits)
+
+    def read_u16(self):
+        return max(0, min(4095, _b().read_adc(self.pin))) << 4
+
+    def read_uv(self):
+        return max(0, min(4095, _b().read_adc(self.pin))) * 3300000 // 4095
+
+
+class SPI:
+    def __init__(self, id, baudrate=1000000, polarity=0, phase=0, **kwargs):
+        self.id = id
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def deinit(self):
+        pass
+
+    def _transfer(self, tx, rx):
+        dev = _b().spi.get(self.id)
+        if dev is not None:
+            dev.transfer(tx, rx)
+        else:
+            for i in range(len(rx)):
+                rx[i] = 0
+
+    def write_readinto(self, tx, rx):
+        self._transfer(tx, rx)
+
+    def write(self, buf):
+        self._transfer(buf, bytearray(len(buf)))
+
+    def readinto(self, buf, write=0x00):
+        self._transfer(bytes([write]) * len(buf), buf)
+
+    def read(self, n, write=0x00):
+        buf = bytearray(n)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self._seq = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None, **kwargs):
+        self.deinit()
+        if freq > 0:
+            self._period_us = 1000000 // freq
+        else:
+            self._period_us = max(int(period), 1) * 1000
+        self._mode = mode
+        self._callback = callback
+        self._arm(_b().clock.now_us())
+
+    def _arm(self, start_us):
+        self._due = start_us + self._period_us
+        self._seq = _b().clock.schedule(self._due, self._fire)
+
+    def _fire(self):
+        self._seq = None
+        if self._mode == Timer.PERIODIC:
+            self._arm(self._due)
+        if self._callback is not None:
+            self._callback(self)
+
+    def deinit(self):
+        if self._seq is not None:
+            _b().clock.cancel(self._seq)
+            self._seq = None
+
+
+class WDT:
+    _active = []
+
+    def __init__(self, id=0, timeout=5000):
+        self.timeout_ms = timeout
+        self._last = _b().clock.now_ms()
+        _b().clock.hooks.append(self._check)
+        WDT._active.append(self)
+
+    @classmethod
+    def disarm_all(cls):
+        # A reset stops the watchdog: the next boot starts its own
+        for wdt in cls._active:
+            if wdt._check in _b().clock.hooks:
+                _b().clock.hooks.remove(wdt._check)
+        cls._active = []
+
+    def feed(self):
+        self._last = _b().clock.now_ms()
+        _b().wdt_feeds += 1
+
+    def _check(self, clock):
+        if clock.now_ms() - self._last > self.timeout_ms:
+            clock.hooks.remove(self._check)
+            raise Reset(WDT_RESET)
+
+
+class RTC:
+    _memory = b""
+
+    def __init__(self, id=0):
+        pass
+
+    def memory(self, data=None):
+        if data is None:
+            return RTC._memory
+        RTC._memory = bytes(data)
+
+    def datetime(self, dt=None):
+        import time
+        t = time.localtime(int(time.time()))
+        return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+
+
+def idle():
+    _b().clock.idle()
+
+
+def lightsleep(ms=None):
+    _b().clock.sleep_us((ms or 0) * 1000)
+
+
+def reset():
+    raise Reset(HARD_RESET)
+
+
+def soft_reset():
+    raise Reset(SOFT_RESET)
+
+
+def reset_cause():
+    return _reset_cause
+
+
+def unique_id():
+    return b"\x24\x0a\xc4\x00\x00\x01"
+
+
+def freq(hz=None):
+    return 240000000
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
@@ -0,0 +1,68 @@
+"""
+`micropython` stand-in. Scheduled callbacks run right after the timer callback that scheduled them.
+"""
+
+SCHEDULE_DEPTH = 8
+
+_pending = []
+_running = False
+
+
+def const(x):
+    return x
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def schedule(func, arg):
+    global _running
+    if len(_pending) >= SCHEDULE_DEPTH:
+        raise RuntimeError("schedule queue full")
+    _pending.append((func, arg))
+    if _running:
+        return
+    _running = True
+    try:
+        while _pending:
+            f, a = _pending.pop(0)
+            f(a)
+    finally:
+        _running = False
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def opt_level(level=None):
+    return 0 if level is None else None
+
+
+def mem_info(verbose=None):
+    print("mem: emulated")
+
+
+def qstr_info(verbose=None):
+    pass
+
+
+def stack_use():
+    return 0
+
+
+def heap_lock():
+    return 0
+
+
+def heap_unlock():
+    return 0
+
+
+def kbd_intr(chr):
+    pass
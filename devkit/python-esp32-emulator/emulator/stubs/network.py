@@ -0,0 +1,59 @@
+"""
+`network` stand-in: the station connects `board.wifi_connect_ms` after connect(), on the host network.
+"""
+from emulator import board as _board
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 1000
+STAT_CONNECTING = 1001
+STAT_GOT_IP = 1010
+
+
+class WLAN:
+    def __init__(self, interface_id=STA_IF):
+        self._active = False
+        self._connect_at = None
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self._active
+        self._active = bool(is_active)
+
+    def connect(self, ssid=None, key=None, **kwargs):
+        self._connect_at = _board.BOARD.clock.now_ms() + _board.BOARD.wifi_connect_ms
+
+    def disconnect(self):
+        self._connect_at = None
+
+    def isconnected(self):
+        clock = _board.BOARD.clock
+        if self._connect_at is None:
+            return False
+        if clock.now_ms() < self._connect_at:
+            # The radio needs time: polling costs emulated time, busy loops end
+            clock.advance_us(1000)
+            return False
+        return True
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -50
+        return STAT_GOT_IP if self.isconnected() else STAT_CONNECTING
+
+    def ifconfig(self, config=None):
+        return ("127.0.0.1", "255.0.0.0", "127.0.0.1", "127.0.0.1")
+
+    def ipconfig(self, key=None):
+        if key == "addr4":
+            return ("127.0.0.1", "255.0.0.0")
+        return None
+
+    def config(self, *args, **kwargs):
+        if args and args[0] == "mac":
+            return b"\x24\x0a\xc4\x00\x00\x01"
+        return None
+
+    def scan(self):
+        return []
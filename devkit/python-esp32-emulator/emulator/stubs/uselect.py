@@ -0,0 +1,50 @@
+"""
+`uselect` stand-in. poll() returns (registered object, flags) pairs like MicroPython,
+on top of select.select so it also works on Windows.
+"""
+import select as _select
+
+POLLIN = 0x001
+POLLOUT = 0x004
+POLLERR = 0x008
+POLLHUP = 0x010
+POLLNVAL = 0x020
+
+select = _select.select
+
+
+class _Poll:
+    def __init__(self):
+        self._objs = {}
+
+    def register(self, obj, eventmask=POLLIN | POLLOUT):
+        self._objs[obj] = eventmask
+
+    def modify(self, obj, eventmask):
+        if obj not in self._objs:
+            raise OSError(2)
+        self._objs[obj] = eventmask
+
+    def unregister(self, obj):
+        self._objs.pop(obj, None)
+
+    def poll(self, timeout=-1):
+        readers = [o for o, m in self._objs.items() if m & POLLIN]
+        writers = [o for o, m in self._objs.items() if m & POLLOUT]
+        try:
+            r, w, _ = _select.select(readers, writers, [], None if timeout < 0 else timeout / 1000)
+        except (OSError, ValueError):
+            return [(o, POLLNVAL) for o in self._objs]
+        out = []
+        for o in self._objs:
+            flags = (POLLIN if o in r else 0) | (POLLOUT if o in w else 0)
+            if flags:
+                out.append((o, flags))
+        return out
+
+    def ipoll(self, timeout=-1, flags=0):
+        return iter(self.poll(timeout))
+
+
+def poll():
+    return _Poll()
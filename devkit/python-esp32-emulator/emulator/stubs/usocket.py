@@ -0,0 +1,119 @@
+"""
+`usocket` stand-in on real host sockets, with the MicroPython stream methods (read, readline, write).
+"""
+import select as _select
+import socket as _socket
+
+from emulator import board as _board
+
+AF_INET = _socket.AF_INET
+AF_INET6 = _socket.AF_INET6
+SOCK_STREAM = _socket.SOCK_STREAM
+SOCK_DGRAM = _socket.SOCK_DGRAM
+IPPROTO_TCP = getattr(_socket, "IPPROTO_TCP", 6)
+IPPROTO_UDP = getattr(_socket, "IPPROTO_UDP", 17)
+SOL_SOCKET = _socket.SOL_SOCKET
+SO_REUSEADDR = _socket.SO_REUSEADDR
+SO_BROADCAST = _socket.SO_BROADCAST
+
+getaddrinfo = _socket.getaddrinfo
+
+
+class socket:
+    def __init__(self, af=AF_INET, type=SOCK_STREAM, proto=0, _sock=None):
+        self._s = _sock if _sock is not None else _socket.socket(af, type, proto)
+        if type == SOCK_STREAM and hasattr(_socket, "TCP_NODELAY"):
+            # lwIP sends small writes right away
+            self._s.setsockopt(IPPROTO_TCP, _socket.TCP_NODELAY, 1)
+
+    def fileno(self):
+        return self._s.fileno()
+
+    def connect(self, addr):
+        self._s.connect(addr)
+        _board.BOARD.net["connects"] += 1
+
+    def bind(self, addr):
+        self._s.bind(addr)
+
+    def listen(self, backlog=1):
+        self._s.listen(backlog)
+
+    def accept(self):
+        s, addr = self._s.accept()
+        return socket(_sock=s), addr
+
+    def setblocking(self, flag):
+        self._s.setblocking(flag)
+
+    def settimeout(self, value):
+        self._s.settimeout(value)
+
+    def setsockopt(self, level, opt, value):
+        self._s.setsockopt(level, opt, value)
+
+    def close(self):
+        self._s.close()
+
+    # --- datagrams ---------------------------------------------------------------------
+    def sendto(self, data, addr):
+        n = self._s.sendto(data, addr)
+        _board.BOARD.net["sent"] += n
+        return n
+
+    def recvfrom(self, n):
+        data, addr = self._s.recvfrom(n)
+        _board.BOARD.net["received"] += len(data)
+        return data, addr
+
+    # --- stream -------------------------------------------------------------------------
+    def send(self, data):
+        n = self._s.send(data)
+        _board.BOARD.net["sent"] += n
+        return n
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        view = memoryview(data)
+        while view:
+            try:
+                n = self._s.send(view)
+            except BlockingIOError:
+                _select.select([], [self._s], [], 1.0)
+                continue
+            _board.BOARD.net["sent"] += n
+            view = view[n:]
+        return len(data)
+
+    sendall = write
+
+    def recv(self, n):
+        data = self._s.recv(n)
+        _board.BOARD.net["received"] += len(data)
+        return data
+
+    def read(self, n=-1):
+        if n < 0:
+            chunks = []
+            while True:
+                chunk = self.recv(4096)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        return self.recv(n)
+
+    def readinto(self, buf, n=-1):
+        n = len(buf) if n < 0 else n
+        data = self.recv(n)
+        buf[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        line = bytearray()
+        while not line.endswith(b"\n"):
+            c = self.recv(1)
+            if not c:
+                break
+            line += c
+        return bytes(line)
@@ -0,0 +1,48 @@
+"""
+`time` / `utime` stand-in: the host `time` module, with ticks and sleeps on the emulator clock.
+"""
+import time as _time
+
+from emulator import board as _board
+from emulator.clock import ticks_diff, ticks_add
+
+# Everything the host module has (monotonic, localtime, strftime, ...)
+for _name in dir(_time):
+    if not _name.startswith("__"):
+        globals()[_name] = getattr(_time, _name)
+
+
+def _clock():
+    return _board.BOARD.clock
+
+
+def ticks_ms():
+    return _clock().ticks_ms()
+
+
+def ticks_us():
+    return _clock().ticks_us()
+
+
+def ticks_cpu():
+    return _clock().ticks_us()
+
+
+def sleep(seconds):
+    _clock().sleep_us(int(seconds * 1000000))
+
+
+def sleep_ms(ms):
+    _clock().sleep_us(int(ms) * 1000)
+
+
+def sleep_us(us):
+    _clock().sleep_us(int(us))
+
+
+def time():
+    return _clock().time()
+
+
+def time_ns():
+    return int(_clock().time() * 1000000000)
@@ -0,0 +1,18 @@
+"""
+Wind turbine: someone blows on the microphone (pin 32) from 1 s to 6 s.
+"""
+import math
+import random
+
+
+def setup(board, clock):
+    rnd = random.Random(1)
+
+    def mic(t):
+        if 1000 <= t <= 6000:
+            # Low-frequency airflow rumble + noise
+            phase = 2 * math.pi * 150 * t / 1000.0 + rnd.random() * 0.3
+            return 2048 + int(400 * math.sin(phase)) + rnd.randint(-40, 40)
+        return 2048 + rnd.randint(-3, 3)
+
+    board.set_adc(32, mic)
@@ -0,0 +1,12 @@
+"""
+Any app: the chip heats up from 50 °C to 82 °C over 20 s, then cools down back to 50 °C at 40 s.
+Exercises the health degradation levels.
+"""
+
+
+def setup(board, clock):
+    def temperature_f(t):
+        c = 50 + 32 * min(t, 40000 - t, 20000) / 20000 if t < 40000 else 50
+        return c * 9 / 5 + 32
+
+    board.temperature_f.value = temperature_f
@@ -0,0 +1,11 @@
+"""
+Shrooms: a hand passes over each MCP3008 channel in turn, 600 ms each, from 2 s.
+"""
+
+
+def setup(board, clock):
+    def level(ch):
+        start = 2000 + ch * 300
+        return lambda t: 300 if start <= t <= start + 600 else 700
+
+    board.mcp3008(2, {ch: level(ch) for ch in range(8)})
@@ -0,0 +1,17 @@
+"""
+Any app: the board is reset (as by the watchdog) at 8 s, mid-show.
+Exercises the warm restart: the state snapshots of the first boot are restored by the second one.
+Run with reboots (the default).
+"""
+import machine
+
+
+def setup(board, clock):
+    done = []
+
+    def reset(clock):
+        if not done and clock.now_ms() >= 8000:
+            done.append(True)
+            raise machine.Reset(machine.WDT_RESET)
+
+    clock.hooks.append(reset)
@@ -0,0 +1,29 @@
+# Lazy access to the components:
+#   from framework.components import LedStrip
+# only imports framework.components.led_strip, the first time LedStrip is used.
+# Importing the module directly (framework.components.led_strip) still works.
+
+_MODULES = {
+    "AnimationPlayer": "animation_player",
+    "Button": "button",
+    "DHTSensor": "dht_sensor",
+    "Encoder": "encoder",
+    "Engine": "engine",
+    "Led": "led",
+    "LedResistor": "led_resistor",
+    "LedStrip": "led_strip",
+    "Chanel": "mcp3008",
+    "MCP3008": "mcp3008",
+    "Microphone": "microphone",
+    "Relay": "relay",
+}
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(name)
+    value = getattr(__import__("framework.components." + module, None, None, (name,)), name)
+    # Next lookups don't go through __getattr__
+    globals()[name] = value
+    return value
@@ -1,20 +1,25 @@
 from machine import Pin, ADC
 from framework.app import App
-from framework.utils.frames.frame import Frame
 from framework.utils.ws.interface import WebsocketInterface
+from framework.utils import log
+
+_log = log.get("light")
 
 class LedResistor:
 
-    def __init__(self, pin, threshold, target):
-        self.adc = Pin(pin, Pin.OUT, Pin.PULL_DOWN)
+    def __init__(self, pin, action, threshold=0, min_interval_ms=0):
+        self.adc = ADC(Pin(pin))
         self.adc.atten(ADC.ATTN_11DB)
         self.adc.width(ADC.WIDTH_12BIT)
-        self.target = target
+        self.action = action
         self.threshold = threshold
+
+        # Only send readings that moved by more than `threshold`
+        WebsocketInterface().set_policy(action, deadband=threshold, min_interval_ms=min_interval_ms)
         App().update.append(self.update)
 
     def update(self):
         value = self.adc.read()
-        if App().config.debug:
-            print(f"LIGHT: {value}")
-        WebsocketInterface().send_value(self.slug, value, "int", self.target)
\ No newline at end of file
+        if _log.debug_on:
+            _log.debug(value)
+        WebsocketInterface().send_value(self.action, value)
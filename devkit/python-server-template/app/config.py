@@ -30,12 +30,24 @@ class WsActionConfig:
     action: str
 
 
+@dataclass
+class OtaConfig:
+    # device id -> app directory (relative to the working directory)
+    devices: Dict[str, str]
+    mpy: bool
+    chunk_size: int
+    timeout_s: float
+
+
 @dataclass
 class AppConfig:
     server: ServerConfig
     log: LogConfig
     routes: List[RouteConfig]
     ws_actions: Dict[str, WsActionConfig]
+    # Extra actions for the binary action table (the ws_actions are always in it)
+    actions: List[str]
+    ota: OtaConfig
 
 
 def load_config(path: str) -> AppConfig:
@@ -46,6 +58,7 @@ def load_config(path: str) -> AppConfig:
     log = raw.get("log", {})
     routes_raw = raw.get("routes", [])
     ws_actions_raw = raw.get("ws_actions", {})
+    ota = raw.get("ota", {})
 
     return AppConfig(
         server=ServerConfig(
@@ -72,5 +85,12 @@ def load_config(path: str) -> AppConfig:
                 action=cfg["action"]
             )
             for action_name, cfg in ws_actions_raw.items()
-        }
+        },
+        actions=list(raw.get("actions", [])),
+        ota=OtaConfig(
+            devices=dict(ota.get("devices", {})),
+            mpy=bool(ota.get("mpy", False)),
+            chunk_size=int(ota.get("chunk_size", 1024)),
+            timeout_s=float(ota.get("timeout_s", 10)),
+        ),
     )
\ No newline at end of file
@@ -0,0 +1,201 @@
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.frames.frame import Frame
+
+# First byte of every binary message holding frames
+MAGIC = 0xF1
+
+# Action sent (as JSON) to binary clients with the action-ID table
+ACTION_TABLE = "00-action-table"
+
+# <DEVICE TYPE>-<HEX Color code>, see documentations/communication/spec
+SENDER_TYPES = ("ESP32", "RVR", "SPHERO", "IPHONE", "SERVER", "ARD", "STM32")
+SENDER_INLINE = 7
+
+# Value tags
+T_NULL = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_FLOAT = 4
+T_STR = 5
+T_JSON = 6
+
+
+class ActionTable:
+    """
+    Action <-> id mapping announced to binary clients. Id 0 means "action sent inline".
+    """
+
+    def __init__(self, actions: Sequence[str]) -> None:
+        self.actions: List[str] = list(dict.fromkeys(actions))
+        self.ids: Dict[str, int] = {action: i + 1 for i, action in enumerate(self.actions)}
+
+    def action(self, action_id: int) -> str:
+        if not 0 < action_id <= len(self.actions):
+            raise RuntimeError(f"BinaryFrame: Unknown action id {action_id}")
+        return self.actions[action_id - 1]
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(buf: bytes, i: int) -> Tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _write_str(out: bytearray, s: str) -> None:
+    data = s.encode("utf-8")
+    _write_varint(out, len(data))
+    out.extend(data)
+
+
+def _read_str(buf: bytes, i: int) -> Tuple[str, int]:
+    n, i = _read_varint(buf, i)
+    return buf[i:i + n].decode("utf-8"), i + n
+
+
+def _sender_code(sender_id: str) -> Optional[int]:
+    sep = sender_id.rfind("-")
+    if sep < 0 or sender_id[:sep] not in SENDER_TYPES or len(sender_id) - sep - 1 != 6:
+        return None
+    try:
+        color = int(sender_id[sep + 1:], 16)
+    except ValueError:
+        return None
+    # Decoded as uppercase hex: other spellings (lowercase) are sent inline to come back unchanged
+    if "%06X" % color != sender_id[sep + 1:]:
+        return None
+    return (color << 3) | SENDER_TYPES.index(sender_id[:sep])
+
+
+def _is_float32(value: float) -> bool:
+    """
+    True when the value survives float32. The others (0.1, ...) go as JSON, with their full precision.
+    """
+    try:
+        return value != value or struct.unpack("<f", struct.pack("<f", value))[0] == value
+    except OverflowError:
+        return False
+
+
+def _write_value(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(T_NULL)
+    elif value is False:
+        out.append(T_FALSE)
+    elif value is True:
+        out.append(T_TRUE)
+    elif isinstance(value, int):
+        out.append(T_INT)
+        _write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)
+    elif isinstance(value, float) and _is_float32(value):
+        out.append(T_FLOAT)
+        out.extend(struct.pack("<f", value))
+    elif isinstance(value, str):
+        out.append(T_STR)
+        _write_str(out, value)
+    else:
+        out.append(T_JSON)
+        _write_str(out, json.dumps(value, ensure_ascii=False))
+
+
+def _read_value(buf: bytes, i: int) -> Tuple[Any, int]:
+    tag = buf[i]
+    i += 1
+    if tag == T_NULL:
+        return None, i
+    if tag == T_FALSE:
+        return False, i
+    if tag == T_TRUE:
+        return True, i
+    if tag == T_INT:
+        n, i = _read_varint(buf, i)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), i
+    if tag == T_FLOAT:
+        return struct.unpack("<f", buf[i:i + 4])[0], i + 4
+    if tag == T_STR:
+        return _read_str(buf, i)
+    if tag == T_JSON:
+        raw, i = _read_str(buf, i)
+        return json.loads(raw), i
+    raise RuntimeError(f"BinaryFrame: Unknown value tag {tag}")
+
+
+def is_binary(data: bytes) -> bool:
+    return len(data) > 0 and data[0] == MAGIC
+
+
+def encode(frames: Sequence[Frame], table: ActionTable) -> bytes:
+    """
+    Encodes frames as one binary message. Actions missing from the table are sent inline.
+    """
+    out = bytearray([MAGIC])
+    for frame in frames:
+        action_id = table.ids.get(frame.action, 0)
+        _write_varint(out, action_id)
+        if action_id == 0:
+            _write_str(out, frame.action)
+
+        _write_varint(out, max(0, int(frame.timestamp)))
+
+        code = _sender_code(frame.sender_id)
+        if code is None:
+            _write_varint(out, SENDER_INLINE)
+            _write_str(out, frame.sender_id)
+        else:
+            _write_varint(out, code)
+
+        _write_value(out, frame.value)
+    return bytes(out)
+
+
+def decode(data: bytes, table: ActionTable) -> List[Frame]:
+    """
+    Decodes a binary message into frames, in order.
+    Each frame gets its JSON equivalent in `raw_json` for JSON clients and logs.
+    """
+    if not is_binary(data):
+        raise RuntimeError("BinaryFrame: Bad magic")
+
+    frames: List[Frame] = []
+    i = 1
+    while i < len(data):
+        action_id, i = _read_varint(data, i)
+        if action_id == 0:
+            action, i = _read_str(data, i)
+        else:
+            action = table.action(action_id)
+
+        timestamp, i = _read_varint(data, i)
+
+        code, i = _read_varint(data, i)
+        if code & 0x07 == SENDER_INLINE:
+            sender_id, i = _read_str(data, i)
+        else:
+            sender_id = "%s-%06X" % (SENDER_TYPES[code & 0x07], code >> 3)
+
+        value, i = _read_value(data, i)
+
+        metadata = {"timestamp": timestamp, "senderId": sender_id}
+        frames.append(Frame(
+            metadata=metadata,
+            action=action,
+            value=value,
+            raw_json=json.dumps({"metadata": metadata, "action": action, "value": value}, ensure_ascii=False),
+        ))
+    return frames
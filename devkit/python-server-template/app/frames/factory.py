@@ -10,7 +10,8 @@ def frame(
 ) -> Dict[str, Any]:
     return {
         "metadata": {
-            "timestamp": time.time(),
+            # Whole seconds, like the devices and the binary frames
+            "timestamp": int(time.time()),
             "senderId": sender,
         },
         "action": action,
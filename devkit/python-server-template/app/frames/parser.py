@@ -1,14 +1,19 @@
 import json
 from aiohttp import web
+from typing import Any, List, Union
 from app.frames.frame import Frame
 
 
 class FrameParser:
-    def __init__(self, raw_frame: str):
-        try:
-            self.frame = json.loads(raw_frame)
-        except Exception as e:
-            raise RuntimeError(f"FrameParser: Cannot load JSON. Reason: {e}")
+    def __init__(self, raw_frame: Union[str, dict]):
+        # Items of a batch are already decoded
+        if isinstance(raw_frame, dict):
+            self.frame = raw_frame
+        else:
+            try:
+                self.frame = json.loads(raw_frame)
+            except Exception as e:
+                raise RuntimeError(f"FrameParser: Cannot load JSON. Reason: {e}")
 
         self._validate()
 
@@ -40,14 +45,45 @@ class FrameParser:
             raise RuntimeError(f"FrameParser: Validation errors: {errors}")
 
     def parse(self) -> Frame:
+        # Timestamps are whole seconds (see the spec): a JSON client sending fractions gets the same
+        # frame over JSON and over the binary path
+        metadata = self.frame["metadata"]
+        if isinstance(metadata.get("timestamp"), float):
+            metadata["timestamp"] = int(metadata["timestamp"])
         return Frame(
-            metadata=self.frame["metadata"],
+            metadata=metadata,
             action=self.frame["action"],
             value=self.frame.get("value", None),
             raw_json=json.dumps(self.frame, ensure_ascii=False),
         )
 
 
+def is_batch(raw: str) -> bool:
+    return raw.lstrip().startswith("[")
+
+
+def parse_batch(raw: str) -> List[Frame]:
+    """
+    Parses a JSON array of frames, keeping their order.
+    Invalid items are skipped so one bad frame does not drop the whole batch.
+    """
+    try:
+        items: Any = json.loads(raw)
+    except Exception as e:
+        raise RuntimeError(f"FrameParser: Cannot load JSON. Reason: {e}")
+
+    if not isinstance(items, list):
+        raise RuntimeError("FrameParser: Batch root must be a JSON array")
+
+    frames: List[Frame] = []
+    for index, item in enumerate(items):
+        try:
+            frames.append(FrameParser(item).parse())
+        except Exception as e:
+            print(f"[WS] Invalid frame #{index} ignored in batch: {e}")
+    return frames
+
+
 async def parse_frame_from_request(request: web.Request) -> Frame:
     """
     Reads HTTP JSON body and validates it as the new Frame format.
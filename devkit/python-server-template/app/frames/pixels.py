@@ -0,0 +1,101 @@
+import struct
+from typing import Iterable, Optional, Tuple
+
+# First byte of a pixel stream message (see the communication spec)
+MAGIC = 0xF2
+FLAG_DELTA = 1
+FLAG_KEY = 2
+
+# A run header (skip, count) costs 4 bytes: unchanged gaps shorter than this are sent with the run
+_MIN_GAP = 2
+
+
+def grb(pixels: Iterable[Tuple[int, int, int]]) -> bytes:
+    """
+    RGB tuples to the NeoPixel buffer order of the devices.
+    """
+    out = bytearray()
+    for r, g, b in pixels:
+        out.append(g & 0xFF)
+        out.append(r & 0xFF)
+        out.append(b & 0xFF)
+    return bytes(out)
+
+
+def _header(name: str, flags: int, seq: int) -> bytearray:
+    data = name.encode("ascii")
+    if len(data) > 255:
+        raise ValueError(f"PixelStream: segment name too long: {name}")
+    out = bytearray(struct.pack("<BBHB", MAGIC, flags, seq & 0xFFFF, len(data)))
+    out.extend(data)
+    return out
+
+
+def encode_raw(name: str, seq: int, frame: bytes, start: int = 0, key: bool = False) -> bytes:
+    out = _header(name, FLAG_KEY if key else 0, seq)
+    out.extend(struct.pack("<H", start))
+    out.extend(frame)
+    return bytes(out)
+
+
+def encode_delta(name: str, seq: int, frame: bytes, previous: bytes) -> bytes:
+    """
+    Only the pixels that changed since `previous` (same length), as runs.
+    """
+    out = _header(name, FLAG_DELTA, seq)
+    n = len(frame) // 3
+    pos = 0  # first pixel not covered by a run yet
+    i = 0
+    while i < n:
+        if frame[i * 3:i * 3 + 3] == previous[i * 3:i * 3 + 3]:
+            i += 1
+            continue
+        start = i
+        end = i + 1
+        gap = 0
+        i += 1
+        while i < n and gap < _MIN_GAP:
+            if frame[i * 3:i * 3 + 3] == previous[i * 3:i * 3 + 3]:
+                gap += 1
+            else:
+                gap = 0
+                end = i + 1
+            i += 1
+        i = end
+        out.extend(struct.pack("<HH", start - pos, end - start))
+        out.extend(frame[start * 3:end * 3])
+        pos = end
+    return bytes(out)
+
+
+class PixelStream:
+    """
+    Encoder of the frames sent to one segment of one client: keeps the sequence number and the last
+    frame, and sends each frame raw or as a delta, whichever is smaller.
+    """
+
+    def __init__(self, name: str, pixels: int) -> None:
+        self.name = name
+        self.pixels = pixels
+        self.seq = 0
+        self._previous: Optional[bytes] = None
+
+    def encode(self, frame: bytes) -> bytes:
+        """
+        `frame`: GRB bytes (see `grb`), cut or padded with black to the segment length.
+        """
+        size = self.pixels * 3
+        # Copied: the caller may reuse its buffer for the next frame
+        frame = bytes(frame[:size]).ljust(size, b"\x00")
+        seq = self.seq
+        self.seq = (seq + 1) & 0xFFFF
+
+        if self._previous is None:
+            message = encode_raw(self.name, seq, frame, key=True)
+        else:
+            message = encode_delta(self.name, seq, frame, self._previous)
+            # Raw: 5 bytes header, the name, the first pixel (2 bytes) and the frame
+            if len(message) > 7 + len(self.name.encode("ascii")) + size:
+                message = encode_raw(self.name, seq, frame)
+        self._previous = frame
+        return message
@@ -0,0 +1,31 @@
+import asyncio
+from aiohttp import web
+from app.http_controllers.base import HttpController
+from app.ota import OtaError
+
+
+class Controller(HttpController):
+
+    async def deploy(self, request: web.Request) -> web.Response:
+        """
+        Expects {"devices": [...]} (default: every device of ota.devices that is connected).
+        Updates them in parallel and returns one result per device.
+        """
+        try:
+            body = await request.json() if request.can_read_body else {}
+        except Exception:
+            return web.json_response(self.build_frame("00-ota", "body must be JSON"), status=400)
+
+        deployer = self.app["ota"]
+        devices = body.get("devices")
+        if devices is None:
+            devices = [d for d in deployer.cfg.devices if self.hub._setted_clients.get(d) is not None]
+
+        async def deploy(device_id: str) -> dict:
+            try:
+                return {"ok": True, **await deployer.deploy(device_id)}
+            except OtaError as e:
+                return {"ok": False, "device": device_id, "error": str(e)}
+
+        results = await asyncio.gather(*(deploy(d) for d in devices))
+        return web.json_response(self.build_frame("00-ota", list(results)))
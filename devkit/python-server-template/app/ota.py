@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from app.config import OtaConfig
+
+# Same as framework/utils/ota.py on the devices
+MANIFEST_REQUEST_ACTION = "00-ota-manifest-request"
+BEGIN_ACTION = "00-ota-begin"
+COMMIT_ACTION = "00-ota-commit"
+MAGIC = 0xF3
+EXCLUDE = ("config.json", "config.cache.json", "warm_state.json", "tunables.json", "ota.journal", "__pycache__")
+# Code files of the app: the ones missing from the local tree are deleted from the device
+CODE_SUFFIXES = (".py", ".mpy")
+# Run as source by the firmware, never compiled
+ENTRY_POINTS = ("boot.py", "main.py")
+
+
+class OtaError(Exception):
+    pass
+
+
+def file_hash(data: bytes) -> str:
+    """
+    First 8 bytes of the SHA-256, in hex (the hash of the device manifests).
+    """
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _compile(path: str) -> Optional[bytes]:
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.mpy")
+        result = subprocess.run(["mpy-cross", "-o", out, path], capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"[OTA] mpy-cross failed on {path}, sent as source: {result.stderr.strip()}")
+            return None
+        with open(out, "rb") as f:
+            return f.read()
+
+
+def local_tree(root: str, mpy: bool = False) -> Dict[str, bytes]:
+    """
+    {device path: content} of an app directory, as it would be copied with `mpremote cp -r app/* :`.
+    With `mpy`, the modules are precompiled (`mpy-cross` must be installed).
+    """
+    if mpy and shutil.which("mpy-cross") is None:
+        raise OtaError("mpy-cross not found")
+    files: Dict[str, bytes] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDE and not d.startswith("."))
+        for name in sorted(filenames):
+            if name in EXCLUDE or name.startswith(".") or name.endswith(".ota"):
+                continue
+            full = os.path.join(dirpath, name)
+            path = os.path.relpath(full, root).replace(os.sep, "/")
+            if mpy and path.endswith(".py") and path not in ENTRY_POINTS:
+                compiled = _compile(full)
+                if compiled is not None:
+                    files[path[:-3] + ".mpy"] = compiled
+                    continue
+            with open(full, "rb") as f:
+                files[path] = f.read()
+    return files
+
+
+def _parent(path: str) -> str:
+    return path.rpartition("/")[0]
+
+
+def plan(local: Dict[str, bytes], remote: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """
+    Files to send (missing or different on the device) and code files to delete from it.
+    Only the code files of directories the app has are deleted: libraries installed on the
+    board apart from the app (`mip` in `lib/`) are left alone.
+    """
+    changed = [path for path, data in local.items() if remote.get(path) != file_hash(data)]
+    app_dirs = {_parent(path) for path in local}
+    delete = sorted(
+        path for path in remote
+        if path not in local and path.endswith(CODE_SUFFIXES) and _parent(path) in app_dirs
+    )
+    return changed, delete
+
+
+class OtaDeployer:
+    """
+    Sends the files that changed in a device's app directory (`ota.devices` in config.json) over its
+    websocket, then has it commit and reboot. One step at a time, each one acknowledged by a
+    `00-ota-status` frame of the device (fed by app.ws_controllers.ota).
+    """
+
+    def __init__(self, app: web.Application, cfg: OtaConfig) -> None:
+        self.app = app
+        self.cfg = cfg
+        self._inbox: Dict[str, asyncio.Queue] = {}
+
+    def feed(self, device_id: str, value: dict) -> None:
+        queue = self._inbox.get(device_id)
+        if queue is not None:
+            queue.put_nowait(value)
+
+    async def _wait(self, device_id: str, *states: str, index: Optional[int] = None) -> dict:
+        """
+        Next status in `states` (for `index` only, when given), the others are skipped.
+        """
+        queue = self._inbox[device_id]
+        while True:
+            try:
+                value = await asyncio.wait_for(queue.get(), self.cfg.timeout_s)
+            except asyncio.TimeoutError:
+                raise OtaError(f"{device_id}: no answer (waiting for {'/'.join(states)})")
+            state = value.get("state")
+            if state == "error":
+                raise OtaError(f"{device_id}: {value.get('error')}")
+            if state in states and (index is None or value.get("index") == index):
+                return value
+
+    async def deploy(self, device_id: str) -> dict:
+        root = self.cfg.devices.get(device_id)
+        if root is None:
+            raise OtaError(f"{device_id}: no app directory in ota.devices")
+        hub = self.app["hub"]
+        ws = hub._setted_clients.get(device_id)
+        if ws is None or ws.closed:
+            raise OtaError(f"{device_id}: not connected")
+        if device_id in self._inbox:
+            raise OtaError(f"{device_id}: update already running")
+
+        self._inbox[device_id] = asyncio.Queue()
+        try:
+            local = local_tree(root, self.cfg.mpy)
+
+            await hub.send_action(ws, MANIFEST_REQUEST_ACTION, {"device": device_id})
+            manifest = await self._wait(device_id, "manifest")
+            changed, delete = plan(local, manifest.get("files", {}))
+            summary = {"device": device_id, "files": changed, "delete": delete,
+                       "bytes": sum(len(local[path]) for path in changed)}
+            if not changed and not delete:
+                print(f"[OTA] {device_id}: up to date")
+                return summary
+
+            print(f"[OTA] {device_id}: {len(changed)} file(s), {summary['bytes']} bytes, {len(delete)} to delete")
+            await hub.send_action(ws, BEGIN_ACTION, {
+                "device": device_id,
+                "files": [[path, len(local[path]), file_hash(local[path])] for path in changed],
+                "delete": delete,
+            })
+            await self._wait(device_id, "ready")
+
+            size = self.cfg.chunk_size
+            for index, path in enumerate(changed):
+                data = local[path]
+                for offset in range(0, len(data), size):
+                    await ws.send_bytes(struct.pack("<BHI", MAGIC, index, offset) + data[offset:offset + size])
+                await self._wait(device_id, "file", index=index)
+
+            await hub.send_action(ws, COMMIT_ACTION, {"device": device_id})
+            await self._wait(device_id, "done")
+            print(f"[OTA] {device_id}: done, rebooting")
+            return summary
+        finally:
+            del self._inbox[device_id]
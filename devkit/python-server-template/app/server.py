@@ -4,8 +4,20 @@ from app.config import AppConfig
 from app.ws_hub import WsHub
 from app.http_router import mount_routes
 from app.ws_router import WsActionDispatcher
-from app.frames.parser import FrameParser
+from app.frames.frame import Frame
+from app.frames.parser import FrameParser, is_batch, parse_batch
+from app.frames.binary import ActionTable, decode
 from app.log import Logger
+from app.ota import OtaDeployer
+
+
+async def dispatch_frame(dispatcher: WsActionDispatcher, frame: Frame, ws: web.WebSocketResponse) -> bool:
+    # If action is configured, call controller
+    try:
+        return await dispatcher.dispatch(frame, ws)
+    except Exception as e:
+        print(f"[WS] Handler error for action={frame.action}: {e}")
+        return True  # treated as handled, but failed
 
 
 async def ws_handler(request: web.Request) -> web.WebSocketResponse:
@@ -18,11 +30,41 @@ async def ws_handler(request: web.Request) -> web.WebSocketResponse:
 
     try:
         async for msg in ws:
+            # Binary frames: dispatch every frame in order, broadcast once
+            if msg.type == WSMsgType.BINARY:
+                try:
+                    frames = decode(msg.data, hub.action_table)
+                except Exception as e:
+                    print(f"[WS] Invalid binary message ignored: {e}")
+                    continue
+
+                for frame in frames:
+                    await dispatch_frame(dispatcher, frame, ws)
+
+                if frames:
+                    await hub.broadcast_frames(frames)
+                continue
+
             if msg.type != WSMsgType.TEXT:
                 continue
 
             raw = msg.data
 
+            # Batched payload: dispatch every frame in order, broadcast once
+            if is_batch(raw):
+                try:
+                    frames = parse_batch(raw)
+                except Exception as e:
+                    print(f"[WS] Invalid batch ignored: {e}")
+                    continue
+
+                for frame in frames:
+                    await dispatch_frame(dispatcher, frame, ws)
+
+                if frames:
+                    await hub.broadcast_frames(frames)
+                continue
+
             # Validate + parse new frame
             try:
                 frame = FrameParser(raw).parse()
@@ -31,20 +73,15 @@ async def ws_handler(request: web.Request) -> web.WebSocketResponse:
                 print(f"[WS] Invalid frame ignored: {e}")
                 continue
 
-            # If action is configured, call controller
-            try:
-                handled = await dispatcher.dispatch(frame, ws)
-            except Exception as e:
-                print(f"[WS] Handler error for action={frame.action}: {e}")
-                handled = True  # treated as handled, but failed
+            handled = await dispatch_frame(dispatcher, frame, ws)
 
             # Broadcast behavior:
             # - if you still want to broadcast everything, keep this:
-            await hub.broadcast(raw)
+            await hub.broadcast_frames([frame])
 
             # OR if you want broadcast only when not handled:
             # if not handled:
-            #     await hub.broadcast(raw, sender=ws)
+            #     await hub.broadcast_frames([frame])
 
     finally:
         await hub.remove(ws)
@@ -57,8 +94,11 @@ def build_app(cfg: AppConfig) -> web.Application:
 
     app["server_id"] = cfg.server.id
     app["logger"] = Logger(cfg.log.filepath)
+    # Dispatched actions first, then the ones only broadcast
+    app["action_table"] = ActionTable(list(cfg.ws_actions) + cfg.actions)
     app["hub"] = WsHub(app)
     app["ws_dispatcher"] = WsActionDispatcher(app, cfg)
+    app["ota"] = OtaDeployer(app, cfg.ota)
 
     # websocket route
     app.router.add_get(cfg.server.ws_path, ws_handler)
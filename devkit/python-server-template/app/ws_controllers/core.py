@@ -11,7 +11,15 @@ class Controller(WsController):
         await self.hub.send_action(ws, "pong", "pong")
 
     async def on_new_connection(self, frame: Frame, ws: web.WebSocketResponse) -> None:
-        await self.hub.set_client(frame.sender_id, ws)
+        # Devices may announce their capabilities, e.g. {"batch": true, "binary": true, "pixels": {"flow": 60}}
+        capabilities = frame.value if isinstance(frame.value, dict) else {}
+        await self.hub.set_client(
+            frame.sender_id,
+            ws,
+            batch=capabilities.get("batch") is True,
+            binary=capabilities.get("binary") is True,
+            pixels=capabilities.get("pixels") if isinstance(capabilities.get("pixels"), dict) else None,
+        )
 
     async def on_get_connected_clients(self, frame: Frame, ws: web.WebSocketResponse) -> None:
         data: List[dict] = []
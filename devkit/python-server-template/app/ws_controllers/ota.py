@@ -0,0 +1,17 @@
+from aiohttp import web
+from app.ws_controllers.base import WsController
+from app.frames.frame import Frame
+
+
+class Controller(WsController):
+    """
+    Hands the OTA answers of the devices to the deployer (app.ota) waiting for them.
+    """
+
+    async def on_ota_manifest(self, frame: Frame, ws: web.WebSocketResponse) -> None:
+        value = frame.value if isinstance(frame.value, dict) else {}
+        self.app["ota"].feed(value.get("device", frame.sender_id), {"state": "manifest", **value})
+
+    async def on_ota_status(self, frame: Frame, ws: web.WebSocketResponse) -> None:
+        value = frame.value if isinstance(frame.value, dict) else {}
+        self.app["ota"].feed(value.get("device", frame.sender_id), value)
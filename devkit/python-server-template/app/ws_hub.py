@@ -1,25 +1,47 @@
 import json
 import asyncio
 from aiohttp import web
-from typing import Optional
+from typing import List, Optional
 from app.frames.factory import frame
+from app.frames.frame import Frame
+from app.frames.binary import ACTION_TABLE, ActionTable, encode
+from app.frames.pixels import PixelStream, grb
 from app.log import Logger
 
 class WsHub:
     def __init__(self, app: web.Application) -> None:
         self.server_id: str = app["server_id"]
         self.logger: Logger = app["logger"]
+        self.action_table: ActionTable = app["action_table"]
         self._setted_clients: dict = {}
         self._clients: set[web.WebSocketResponse] = set()
+        # Clients that announced they can read a batch (JSON array of frames)
+        self._batch_clients: set[web.WebSocketResponse] = set()
+        # Clients that negotiated binary frames (they received the action table)
+        self._binary_clients: set[web.WebSocketResponse] = set()
+        # Strip segments announced by the clients, with their pixel stream encoder
+        self._pixel_streams: dict = {}
         self._lock = asyncio.Lock()
 
-    async def set_client(self, id: str, ws: web.WebSocketResponse) -> None:
+    async def set_client(self, id: str, ws: web.WebSocketResponse, batch: bool = False, binary: bool = False,
+                         pixels: Optional[dict] = None) -> None:
         async with self._lock:
             if ws not in self._clients:
                 return
             self.logger.log("WS AUTHENTICATION", id)
             print(f"[WS] New client setted: {id}.")
             self._setted_clients[id] = ws
+            if batch:
+                self._batch_clients.add(ws)
+            if pixels:
+                # A new connection starts new streams: the first frame is sent whole
+                self._pixel_streams[ws] = {name: PixelStream(name, count) for name, count in pixels.items()}
+
+        if binary:
+            # The table has to reach the client before its first binary message
+            await self.send_action(ws, ACTION_TABLE, self.action_table.actions)
+            async with self._lock:
+                self._binary_clients.add(ws)
 
         await self.broadcast_action("00-new-client", id)
 
@@ -48,7 +70,13 @@ class WsHub:
             self.logger.log("WS DISCONNECT", client_id or "UNAUTHENTICATED")
             if client_id is None:
                 print("[WS] client disconnected.")
-            self._clients.discard(ws)
+            self._discard(ws)
+
+    def _discard(self, ws: web.WebSocketResponse) -> None:
+        self._clients.discard(ws)
+        self._batch_clients.discard(ws)
+        self._binary_clients.discard(ws)
+        self._pixel_streams.pop(ws, None)
 
     async def count(self) -> int:
         async with self._lock:
@@ -72,6 +100,26 @@ class WsHub:
         ))
         await self.send_message(ws, message)
 
+    async def send_pixels(self, id: str, segment: str, pixels) -> bool:
+        """
+        Streams a frame to a strip segment of a client, as a binary message (raw, or only the pixels
+        that changed). `pixels`: RGB tuples, or GRB bytes. Frames are not logged.
+        Returns False when the client is not connected or has no such segment.
+        """
+        async with self._lock:
+            ws = self._setted_clients.get(id)
+            stream = self._pixel_streams.get(ws, {}).get(segment) if ws is not None else None
+        if stream is None or ws.closed:
+            return False
+        frame = pixels if isinstance(pixels, (bytes, bytearray)) else grb(pixels)
+        try:
+            await ws.send_bytes(stream.encode(frame))
+        except Exception:
+            async with self._lock:
+                self._discard(ws)
+            return False
+        return True
+
     async def broadcast_action(self, action: str, value) -> int:
         message = json.dumps(frame(
             sender=self.server_id,
@@ -103,6 +151,57 @@ class WsHub:
         if dead:
             async with self._lock:
                 for ws in dead:
-                    self._clients.discard(ws)
+                    self._discard(ws)
+
+        return sent
+
+    async def broadcast_frames(self, frames: List[Frame]) -> int:
+        """
+        Broadcasts parsed frames with a single serialization per encoding and a single log line.
+        - binary clients get one binary message
+        - clients that announced batch support get one JSON array
+        - the others get one JSON message per frame
+        """
+        if len(frames) == 1:
+            batch = frames[0].raw_json
+        else:
+            batch = "[" + ",".join(f.raw_json for f in frames) + "]"
+
+        async with self._lock:
+            clients = list(self._clients)
+            batch_clients = set(self._batch_clients)
+            binary_clients = set(self._binary_clients)
+
+        if not clients:
+            return 0
+
+        self.logger.log("WS MESSAGE", batch)
+        print(f"> {batch}")
+
+        packed = encode(frames, self.action_table) if binary_clients else b""
+
+        dead: list[web.WebSocketResponse] = []
+        sent = 0
+
+        for ws in clients:
+            if ws.closed:
+                dead.append(ws)
+                continue
+            try:
+                if ws in binary_clients:
+                    await ws.send_bytes(packed)
+                elif ws in batch_clients or len(frames) == 1:
+                    await ws.send_str(batch)
+                else:
+                    for f in frames:
+                        await ws.send_str(f.raw_json)
+                sent += 1
+            except Exception:
+                dead.append(ws)
+
+        if dead:
+            async with self._lock:
+                for ws in dead:
+                    self._discard(ws)
 
         return sent
\ No newline at end of file
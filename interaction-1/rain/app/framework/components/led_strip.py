@@ -1,7 +1,12 @@
 from framework.app import App
 from machine import Pin
 from neopixel import NeoPixel
-from framework.utils.frames.frame import Frame
+from time import ticks_ms, ticks_diff, ticks_add
+from framework.utils import kernels
+from framework.utils import health
+
+# Channel units (0..255 per channel, summed over the strip) per amp: 20 mA per channel at 255
+UNITS_PER_AMP = int(255 / 0.02)
 
 def scale_rgb_for_power(
     max_current_a: float,
@@ -44,26 +49,191 @@ def scale_rgb_for_power(
 
 
 class LedStrip:
-    def __init__(self, pin, pixel_num, max_current=2, default_color=(255, 255, 255)):
+    """
+    NeoPixel strip with a frame-rate governor.
+
+    With `fps` set, `display()` shows at most `fps` frames per second: a frame asked for too soon
+    is shown at the next render tick (an App update hook), replacing the ones asked for in between
+    (counted in `dropped`). The health policy can lower the frame rate further.
+    `animate(render)` calls `render(pixels)` only at render ticks, so animations computed from
+    the elapsed time don't compute frames that are never shown.
+    `show_buffer(fill)` does the same for sources that write the NeoPixel buffer themselves.
+    """
+
+    def __init__(self, pin, pixel_num, max_current=2, default_color=(255, 255, 255), fps=None):
         self.pixel_num = pixel_num
         self.np = NeoPixel(Pin(pin), pixel_num)
         self.max_current = max_current
+        self.max_units = int(max_current * UNITS_PER_AMP)
         self.default_color = scale_rgb_for_power(max_current, pixel_num, default_color)
+        # Pixels can be packed straight into the NeoPixel buffer when it is 3 bytes GRB
+        self._packed = getattr(self.np, "bpp", 3) == 3 and tuple(self.np.ORDER[:3]) == (1, 0, 2)
+        self._scaled = (None, None)
+        # Dimmed copy of the buffer, written instead of it: np.buf keeps the frame as it was filled
+        self._dimmed = None
+        self._units = 0
+
+        # Governor
+        self.fps = fps
+        self.frames = 0           # frames written to the strip
+        self.dropped = 0          # frames replaced before they were shown
+        self.achieved_fps = 0     # over the last second
+        self._last_frame = None
+        self._pending = False
+        self._render = None
+        self._fill = None
+        self._ticking = False
+        self._window_start = None
+        self._window_frames = 0
 
         self.pixels = [(0, 0, 0)] * pixel_num
         self.display()
 
     def scale_color(self, color):
-        return scale_rgb_for_power(self.max_current, len(self.pixels), color) if color is not None else None
+        if color is None:
+            return None
+        # Same color over and over (fill, next_pixel): scale it once
+        last, scaled = self._scaled
+        if color != last:
+            scaled = scale_rgb_for_power(self.max_current, len(self.pixels), color)
+            self._scaled = (color, scaled)
+        return scaled
+
+    def frame_ms(self):
+        """
+        Minimum time between two frames: the target fps or the health policy, the slowest wins.
+        """
+        ms = 1000 // self.fps if self.fps else 0
+        return max(ms, health.policy.frame_ms)
 
     def display(self):
-        for i, c in enumerate(self.pixels):
-            self.np[i] = c
-        self.np.write()
+        interval = self.frame_ms()
+        if interval:
+            now = ticks_ms()
+            if self._last_frame is None:
+                self._last_frame = now
+            else:
+                late = ticks_diff(now, self._last_frame)
+                if late < interval:
+                    if self._pending:
+                        self.dropped += 1
+                    self._pending = True
+                    self._start_ticks()
+                    return
+                # Keep the cadence, unless a whole frame behind
+                self._last_frame = ticks_add(self._last_frame, interval) if late < 2 * interval else now
+        self._pending = False
+        self._write()
+
+    def animate(self, render=None):
+        """
+        Call `render(pixels)` at every render tick and show the result. None stops the animation.
+        """
+        self._render = render
+        if render is not None:
+            self._start_ticks()
+
+    def show_buffer(self, fill):
+        """
+        Show a frame written straight into `np.buf` by `fill()`, called right before the frame is
+        written (at the next render tick when the governor holds it back).
+        """
+        self._fill = fill
+        self.display()
+
+    def stats(self):
+        return {"fps": self.fps, "achieved_fps": self.achieved_fps, "frames": self.frames, "dropped": self.dropped}
+
+    def _start_ticks(self):
+        # The render tick hook is only added to the loop once a strip needs it
+        if not self._ticking:
+            self._ticking = True
+            App().update.append(self._tick)
+
+    def _tick(self):
+        if self._render is None and not self._pending:
+            return
+        if self._last_frame is not None and ticks_diff(ticks_ms(), self._last_frame) < self.frame_ms():
+            return
+        if self._render is not None:
+            self._render(self.pixels)
+        self.display()
+
+    def _write(self):
+        if self._fill is not None:
+            fill = self._fill
+            self._fill = None
+            fill()
+            self.write_buffer()
+            return
+        if not self._packed:
+            for i, c in enumerate(self.pixels):
+                self.np[i] = c
+            self.np.write()
+            self._count_frame()
+            return
+        kernels.pack_rgb(self.np.buf, self.pixels)
+        self.write_buffer()
+
+    def write_buffer(self):
+        """
+        Show `np.buf` as it is (3 bytes per pixel, GRB), within the health policy and max_current.
+        For sources that fill the buffer themselves (animation player, pixel stream): `pixels` is left as is.
+        """
+        policy = health.policy
+        np = self.np
+        buf = np.buf
+        # Pixels written directly (animations) are not scaled by set_pixel / fill: keep the frame within max_current
+        budget = (self.max_units * policy.current) >> 8
+        units = kernels.sum_bytes(buf)
+        factor = policy.brightness
+        if (units * factor) >> 8 > budget:
+            factor = (budget << 8) // units
+        if factor >= 256:
+            self._units = units
+            np.write()
+            self._count_frame()
+            return
+        # Scaled on a copy: a pixel stream only refills its own segments, the other pixels
+        # must not be dimmed again at every frame
+        if self._dimmed is None or len(self._dimmed) != len(buf):
+            self._dimmed = bytearray(len(buf))
+        dimmed = self._dimmed
+        dimmed[:] = buf
+        kernels.scale(dimmed, factor)
+        self._units = (units * factor) >> 8
+        np.buf = dimmed
+        try:
+            np.write()
+        finally:
+            np.buf = buf
+        self._count_frame()
+
+    def _count_frame(self):
+        self.frames += 1
+        now = ticks_ms()
+        if self._window_start is None:
+            self._window_start = now
+        self._window_frames += 1
+        elapsed = ticks_diff(now, self._window_start)
+        if elapsed >= 1000:
+            self.achieved_fps = self._window_frames * 1000 // elapsed
+            self._window_start = now
+            self._window_frames = 0
+
+    def current(self):
+        """
+        Estimated current (A) of the frame last displayed.
+        """
+        if not self._packed:
+            return sum([c[0] + c[1] + c[2] for c in self.pixels]) / UNITS_PER_AMP
+        return self._units / UNITS_PER_AMP
 
     def fill(self, color=None):
-        for i in range(len(self.pixels)):
-            self.pixels[i] = self.scale_color(color) or self.default_color
+        c = self.scale_color(color) or self.default_color
+        pixels = self.pixels
+        for i in range(len(pixels)):
+            pixels[i] = c
 
     def clear(self):
         self.fill((0, 0, 0))
@@ -74,7 +244,13 @@ class LedStrip:
 
     def off(self):
         self.clear()
-        self.display()
+        if not self._packed or self.frame_ms():
+            self.display()
+            return
+        kernels.fill_rgb(self.np.buf, 0, self.pixel_num, 0)
+        self._units = 0
+        self.np.write()
+        self._count_frame()
 
     def set_pixel(self, i, color=None, show=False):
         if 0 <= i < len(self.pixels):
@@ -83,8 +259,9 @@ class LedStrip:
                 self.display()
 
     def _last_index_of_color(self, color=None):
+        c = self.scale_color(color) or self.default_color
         for i in range(len(self.pixels) - 1, -1, -1):
-            if self.pixels[i] == (self.scale_color(color) or self.default_color):
+            if self.pixels[i] == c:
                 return i
         return None
     
@@ -0,0 +1,165 @@
+import machine
+from array import array
+from time import ticks_us, ticks_ms, ticks_diff
+from framework.utils import log
+
+_log = log.get("loop")
+
+# Sent once the loop runs within budget again after slow iterations, and on request
+STALL_ACTION = "00-loop-stall"
+STATS_REQUEST_ACTION = "00-loop-stats-dump"
+STATS_ACTION = "00-loop-stats"
+
+# Upper bounds (ms) of the iteration time histogram, the last bucket counts everything above
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+# Stall events kept while the websocket is down
+MAX_EVENTS = 8
+
+
+def _hook_name(hook):
+    if isinstance(hook, str):
+        return hook
+    try:
+        name = hook.__name__
+    except AttributeError:
+        return repr(hook)
+    try:
+        return type(hook.__self__).__name__ + "." + name
+    except AttributeError:
+        return name
+
+
+class LoopMonitor:
+    """
+    Times every App loop iteration and every update hook.
+
+    - iteration times go to a histogram (`BUCKETS_MS`), sent as a `00-loop-stats` frame on request
+    - an iteration over `budget_ms` is a stall. Consecutive stalls make one event (count, worst
+      iteration, slowest hook), logged and sent as a `00-loop-stall` frame on the first iteration
+      back within budget: a loop that stays slow adds no log or websocket traffic
+    - the hardware watchdog (`wdt_ms`, 0: none) is fed at the end of the iterations, unless the last
+      `max_stalls` iterations all stalled: a loop that hangs, or only crawls, resets the board
+    """
+
+    def __init__(self, budget_ms=100, wdt_ms=0, max_stalls=10):
+        self.budget_us = budget_ms * 1000
+        self.wdt_ms = wdt_ms
+        self.max_stalls = max_stalls
+
+        self.histogram = array("I", bytes(4 * (len(BUCKETS_MS) + 1)))
+        self.iterations = 0
+        self.stalls = 0
+        self.max_us = 0
+        self.events = []
+        self.wdt = None
+
+        self._start = 0
+        self._mark = 0
+        self._worst = 0
+        self._worst_hook = None
+        self._consecutive = 0
+        # Current run of stalls: worst iteration (us), its slowest hook, end of the first stall (ms)
+        self._run_us = 0
+        self._run_hook = None
+        self._run_hook_us = 0
+        self._run_at = 0
+
+        if machine.reset_cause() == machine.WDT_RESET:
+            _log.warning("Reset by the watchdog")
+            self._event({"hook": None, "ms": None, "wdt_reset": True})
+
+    def start(self):
+        """
+        Start the hardware watchdog (it cannot be stopped afterwards).
+        """
+        if self.wdt_ms and self.wdt is None:
+            self.wdt = machine.WDT(timeout=self.wdt_ms)
+            _log.info("Watchdog started:", self.wdt_ms, "ms")
+
+    def begin(self):
+        self._start = self._mark = ticks_us()
+        self._worst = 0
+        self._worst_hook = None
+
+    def hook(self, hook):
+        # End of one hook (or step, by name): remember the slowest one of the iteration
+        now = ticks_us()
+        d = ticks_diff(now, self._mark)
+        self._mark = now
+        if d > self._worst:
+            self._worst = d
+            self._worst_hook = hook
+
+    def end(self):
+        d = ticks_diff(ticks_us(), self._start)
+        self.iterations += 1
+        if d > self.max_us:
+            self.max_us = d
+
+        ms = d // 1000
+        i = 0
+        last = len(BUCKETS_MS)
+        while i < last and ms >= BUCKETS_MS[i]:
+            i += 1
+        self.histogram[i] += 1
+
+        if d > self.budget_us:
+            self._stall(d)
+        elif self._consecutive:
+            self._recover()
+
+        if self.wdt is not None and self._consecutive < self.max_stalls:
+            self.wdt.feed()
+        if self.events and not self._consecutive:
+            self.flush()
+
+    def _stall(self, d):
+        self.stalls += 1
+        self._consecutive += 1
+        if self._consecutive == 1:
+            self._run_us = 0
+            self._run_at = ticks_ms()
+        if d > self._run_us:
+            self._run_us = d
+            self._run_hook = self._worst_hook
+            self._run_hook_us = self._worst
+
+    def _recover(self):
+        # First iteration within budget: the whole run of stalls becomes one event
+        count = self._consecutive
+        self._consecutive = 0
+        name = _hook_name(self._run_hook)
+        ms = self._run_us // 1000
+        hook_ms = self._run_hook_us // 1000
+        _log.warning("Loop stalled:", count, "iterations, worst", ms, "ms, slowest:", name, hook_ms, "ms")
+        self._event({"hook": name, "ms": ms, "hook_ms": hook_ms, "count": count, "at": self._run_at})
+        self._run_hook = None
+
+    def _event(self, event):
+        if len(self.events) >= MAX_EVENTS:
+            self.events.pop(0)
+        self.events.append(event)
+
+    def flush(self):
+        """
+        Send the pending stall events, when connected.
+        """
+        # Imported here: the websocket interface imports the App
+        from framework.utils.ws.interface import WebsocketInterface
+        ws = WebsocketInterface.connected()
+        if ws is None:
+            return
+        events = self.events
+        self.events = []
+        ws.send_value(STALL_ACTION, events)
+
+    def stats(self):
+        return {
+            "iterations": self.iterations,
+            "stalls": self.stalls,
+            "budget_ms": self.budget_us // 1000,
+            "max_ms": self.max_us // 1000,
+            "buckets_ms": list(BUCKETS_MS),
+            "histogram": list(self.histogram),
+        }
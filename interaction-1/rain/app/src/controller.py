@@ -1,4 +1,5 @@
 from framework.controller import Controller
+from framework.app import App
 from framework.components.dht_sensor import DHTSensor
 from framework.utils.gpio import GPIO
 from framework.utils.timer import Timer
@@ -13,11 +14,20 @@ class RainController(Controller):
     current_humidity = None
 
     is_raining = False
+    baseline_restored = False
 
     def setup(self):
         self.humidity_sensor = DHTSensor(GPIO.GPIO14, onHumidityChange=self.on_humidity_changed)
         self.baseline_update_timer = Timer(1000, self.update_humidity_baseline)
         self.rain_reset_timer = Timer(2000, self.reset_rain_state)
+        # Warm restart: keep the baseline of the previous boot, a rain already going on is still detected
+        App().warm.register("rain.baseline", lambda: self.baseline_humidity, self.restore_baseline)
+        # Live tuning (00-config-set)
+        App().tunables.attr("rain.humidity_delta", self, "HUMIDITY_DELTA_THRESHOLD", min=1, max=100)
+
+    def restore_baseline(self, humidity):
+        self.baseline_humidity = humidity
+        self.baseline_restored = True
 
     def on_humidity_changed(self, humidity):
         is_first_measure = self.current_humidity is None
@@ -25,7 +35,8 @@ class RainController(Controller):
 
         if is_first_measure:
             self.baseline_update_timer.start()
-            self.update_humidity_baseline()
+            if not self.baseline_restored:
+                self.update_humidity_baseline()
 
         if (
             self.current_humidity is not None
@@ -0,0 +1,146 @@
+import struct
+from time import ticks_ms, ticks_diff, ticks_add
+from framework.app import App
+from framework.utils import log
+
+_log = log.get("anim")
+
+# Animation file, built on a computer by devkit/python-animation-builder (little endian):
+#
+#   header  "MYAN", version (B), flags (B, bit 0: loop), pixels (H), frame_ms (H), records (I), reserved (H)
+#   records hold (H: number of frame_ms periods the frame stays on), then pixels * 3 bytes, GRB
+#
+# The pixel bytes are in the NeoPixel buffer order: a frame is copied as is.
+MAGIC = b"MYAN"
+VERSION = 1
+HEADER = "<4sBBHHIH"
+HEADER_SIZE = 16
+FLAG_LOOP = 1
+
+# A late player skips at most this many records to catch up, then restarts the timeline
+MAX_CATCH_UP = 8
+
+
+class AnimationPlayer:
+    """
+    Plays an animation file on a LedStrip: every frame is read from flash straight into the strip
+    buffer (`readinto`), nothing is computed or allocated per frame.
+
+        player = AnimationPlayer(strip, "anims/forest.anim", on_end=...)
+        player.play()
+
+    The strip shouldn't be displayed by anything else while the player is playing.
+    """
+
+    def __init__(self, strip, path, loop=None, on_end=None):
+        if not strip._packed:
+            raise ValueError("AnimationPlayer: the strip buffer must be 3 bytes per pixel, GRB")
+        self.strip = strip
+        self.path = path
+        self.on_end = on_end
+
+        self.f = open(path, "rb")
+        magic, version, flags, pixels, frame_ms, records, _ = struct.unpack(HEADER, self.f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            self.f.close()
+            raise ValueError(f"AnimationPlayer: {path} is not a version {VERSION} animation")
+        self.pixels = pixels
+        self.frame_ms = frame_ms
+        self.records = records
+        self.loop = bool(flags & FLAG_LOOP) if loop is None else loop
+
+        # The frame goes into the first pixels of the strip, what doesn't fit is skipped
+        frame_bytes = pixels * 3
+        shown = min(frame_bytes, len(strip.np.buf))
+        self._view = memoryview(strip.np.buf)[:shown]
+        self._skip = frame_bytes - shown
+        self._record_size = 2 + frame_bytes
+        self._hold = bytearray(2)
+
+        self.index = 0
+        self.playing = False
+        self._next = 0
+        self._registered = False
+
+    def play(self):
+        if self.playing:
+            return
+        if self.index == 0:
+            # Pixels past the end of the animation stay off
+            buf = self.strip.np.buf
+            for i in range(len(self._view), len(buf)):
+                buf[i] = 0
+        self.playing = True
+        self._next = ticks_ms()
+        if not self._registered:
+            self._registered = True
+            App().update.append(self.update)
+
+    def pause(self):
+        self.playing = False
+
+    def stop(self):
+        self.playing = False
+        self.rewind()
+
+    def rewind(self):
+        self.index = 0
+        self.f.seek(HEADER_SIZE)
+
+    def close(self):
+        self.stop()
+        if self._registered:
+            try:
+                App().update.remove(self.update)
+            except ValueError:
+                pass
+            self._registered = False
+        self.f.close()
+
+    def _read_hold(self):
+        if self.f.readinto(self._hold) != 2:
+            return 0
+        return self._hold[0] | (self._hold[1] << 8)
+
+    def update(self):
+        if not self.playing:
+            return
+        now = ticks_ms()
+        if ticks_diff(now, self._next) < 0:
+            return
+
+        # Behind by more than a frame: skip records (without reading their pixels) to stay on time
+        skipped = 0
+        while True:
+            if self.index >= self.records:
+                if not self.loop:
+                    self._end()
+                    return
+                self.rewind()
+            hold = self._read_hold()
+            if hold == 0:
+                _log.error("Truncated animation:", self.path)
+                self._end()
+                return
+            self.index += 1
+            due = ticks_add(self._next, hold * self.frame_ms)
+            if ticks_diff(now, due) < 0 or skipped >= MAX_CATCH_UP:
+                break
+            self.f.seek(self._record_size - 2, 1)
+            self._next = due
+            skipped += 1
+
+        if self.f.readinto(self._view) != len(self._view):
+            _log.error("Truncated animation:", self.path)
+            self._end()
+            return
+        if self._skip:
+            self.f.seek(self._skip, 1)
+        self.strip.write_buffer()
+
+        self._next = due if skipped < MAX_CATCH_UP else ticks_add(now, hold * self.frame_ms)
+
+    def _end(self):
+        self.stop()
+        if self.on_end:
+            self.on_end()
@@ -0,0 +1,146 @@
+import json
+from framework.utils import log
+
+_log = log.get("tunables")
+
+# {"device": id, "params": {name: value}, "persist": false}: answered with the values
+SET_ACTION = "00-config-set"
+# {"device": id}: answered with the values
+GET_ACTION = "00-config-get"
+VALUES_ACTION = "00-config-values"
+ACTIONS = (SET_ACTION, GET_ACTION)
+
+# Values set with "persist": applied again when the parameter is registered, at the next boots
+PERSIST_FILE = "tunables.json"
+
+_KINDS = {int: "int", float: "float", bool: "bool", str: "str"}
+
+
+class Param:
+    def __init__(self, name, kind, get, set, min=None, max=None):
+        self.name = name
+        self.kind = kind
+        self.get = get
+        self.set = set
+        self.min = min
+        self.max = max
+
+    def check(self, value):
+        """
+        The value to set (ints are accepted for floats), or a ValueError.
+        """
+        kind = self.kind
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        # bool is an int in Python: never accepted for numbers
+        if not isinstance(value, kind) or (kind is not bool and isinstance(value, bool)):
+            raise ValueError(f"{self.name}: expected {_KINDS.get(kind, kind)}")
+        if self.min is not None and value < self.min:
+            raise ValueError(f"{self.name}: under {self.min}")
+        if self.max is not None and value > self.max:
+            raise ValueError(f"{self.name}: over {self.max}")
+        return value
+
+    def describe(self):
+        return {"value": self.get(), "type": _KINDS.get(self.kind), "min": self.min, "max": self.max}
+
+
+class Tunables:
+    """
+    Parameters the components let the server change while the app runs, by name:
+
+        App().tunables.register("rain.delta", int, lambda: self.delta, self.set_delta, min=0, max=100)
+        App().tunables.attr("rain.delta", self, "HUMIDITY_DELTA_THRESHOLD", int, min=0, max=100)
+
+    A `00-config-set` frame is checked as a whole (names, types, ranges) before any parameter is set:
+    all of it is applied, in one go between two update hooks, or nothing. With "persist" the values
+    are also written to flash and applied again when the parameter is registered at the next boots.
+    """
+
+    def __init__(self):
+        self.params = {}
+        try:
+            with open(PERSIST_FILE, "r") as f:
+                self.persisted = json.loads(f.read())
+        except (OSError, ValueError):
+            self.persisted = {}
+
+    def register(self, name, kind, get, set, min=None, max=None):
+        param = Param(name, kind, get, set, min, max)
+        self.params[name] = param
+        if name in self.persisted:
+            try:
+                param.set(param.check(self.persisted[name]))
+                _log.info("Persisted value:", name, "=", self.persisted[name])
+            except ValueError as e:
+                _log.warning("Persisted value ignored:", e)
+        return param
+
+    def attr(self, name, obj, attr, kind=None, min=None, max=None):
+        """
+        register() for an attribute of `obj` (its current value gives the type by default).
+        """
+        return self.register(
+            name,
+            kind or type(getattr(obj, attr)),
+            lambda: getattr(obj, attr),
+            lambda value: setattr(obj, attr, value),
+            min, max,
+        )
+
+    def apply(self, patch, persist=False):
+        """
+        Set every parameter of `patch` ({name: value}), or none. Returns the list of errors.
+        """
+        checked = []
+        errors = []
+        for name, value in patch.items():
+            param = self.params.get(name)
+            if param is None:
+                errors.append(f"{name}: unknown parameter")
+                continue
+            try:
+                checked.append((param, param.check(value)))
+            except ValueError as e:
+                errors.append(str(e))
+        if errors:
+            return errors
+
+        for param, value in checked:
+            param.set(value)
+            _log.info("Set", param.name, "=", value)
+
+        if persist:
+            for param, value in checked:
+                self.persisted[param.name] = value
+            try:
+                with open(PERSIST_FILE, "w") as f:
+                    f.write(json.dumps(self.persisted))
+            except OSError as e:
+                return [f"not persisted: {e}"]
+        return []
+
+    def values(self):
+        return {name: param.describe() for name, param in self.params.items()}
+
+    def handle(self, frame, interface):
+        """
+        `00-config-set` / `00-config-get` frames for this device (or every device when "device" is null).
+        """
+        value = frame.value if isinstance(frame.value, dict) else {}
+        # Imported here: the App imports this module
+        from framework.app import App
+        device_id = App().config.device_id
+        if value.get("device") not in (None, "", device_id):
+            return
+
+        errors = []
+        if frame.action == SET_ACTION:
+            params = value.get("params")
+            if not isinstance(params, dict):
+                errors = ["params: expected an object"]
+            else:
+                errors = self.apply(params, value.get("persist") is True)
+            if errors:
+                _log.warning("Config not applied:", errors)
+        interface.send_value(VALUES_ACTION, {"device": device_id, "params": self.values(), "errors": errors})
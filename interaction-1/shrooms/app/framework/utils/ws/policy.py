@@ -0,0 +1,82 @@
+import time
+
+_UNSET = object()
+
+
+class SendPolicy:
+    """
+    Outbound filter applied to every send_value of one action.
+
+    - on_change       : only send when the value differs from the last sent one
+    - min_interval_ms : send at most once per interval, the latest value is sent when it elapses
+    - deadband        : numeric values must move by more than this from the last sent one
+    - coalesce_ms     : values (None counts as 1) are summed and sent as one delta per window
+    """
+
+    def __init__(self, on_change=False, min_interval_ms=0, deadband=None, coalesce_ms=None):
+        self.on_change = on_change
+        self.min_interval_ms = int(min_interval_ms)
+        self.deadband = deadband
+        self.coalesce_ms = int(coalesce_ms) if coalesce_ms is not None else None
+
+        self._last_value = _UNSET
+        self._last_sent = None
+
+        self._pending = None
+        self._has_pending = False
+        self._window_start = None
+
+    def _changed(self, value):
+        last = self._last_value
+        if last is _UNSET:
+            return True
+        if self.deadband is not None and isinstance(value, (int, float)) and isinstance(last, (int, float)):
+            return abs(value - last) > self.deadband
+        if self.on_change:
+            return value != last
+        return True
+
+    def offer(self, value, now):
+        """
+        Returns True when the value must be sent right away.
+        Otherwise it is dropped or kept pending until due().
+        """
+        if self.coalesce_ms is not None:
+            self._pending = (self._pending or 0) + (1 if value is None else value)
+            if not self._has_pending:
+                self._has_pending = True
+                self._window_start = now
+            return False
+
+        if not self._changed(value):
+            # Back to the last sent value: nothing left to send
+            self._has_pending = False
+            self._pending = None
+            return False
+
+        if self._last_sent is not None and time.ticks_diff(now, self._last_sent) < self.min_interval_ms:
+            self._pending = value
+            self._has_pending = True
+            return False
+
+        return True
+
+    def sent(self, value, now):
+        self._last_value = value
+        self._last_sent = now
+        self._pending = None
+        self._has_pending = False
+
+    def due(self, now):
+        if not self._has_pending:
+            return False
+        if self.coalesce_ms is not None:
+            return time.ticks_diff(now, self._window_start) >= self.coalesce_ms
+        return time.ticks_diff(now, self._last_sent) >= self.min_interval_ms
+
+    def take(self):
+        value = self._pending
+        self._pending = None
+        self._has_pending = False
+        self._window_start = None
+        return value
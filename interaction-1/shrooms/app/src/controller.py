@@ -7,8 +7,11 @@ import time
 from .shrooms.shrooms_controller import ShroomsController
 
 class MainController(Controller):
+    actions = ("01-reset", "01-reset-shrooms", "01-shroom-forest-lighten")
+
     def setup(self):
-        leds = LedStrip(27, 430, max_current=2, default_color=(224, 156, 24))
+        # Chaque shroom appelle display() sur le même strip: 30 images/s max, les display() d'un même tour n'en font qu'un
+        leds = LedStrip(27, 430, max_current=2, default_color=(224, 156, 24), fps=30)
         leds.fill((255, 255, 255))
         leds.display()
         time.sleep(3)
@@ -1,4 +1,7 @@
 from framework.app import App
+from framework.utils import log
+
+_log = log.get("shroom")
 
 class Animation:
 
@@ -6,13 +9,13 @@ class Animation:
         self.shroom = shroom
 
     def on_enter(self):
-        if App().config.debug:
-            print(f"Enter {self.__class__.__name__}")
+        if _log.debug_on:
+            _log.debug(f"{self.shroom.name}: Enter {self.__class__.__name__}")
         App().update.append(self.handle)
 
     def on_exit(self):
-        if App().config.debug:
-            print(f"Exit {self.__class__.__name__}")
+        if _log.debug_on:
+            _log.debug(f"{self.shroom.name}: Exit {self.__class__.__name__}")
         App().update.remove(self.handle)
 
     def handle(self):
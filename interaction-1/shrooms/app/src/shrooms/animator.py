@@ -1,7 +1,10 @@
 from framework.components.led_strip import LedStrip
 from framework.app import App
+from framework.utils import log
 import time  # Use time for delays
 
+_log = log.get("shrooms")
+
 class Animation:
     current_step = 0
     steps = []
@@ -56,14 +59,14 @@ class LightingAnimation(Animation):
 
     def on_enter(self):
         super().on_enter()
-        print("Entering LIGHTING")
+        _log.debug("Entering LIGHTING")
 
     def play(self):
         step = super().play()
         return step
 
     def on_exit(self):
-        print("Exiting LIGHTING")
+        _log.debug("Exiting LIGHTING")
 
     def to_living(self):
         return LivingAnimation()
@@ -83,14 +86,14 @@ class DeadAnimation(Animation):
 
     def on_enter(self):
         super().on_enter()
-        print("Entering DEAD")
+        _log.debug("Entering DEAD")
 
     def play(self):
         step = super().play()
         return step
 
     def on_exit(self):
-        print("Exiting DEAD")
+        _log.debug("Exiting DEAD")
 
     def to_lighting(self):
         return LightingAnimation()
@@ -109,14 +112,14 @@ class LivingAnimation(Animation):
 
     def on_enter(self):
         super().on_enter()
-        print("Entering LIVING")
+        _log.debug("Entering LIVING")
 
     def play(self):
         step = super().play()
         return step
 
     def on_exit(self):
-        print("Exiting LIVING")
+        _log.debug("Exiting LIVING")
 
     def to_idle(self):
         return DeadAnimation()
@@ -1,4 +1,8 @@
 import time
+from array import array
+from framework.utils.dsp import Ema, Baseline, coef, COEF_BITS, COEF_ONE, VALUE_BITS
+
+_HALF = COEF_ONE >> 1
 
 class LightDropDetector:
     def __init__(
@@ -8,7 +12,7 @@ class LightDropDetector:
         cooldown_ms=1000,
         ema_alpha=0.35,
         baseline_alpha=0.02,
-        min_drop_rate=0.0,
+        min_drop_rate=0.0,        # counts per ms
         init_samples=4,           # NEW: warmup samples
     ):
         self.drop_trigger = int(drop_trigger)
@@ -19,84 +23,83 @@ class LightDropDetector:
         self.baseline_alpha = float(baseline_alpha)
         self.min_drop_rate = float(min_drop_rate)
 
+        # Filtres en virgule fixe: pas de float par échantillon
+        self._ema_filter = Ema(self.ema_alpha)
+        # La baseline monte à baseline_alpha et descend 4x moins vite
+        self._baseline_filter = Baseline(self.baseline_alpha, self.baseline_alpha * 0.25)
+        # Taux de chute comparé en entiers, en counts par seconde
+        self._min_rate = int(self.min_drop_rate * 1000)
+
         self.init_samples = int(init_samples)
         self.reset()
 
     def reset(self):
         now = time.ticks_ms()
         self._armed = True
-        self.last_drop = 0.0
-        self.last_drop_rate = 0.0
+        self.last_drop = 0
+        self.last_drop_rate = 0   # counts per second
 
-        self._ema = None
-        self._baseline = None
+        self._ema_filter.reset()
+        self._baseline_filter.reset()
         self._last_ema = None
 
         self._last_time = now
         self._last_trigger = now
 
+    def snapshot(self):
+        """
+        EMA et baseline, pour reprendre sans warmup après un redémarrage (App().warm).
+        """
+        if self._last_ema is None:
+            return None
+        return [self._ema_filter.snapshot(), self._baseline_filter.snapshot()]
+
+    def restore(self, value):
+        if value is None:
+            return
+        self._ema_filter.restore(value[0])
+        self._baseline_filter.restore(value[1])
+        self._last_ema = self._ema_filter.get()
+        self._last_time = time.ticks_ms()
+        self._warmup_left = 0
+
     def update(self, level, now_ms=None):
         if now_ms is None:
             now_ms = time.ticks_ms()
 
+        ema = self._ema_filter.update(level)
+        baseline = self._baseline_filter.update(ema)
+
         # Init si nécessaire
-        if self._ema is None:
-            v = float(level)
-            self._ema = v
-            self._baseline = v
-            self._last_ema = v
+        if self._last_ema is None:
+            self._last_ema = ema
             self._last_time = now_ms
             self._warmup_left = self.init_samples
             return False
 
-        # Warmup: on stabilise sans détecter
-        if self._warmup_left > 0:
-            # On fait avancer EMA/Baseline mais on n'autorise pas la détection
-            dt = time.ticks_diff(now_ms, self._last_time)
-            if dt <= 0:
-                dt = 1
-
-            x = float(level)
-            self._ema = self._ema + self.ema_alpha * (x - self._ema)
-
-            if self._ema > self._baseline:
-                self._baseline = self._baseline + self.baseline_alpha * (self._ema - self._baseline)
-            else:
-                self._baseline = self._baseline + (self.baseline_alpha * 0.25) * (self._ema - self._baseline)
-
-            self._last_ema = self._ema
-            self._last_time = now_ms
-            self._warmup_left -= 1
-            return False
-
         dt = time.ticks_diff(now_ms, self._last_time)
         if dt <= 0:
             dt = 1
 
-        x = float(level)
-        self._ema = self._ema + self.ema_alpha * (x - self._ema)
-
-        if self._ema > self._baseline:
-            self._baseline = self._baseline + self.baseline_alpha * (self._ema - self._baseline)
-        else:
-            self._baseline = self._baseline + (self.baseline_alpha * 0.25) * (self._ema - self._baseline)
+        d_ema = self._last_ema - ema
+        self._last_ema = ema
+        self._last_time = now_ms
 
-        drop = self._baseline - self._ema
-        d_ema = self._last_ema - self._ema
-        drop_rate = d_ema / dt
+        # Warmup: on stabilise sans détecter
+        if self._warmup_left > 0:
+            self._warmup_left -= 1
+            return False
 
+        drop = baseline - ema
         self.last_drop = drop
-        self.last_drop_rate = drop_rate
-
-        self._last_ema = self._ema
-        self._last_time = now_ms
+        self.last_drop_rate = (d_ema * 1000) // dt
 
         if time.ticks_diff(now_ms, self._last_trigger) < self.cooldown_ms:
             return False
 
         if self._armed:
             if drop >= self.drop_trigger:
-                if self.min_drop_rate > 0.0 and drop_rate < self.min_drop_rate:
+                if self._min_rate > 0 and self.last_drop_rate < self._min_rate:
                     return False
                 self._armed = False
                 self._last_trigger = now_ms
@@ -105,4 +108,148 @@ class LightDropDetector:
             if drop <= self.drop_release:
                 self._armed = True
 
-        return False
\ No newline at end of file
+        return False
+
+
+class LightDropDetectorBank:
+    """
+    Même détection que LightDropDetector, pour `n` canaux à la fois.
+
+    L'état de chaque canal (EMA, baseline, armé, cooldown, warmup) est dans des tableaux parallèles.
+    `update(values)` traite un vecteur complet (un scan MCP3008) en un appel, avec un seul ticks_ms,
+    et renvoie le masque des canaux déclenchés (bit i = canal i).
+    """
+
+    def __init__(
+        self,
+        drop_trigger,             # int, ou un seuil par canal
+        n=None,
+        drop_release=None,        # défaut: 40% du seuil
+        cooldown_ms=1000,
+        ema_alpha=0.35,
+        baseline_alpha=0.02,
+        min_drop_rate=0.0,        # counts per ms
+        init_samples=4,
+    ):
+        if isinstance(drop_trigger, int):
+            drop_trigger = [drop_trigger] * n
+        self.n = len(drop_trigger)
+        self.drop_trigger = array("i", drop_trigger)
+        if drop_release is None:
+            self.drop_release = array("i", [(t * 2) // 5 for t in drop_trigger])
+        else:
+            self.drop_release = array("i", [int(drop_release)] * self.n)
+        self.cooldown_ms = int(cooldown_ms)
+
+        # Coefficients Q12, états Q6 (comme framework.utils.dsp)
+        self._a_ema = coef(ema_alpha)
+        self._a_up = coef(baseline_alpha)
+        self._a_down = coef(baseline_alpha * 0.25)
+        self._min_rate = int(min_drop_rate * 1000)
+        self.init_samples = int(init_samples)
+
+        self._ema = array("i", bytes(4 * self.n))
+        self._base = array("i", bytes(4 * self.n))
+        self._last = array("i", bytes(4 * self.n))
+        self._cooldown = array("i", bytes(4 * self.n))   # ms restantes
+        self._warmup = bytearray(self.n)                # échantillons restants, 255 = pas initialisé
+        self._armed = bytearray(self.n)
+
+        self.last_drop = array("i", bytes(4 * self.n))
+        self._last_time = time.ticks_ms()
+        self.reset()
+
+    def reset(self, ch=None, hold_ms=0):
+        """
+        Réinitialise un canal (ou tous). Pendant `hold_ms` le canal se recalibre sans déclencher.
+        """
+        for i in range(self.n) if ch is None else (ch,):
+            self._warmup[i] = 255
+            self._armed[i] = 1
+            self._cooldown[i] = hold_ms
+            self.last_drop[i] = 0
+
+    def snapshot(self):
+        """
+        EMA et baseline de chaque canal (None: pas encore initialisé), pour App().warm.
+        """
+        return [None if self._warmup[i] == 255 else (self._ema[i], self._base[i]) for i in range(self.n)]
+
+    def restore(self, value):
+        """
+        Reprend les canaux calibrés sans warmup. Les canaux en trop ou manquants sont ignorés.
+        """
+        for i, v in enumerate(value[:self.n]):
+            if v is None:
+                continue
+            self._ema[i] = self._last[i] = int(v[0])
+            self._base[i] = int(v[1])
+            self._warmup[i] = 0
+        self._last_time = time.ticks_ms()
+
+    def update(self, values, now_ms=None):
+        if now_ms is None:
+            now_ms = time.ticks_ms()
+        dt = time.ticks_diff(now_ms, self._last_time)
+        if dt <= 0:
+            dt = 1
+        self._last_time = now_ms
+
+        ema = self._ema
+        base = self._base
+        last = self._last
+        cooldown = self._cooldown
+        warmup = self._warmup
+        armed = self._armed
+        a_ema = self._a_ema
+        a_up = self._a_up
+        a_down = self._a_down
+        min_rate = self._min_rate
+
+        mask = 0
+        for i in range(self.n):
+            xq = values[i] << VALUE_BITS
+
+            # Init si nécessaire
+            if warmup[i] == 255:
+                ema[i] = xq
+                base[i] = xq
+                last[i] = xq
+                warmup[i] = self.init_samples
+                continue
+
+            e = ema[i]
+            e += ((xq - e) * a_ema + _HALF) >> COEF_BITS
+            ema[i] = e
+            b = base[i]
+            b += ((e - b) * (a_up if e > b else a_down) + _HALF) >> COEF_BITS
+            base[i] = b
+
+            d_ema = last[i] - e
+            last[i] = e
+
+            if cooldown[i] > 0:
+                cooldown[i] -= dt
+
+            # Warmup: on stabilise sans détecter
+            if warmup[i]:
+                warmup[i] -= 1
+                continue
+
+            drop = (b - e) >> VALUE_BITS
+            self.last_drop[i] = drop
+
+            if cooldown[i] > 0:
+                continue
+
+            if armed[i]:
+                if drop >= self.drop_trigger[i]:
+                    if min_rate > 0 and ((d_ema >> VALUE_BITS) * 1000) // dt < min_rate:
+                        continue
+                    armed[i] = 0
+                    cooldown[i] = self.cooldown_ms
+                    mask |= 1 << i
+            elif drop <= self.drop_release[i]:
+                armed[i] = 1
+
+        return mask
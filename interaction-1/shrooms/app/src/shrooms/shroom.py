@@ -4,13 +4,16 @@ from framework.components.led_strip import LedStrip
 from src.shrooms.animations.animation import Animation
 from src.shrooms.animations.dead_animation import DeadAnimation
 from src.shrooms.animations.lighting_animation import LightingAnimation
-from .light_drop_detector import LightDropDetector
+from framework.utils import log
+
+_log = log.get("shroom")
 
 class Shroom:
     def __init__(self, name, chanel, leds: LedStrip, threshold_drop=50, delta_ms=150,
                  cooldown_ms=1000, buf_size=32, start=0, span=3):
         
-        self.chanel = Chanel(chanel, name, self.handle_light_level) if chanel is not None else None
+        # La détection de chute de lumière est faite pour tous les shrooms par le ShroomsController
+        self.chanel = Chanel(chanel, name) if chanel is not None else None
         self.name = name
         self.leds = leds
 
@@ -33,16 +36,9 @@ class Shroom:
         self.animation = None
         self.update_animation(DeadAnimation(self))
 
-        self.detector = LightDropDetector(
-            drop_trigger=self.threshold_drop,
-            cooldown_ms=self.cooldown_ms,
-            ema_alpha=0.35,
-            baseline_alpha=0.02,
-            min_drop_rate=0.0,  # mets 0.15 si tu veux éviter les dérives lentes
-        )
-
     def update_animation(self, animation: Animation):
-        print(f"{self.name}: Updating animation")
+        if _log.debug_on:
+            _log.debug(f"{self.name}: Updating animation")
         self.animation.on_exit() if self.animation is not None else None
         self.animation = animation
         self.animation.on_enter()
@@ -60,17 +56,11 @@ class Shroom:
         return isinstance(self.animation, LightingAnimation)
     
     def reset(self):
-        # 1) Reset detector avec la valeur courante (si dispo)
-        self.detector.reset()
-
-        # 2) Forcer DeadAnimation (ne dépend pas de l’anim courante)
+        # Forcer DeadAnimation (ne dépend pas de l’anim courante)
+        # Le detector est réinitialisé par le ShroomsController
         self.animation.to_dead()
-
-        # 3) petite fenêtre où on ignore les triggers (stabilisation)
-        self._ignore_light_until = time.ticks_add(time.ticks_ms(), 120)
-
-        # 4) LEDs off
-        print(f"{self.name}: Reset")
+        if _log.debug_on:
+            _log.debug(f"{self.name}: Reset")
 
     def setup_leds(self, start_pixel, end_pixel):
         self.led_config["start_pixel"] = start_pixel
@@ -85,31 +75,11 @@ class Shroom:
         
         # Play glow animation
         self.animation.to_lighting()
-        print(f"{self.name}: Light detected, starting glow")
+        if _log.info_on:
+            _log.info(f"{self.name}: Light detected, starting glow")
 
     def to_lighting(self):
         self.animation.to_lighting()
 
     def to_living(self):
         self.animation.to_living()
-
-    def handle_light_level(self, level, *args):
-        if self.chanel is None:
-            return
-
-        # Ignore juste après reset
-        if hasattr(self, "_ignore_light_until"):
-            if time.ticks_diff(time.ticks_ms(), self._ignore_light_until) < 0:
-                # Important: on fait quand même tourner le detector pour qu'il se calibre
-                self.detector.update(level)
-                return
-
-        # Important: même en Lighting, on nourrit le detector (sinon il "gèle")
-        triggered = self.detector.update(level)
-
-        # Mais on ne déclenche jamais pendant Lighting
-        if self.lighten:
-            return
-
-        if triggered:
-            self.on_light_detected()
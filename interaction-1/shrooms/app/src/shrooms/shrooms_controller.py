@@ -1,17 +1,27 @@
 from framework.controller import Controller
+from framework.app import App
 from framework.utils.ws.interface import WebsocketInterface
 from .shroom import Shroom
+from .light_drop_detector import LightDropDetectorBank
 from framework.utils.abstract_singleton import SingletonBase
 from framework.components.led_strip import LedStrip
 from framework.components.mcp3008 import MCP3008
 from framework.utils.timer import Timer
+from framework.utils.trace import Trace
+from framework.utils import log
 import json
 
+_log = log.get("shrooms")
+
 
 class ShroomsController(Controller, SingletonBase):
     shrooms: list[Shroom] = []
     forest_lighten = False
     delta_living_ms = 5000
+    reset_hold_ms = 120
+    detectors = None
+    trace_light = False     # <- True pour enregistrer les traces (devkit/python-detector-tuning)
+    trace = None
 
     def __init__(self, led_strip: LedStrip, mcp: MCP3008):
         super().__init__()
@@ -26,6 +36,9 @@ class ShroomsController(Controller, SingletonBase):
     def reset(self):
         for shroom in self.shrooms:
             shroom.reset()
+        # Petite fenêtre où on ignore les triggers (stabilisation)
+        if self.detectors is not None:
+            self.detectors.reset(hold_ms=self.reset_hold_ms)
         self.forest_lighten = False
 
     def init_shrooms(self):
@@ -47,23 +60,70 @@ class ShroomsController(Controller, SingletonBase):
             ))
 
         # Setup shroom chanels to MCP3008
-        self.mcp.chanels = [shroom.chanel for shroom in self.shrooms if shroom.chanel is not None]
+        self.sensing = [shroom for shroom in self.shrooms if shroom.chanel is not None]
+        self.mcp.chanels = [shroom.chanel for shroom in self.sensing]
+
+        # Un seul detector pour tous les canaux, nourri par le vecteur complet de chaque scan
+        self.detectors = LightDropDetectorBank(
+            drop_trigger=[shroom.threshold_drop for shroom in self.sensing],
+            cooldown_ms=self.config.get('cooldown_ms', 1000),
+            ema_alpha=0.35,
+            baseline_alpha=0.02,
+            min_drop_rate=0.0,  # mets 0.15 si tu veux éviter les dérives lentes
+        ) if self.sensing else None
+        if self.detectors is not None:
+            # Redémarrage à chaud: les canaux reprennent calibrés
+            App().warm.register("shrooms.detectors", self.detectors.snapshot, self.detectors.restore)
+            # Réglage à chaud (00-config-set): seuil de chaque champignon, cooldown commun
+            for i, shroom in enumerate(self.sensing):
+                App().tunables.register(
+                    f"shrooms.{shroom.name}.threshold_drop", int,
+                    lambda shroom=shroom: shroom.threshold_drop,
+                    lambda value, i=i: self.set_threshold_drop(i, value),
+                    min=1, max=1023,
+                )
+            App().tunables.attr("shrooms.cooldown_ms", self.detectors, "cooldown_ms", min=0, max=60000)
+        self.mcp.on_scan = self.on_scan
+        if self.trace_light and self.sensing:
+            self.trace = Trace("shrooms", channels=len(self.sensing))
 
         # self.test_shrooms_lights()
 
+    def set_threshold_drop(self, i, value):
+        self.sensing[i].threshold_drop = value
+        self.detectors.drop_trigger[i] = value
+        self.detectors.drop_release[i] = (value * 2) // 5
+
     def test_shrooms_lights(self):
         for shroom in self.shrooms:
             print(f"Testing shroom {shroom.name} LEDs from {shroom.led_config['start_pixel']} to {shroom.led_config['end_pixel']}")
             shroom.test_leds()
         self.leds.display()
 
+    def on_scan(self, values):
+        if self.trace is not None:
+            self.trace.add(values)
+
+        if self.detectors is None:
+            return
+
+        # Important: même en Lighting, on nourrit le detector (sinon il "gèle")
+        mask = self.detectors.update(values)
+        if not mask:
+            return
+
+        # Mais on ne déclenche jamais pendant Lighting
+        for i in range(len(self.sensing)):
+            if mask & (1 << i):
+                self.sensing[i].on_light_detected()
+
     def update(self):
         self.mcp.update()
         if self.is_shrooms_lighten() and not self.forest_lighten:
             self.forest_lighten = True
             self.to_shrooms_lighting()
 
-            print("Shroom forest lighten !")
+            _log.info("Shroom forest lighten !")
             WebsocketInterface().send_value("01-shroom-forest-lighten", self.forest_lighten)
 
     def to_shrooms_lighting(self):
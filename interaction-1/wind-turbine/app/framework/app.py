@@ -1,10 +1,19 @@
 import machine
 import gc
+import os
 
 from time import ticks_cpu, sleep
 
 from framework.config import Config
 from framework.utils.abstract_singleton import SingletonBase
+from framework.utils import log
+from framework.utils import boot_profile
+from framework.utils.loop_monitor import LoopMonitor
+from framework.utils.health import HealthMonitor
+from framework.utils.warm_state import WarmState
+from framework.utils.tunables import Tunables
+
+_log = log.get("app")
 
 
 class AppState:
@@ -22,6 +31,9 @@ class App(SingletonBase):
     shutdown = []
     on_frame_received = []
 
+    # Actions the frame handlers react to. None means every action.
+    actions = set()
+
     # Constants
     SLOWED = True
     DEBUG = False
@@ -31,14 +43,51 @@ class App(SingletonBase):
     old_state = AppState.SETUP
 
     def _init_once(self):
+        # main.py imports done
+        boot_profile.mark("imports")
+        # An update interrupted by a reset is finished before anything reads the files.
+        # The OTA module is only loaded when its journal is there
+        try:
+            os.stat("ota.journal")
+        except OSError:
+            pass
+        else:
+            from framework.utils import ota
+            ota.recover()
         self.config = Config()
+        boot_profile.mark("config")
         self.shutdown_request = False
         self.ticks = ticks_cpu
         self.DEBUG = self.config.debug
         self.SLOWED = self.config.slowed
+        self.configure_log()
+        loop = self.config.loop
+        # No watchdog in debug mode: it would reset the board while it sits in the REPL
+        self.monitor = LoopMonitor(loop.budget_ms, 0 if self.DEBUG else loop.wdt_ms, loop.max_stalls)
+        health = self.config.health
+        self.health = HealthMonitor(health.period_ms, health.temp_c, health.heap_free)
+        if health.period_ms:
+            self.update.append(self.health.update)
+        # Before the controllers are set up: they restore their state when they register it
+        warm = self.config.warm
+        self.warm = WarmState(warm.store, warm.period_ms, warm.max_age_s)
+        if warm.period_ms:
+            self.update.append(self.warm.update)
+            self.shutdown.append(self.warm.save)
+        # Live parameters, registered by the controllers (00-config-set)
+        self.tunables = Tunables()
+
+    def configure_log(self):
+        """
+        Resolve the logger levels from the config: `debug` logs everything, `websocket.debug` the ws traces.
+        """
+        level = log.DEBUG if self.config.debug else log.LEVELS.get(self.config.log.level, log.INFO)
+        overrides = {"ws": log.DEBUG} if self.config.websocket.debug else None
+        log.configure(level, self.config.log.size, self.config.log.uart, overrides)
 
     def idle(self):
         self.state = AppState.IDLE
+        log.drain()
         machine.idle()
 
     def run(self):
@@ -46,27 +95,54 @@ class App(SingletonBase):
             try:
                 setup()
             except RuntimeError as e:
-                print(f"An error occurred while setting up the app: {e}")
+                _log.error(f"An error occurred while setting up the app: {e}")
                 continue
               
+        # Boot without websocket: the profile ends with the setup
+        boot_profile.finish("setup")
+
         self.state = AppState.RUNNING
+        monitor = self.monitor
+        monitor.start()
+        # Bound once: called after every hook
+        mark = monitor.hook
         while not self.shutdown_request:
+            monitor.begin()
             gc.collect()
+            mark("gc")
 
             if self.state != self.old_state:
                 self.old_state = self.state
-                if self.DEBUG:
-                    print(f"App state: {self.state}")
+                if _log.debug_on:
+                    _log.debug(f"App state: {self.state}")
                     
             if self.state == AppState.RUNNING:
                 for update in self.update:
                     update()
+                    mark(update)
+                # The UART output happens here, between two iterations
+                log.drain()
+                monitor.end()
                 if self.SLOWED:
                     sleep(0.3)
         else:
             self.state = AppState.SHUTDOWN
             for shutdown in self.shutdown:
                 shutdown()
+            log.drain(-1)
+
+    def subscribe(self, actions=None):
+        """
+        Declare the actions a frame handler reacts to.
+        Passing None subscribes to every action and disables the pre-filter.
+        """
+        if actions is None:
+            self.actions = None
+        elif self.actions is not None:
+            self.actions.update(actions)
+
+    def is_subscribed(self, action):
+        return self.actions is None or action in self.actions
 
     def broadcast_frame(self, frame):
         # Broadcast frame to all registered handlers
@@ -1,16 +1,30 @@
+from array import array
 from framework.app import App
+from framework.utils.sampler import Sampler
+from framework.utils.dsp import Ema, Envelope, Hysteresis
+from framework.utils.audio import AudioFeatures
+from framework.utils import log
 from machine import Pin, ADC
 
+_log = log.get("mic")
+
 class Microphone:
     """
     Capteur audio pur:
     - Lit l'ADC
     - Filtre une baseline (drift)
-    - Calcule une enveloppe (intensité sonore)
+    - Calcule une enveloppe (intensité sonore), attaque/relâchement asymétriques
+    - Optionnel: noise gate, ouvert à `gate_offset`, refermé à `gate_offset * gate_ratio`
     - Expose self.level (int) et self.raw
     - Optionnel: callback on_level(level, raw, baseline)
+    - Optionnel: sample_rate, échantillonnage à fréquence fixe par un Sampler,
+      traité par blocs de `block` échantillons (on_level est appelé une fois par bloc)
+    - Optionnel (avec sample_rate): on_block(features), features audio calculées une fois par bloc
+      (framework.utils.audio.AudioFeatures: rms, peak, zcr, énergie Goertzel aux fréquences de `bands`).
+      L'enveloppe suit alors le rms du bloc au lieu de chaque échantillon.
 
     Pas de détection (souffle, trigger, seuil, cooldown, etc.)
+    Les filtres sont en virgule fixe (framework.utils.dsp): pas de float par échantillon.
     """
 
     def __init__(
@@ -18,8 +32,17 @@ class Microphone:
         pin=32,
         alpha_base=0.01,   # vitesse d'adaptation de la baseline
         alpha_env=0.2,     # lissage de l'enveloppe
+        attack=None,       # lissage quand le niveau monte (défaut: alpha_env)
+        release=None,      # lissage quand le niveau descend (défaut: alpha_env)
+        gate_ratio=0.5,
+        gate_offset=0,     # 0 = pas de gate
         on_level=None,
-        debug=False
+        debug=False,
+        sample_rate=None,  # Hz, None = une lecture par tour de boucle
+        block=32,
+        bands=(),          # Hz, bandes Goertzel des features
+        on_block=None,
+        state=None         # nom de l'état gardé entre deux redémarrages (App().warm), None = pas gardé
     ):
         self.adc = ADC(Pin(pin))
         self.adc.atten(ADC.ATTN_11DB)
@@ -28,32 +51,97 @@ class Microphone:
         self.alpha_base = alpha_base
         self.alpha_env = alpha_env
 
+        self._baseline = Ema(alpha_base)
+        self._envelope = Envelope(
+            attack if attack is not None else alpha_env,
+            release if release is not None else alpha_env,
+        )
+        self._gate = Hysteresis(gate_offset, gate_offset * gate_ratio) if gate_offset else None
+
         self.on_level = on_level
+        self.on_block = on_block
         self.debug = debug
+        if debug:
+            _log.set_level(log.DEBUG)
 
         # Etats
         self.raw = self.adc.read()
-        self.baseline = float(self.raw)
-        self.level = 0.0   # enveloppe lissée
+        self.baseline = self._baseline.update(self.raw)
+        self.level = self._envelope.update(0)   # enveloppe lissée
+
+        # Redémarrage à chaud: baseline et enveloppe reprennent où elles en étaient
+        if state:
+            App().warm.register(state, self._snapshot, self._restore)
+
+        self.sampler = None
+        self.features = None
+        if (on_block or bands) and not sample_rate:
+            raise ValueError("Microphone: block features need a sample_rate")
+        if on_block or bands:
+            self.features = AudioFeatures(sample_rate, block, bands)
+        if sample_rate:
+            self.block = array("H", bytes(2 * block))
+            self._blocks = (self.block,)
+            self.sampler = Sampler(sample_rate, (self.adc.read,), size=block * 8)
+            self.sampler.start()
 
         App().update.append(self.update)
 
-    def update(self):
-        x = self.adc.read()
+    def _filter(self, x):
         self.raw = x
 
         # baseline (drift lent)
-        self.baseline = (1 - self.alpha_base) * self.baseline + self.alpha_base * x
+        self.baseline = self._baseline.update(x)
 
         # intensité sonore (enveloppe)
         amp = abs(x - self.baseline)
-        self.level = (1 - self.alpha_env) * self.level + self.alpha_env * amp
+        if self._gate is not None and not self._gate.update(amp):
+            amp = 0
+        self.level = self._envelope.update(amp)
+
+    def _filter_block(self):
+        f = self.features.compute(self.block)
+        self.raw = self.block[-1]
+        self.baseline = f.mean
+
+        amp = f.rms
+        if self._gate is not None and not self._gate.update(amp):
+            amp = 0
+        self.level = self._envelope.update(amp)
 
-        if App().config.debug or self.debug:
-            print(f"Mic raw={self.raw} base={int(self.baseline)} level={int(self.level)}")
+        if self.on_block:
+            self.on_block(f)
+
+    def update(self):
+        if self.sampler is None:
+            self._filter(self.adc.read())
+            self._emit()
+            return
+
+        # Tous les blocs complets en attente: une boucle plus lente qu'un bloc ne perd aucun échantillon
+        while self.sampler.read(self._blocks):
+            if self.features is None:
+                for x in self.block:
+                    self._filter(x)
+            else:
+                self._filter_block()
+            self._emit()
+
+    def _emit(self):
+        if _log.debug_on:
+            _log.debug(f"raw={self.raw} base={self.baseline} level={self.level}")
 
         if self.on_level:
-            self.on_level(int(self.level), self.raw, int(self.baseline))
+            self.on_level(self.level, self.raw, self.baseline)
+
+    def _snapshot(self):
+        return [self._baseline.snapshot(), self._envelope.snapshot()]
+
+    def _restore(self, value):
+        self._baseline.restore(value[0])
+        self._envelope.restore(value[1])
+        self.baseline = self._baseline.get()
+        self.level = self._envelope.get()
 
     def get_level(self) -> int:
-        return int(self.level)
\ No newline at end of file
+        return self.level
\ No newline at end of file
@@ -1,6 +1,5 @@
 from framework.app import App
 from machine import Pin
-from framework.utils.frames.frame import Frame
 
 class Relay:
     is_open = False
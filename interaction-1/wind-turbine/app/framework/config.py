@@ -1,33 +1,93 @@
 import json
 from machine import Pin
 from framework.utils.gpio import GPIO
-from framework.utils.json.validator import JsonValidator
-from framework.utils.json.template import TemplateBuilder
+from framework.utils import log
+
+try:
+    import uhashlib as hashlib
+except ImportError:
+    import hashlib
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+_log = log.get("config")
+
+TEMPLATE_FILE = "templates/config.template.json"
+# Validated config, keyed by a hash of config.json and of the template
+CACHE_FILE = "config.cache.json"
 
 class Config:
     pins = {}
     _data = {}
+    _cached = False
+
     def __init__(self):
         self.load_from_file("config.json")
         self.setup_pins()
 
+    @property
+    def cached(self):
+        # True when the config came from the cache (no template validation at this boot)
+        return self._cached
+
     def setup_pins(self):
         self.pins["builtin-led"] = Pin(GPIO.LED, Pin.OUT, Pin.PULL_DOWN)
         self.pins["led"] = Pin(GPIO.GPIO4, Pin.OUT, Pin.PULL_DOWN)
 
     def load_from_file(self, filepath):
-        print("Trying to load config ...")
         with open(filepath, "r") as f:
-            data = f.read()
+            raw = f.read()
+        key = self.hash(raw)
+
+        data = self.load_cache(key)
+        self._cached = data is not None
+        if data is None:
+            data = json.loads(raw)
             self.validate(data)
-        self.load_config(json.loads(data))
-        del data
-
-    def validate(self, raw_data: str):
-        template_builder = TemplateBuilder()
-        template = template_builder.build_from_file("config_template", "templates/config.template.json")
-        validator = JsonValidator(template)
-        errors = validator.validate(raw_data)
+            self.save_cache(key, data)
+        del raw
+
+        _log.info("Config loaded" + (" (cached)" if self.cached else ""))
+        self.load_config(data)
+        if self.debug:
+            self.dump()
+
+    @staticmethod
+    def hash(raw: str):
+        h = hashlib.sha256(raw.encode())
+        with open(TEMPLATE_FILE, "r") as f:
+            h.update(f.read().encode())
+        return binascii.hexlify(h.digest()[:8]).decode()
+
+    def load_cache(self, key):
+        """
+        The validated config of a previous boot, or None when config.json (or the template) changed.
+        """
+        try:
+            with open(CACHE_FILE, "r") as f:
+                cache = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache, dict) or cache.get("key") != key:
+            return None
+        return cache.get("config")
+
+    def save_cache(self, key, data):
+        try:
+            with open(CACHE_FILE, "w") as f:
+                f.write(json.dumps({"key": key, "config": data}))
+        except OSError as e:
+            _log.warning("Cannot write the config cache:", e)
+
+    def validate(self, data: dict):
+        """
+        Check `data` against the template and fill in the defaults (cached with the config).
+        """
+        # Only needed when the config changed: imported on demand
+        from framework.utils.json.schema import Schema
+        errors = Schema.from_file(TEMPLATE_FILE, "config").validate(data)
         if len(errors) > 0:
             raise ValueError(f"Cannot validate config: {errors}")
 
@@ -36,13 +96,25 @@ class Config:
         self._data["debug"] = data["debug"]
         self._data["slowed"] = data["slowed"]
         self._data["wifi"] = WifiConfig(data["wifi"]["SSID"], data["wifi"]["password"], data["wifi"]["timeout"])
-        self._data["websocket"] = WebsocketConfig(data["websocket"]["server"], data["websocket"]["reconnect"], data["websocket"]["debug"])
-        
-        # Debug: Print all config data
+        self._data["websocket"] = WebsocketConfig(data["websocket"]["server"], data["websocket"]["reconnect"], data["websocket"]["debug"], data["websocket"].get("batch_ms"), data["websocket"].get("binary", False), data["websocket"].get("threaded", False))
+        log = data.get("log", {})
+        self._data["log"] = LogConfig(log.get("level", "info"), log.get("size", 4096), log.get("uart", True))
+        loop = data.get("loop", {})
+        self._data["loop"] = LoopConfig(loop.get("budget_ms", 100), loop.get("wdt_ms", 0), loop.get("max_stalls", 10))
+        health = data.get("health", {})
+        self._data["health"] = HealthConfig(health.get("period_ms", 5000), health.get("temp_c", [60, 70, 78]), health.get("heap_free", [32768, 16384, 8192]))
+        warm = data.get("warm", {})
+        self._data["warm"] = WarmConfig(warm.get("store", "rtc"), warm.get("period_ms", 5000), warm.get("max_age_s", 600))
+        ota = data.get("ota", {})
+        self._data["ota"] = OtaConfig(ota.get("enabled", False))
+        udp = data.get("udp", {})
+        self._data["udp"] = UdpConfig(udp.get("enabled", False), udp.get("port", 4210), udp.get("peers", []), udp.get("actions", []), udp.get("repeat", 1))
+
+    def dump(self):
         print("=== Config Data (Debug) ===")
         for key in self._data:
             value = self._data[key]
-            if isinstance(value, (WifiConfig, WebsocketConfig)):
+            if isinstance(value, (WifiConfig, WebsocketConfig, LogConfig, LoopConfig, HealthConfig, WarmConfig, OtaConfig, UdpConfig)):
                 # Print object attributes
                 print(f"  {key}:")
                 if isinstance(value, WifiConfig):
@@ -53,6 +125,33 @@ class Config:
                     print(f"    server: {value.server}")
                     print(f"    reconnect: {value.reconnect}")
                     print(f"    debug: {value.debug}")
+                    print(f"    batch_ms: {value.batch_ms}")
+                    print(f"    binary: {value.binary}")
+                    print(f"    threaded: {value.threaded}")
+                elif isinstance(value, LogConfig):
+                    print(f"    level: {value.level}")
+                    print(f"    size: {value.size}")
+                    print(f"    uart: {value.uart}")
+                elif isinstance(value, LoopConfig):
+                    print(f"    budget_ms: {value.budget_ms}")
+                    print(f"    wdt_ms: {value.wdt_ms}")
+                    print(f"    max_stalls: {value.max_stalls}")
+                elif isinstance(value, HealthConfig):
+                    print(f"    period_ms: {value.period_ms}")
+                    print(f"    temp_c: {value.temp_c}")
+                    print(f"    heap_free: {value.heap_free}")
+                elif isinstance(value, WarmConfig):
+                    print(f"    store: {value.store}")
+                    print(f"    period_ms: {value.period_ms}")
+                    print(f"    max_age_s: {value.max_age_s}")
+                elif isinstance(value, OtaConfig):
+                    print(f"    enabled: {value.enabled}")
+                elif isinstance(value, UdpConfig):
+                    print(f"    enabled: {value.enabled}")
+                    print(f"    port: {value.port}")
+                    print(f"    peers: {value.peers}")
+                    print(f"    actions: {value.actions}")
+                    print(f"    repeat: {value.repeat}")
             else:
                 print(f"  {key}: {value}")
         print("===========================")
@@ -97,8 +196,74 @@ class WebsocketConfig:
     server = ""
     reconnect = True
     debug = False
+    batch_ms = None
+    binary = False
+    threaded = False
 
-    def __init__(self, server, reconnect, debug):
+    def __init__(self, server, reconnect, debug, batch_ms=None, binary=False, threaded=False):
         self.server = server
         self.reconnect = reconnect
-        self.debug = debug
\ No newline at end of file
+        self.debug = debug
+        self.batch_ms = batch_ms
+        self.binary = binary
+        self.threaded = threaded
+
+class LogConfig:
+    level = "info"
+    size = 4096
+    uart = True
+
+    def __init__(self, level="info", size=4096, uart=True):
+        self.level = level
+        self.size = size
+        self.uart = uart
+
+class LoopConfig:
+    budget_ms = 100
+    wdt_ms = 0
+    max_stalls = 10
+
+    def __init__(self, budget_ms=100, wdt_ms=0, max_stalls=10):
+        self.budget_ms = budget_ms
+        self.wdt_ms = wdt_ms
+        self.max_stalls = max_stalls
+
+class HealthConfig:
+    period_ms = 5000
+    temp_c = [60, 70, 78]
+    heap_free = [32768, 16384, 8192]
+
+    def __init__(self, period_ms=5000, temp_c=None, heap_free=None):
+        self.period_ms = period_ms
+        self.temp_c = temp_c if temp_c is not None else [60, 70, 78]
+        self.heap_free = heap_free if heap_free is not None else [32768, 16384, 8192]
+
+class WarmConfig:
+    store = "rtc"
+    period_ms = 5000
+    max_age_s = 600
+
+    def __init__(self, store="rtc", period_ms=5000, max_age_s=600):
+        self.store = store
+        self.period_ms = period_ms
+        self.max_age_s = max_age_s
+
+class OtaConfig:
+    enabled = False
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+
+class UdpConfig:
+    enabled = False
+    port = 4210
+    peers = []
+    actions = []
+    repeat = 1
+
+    def __init__(self, enabled=False, port=4210, peers=None, actions=None, repeat=1):
+        self.enabled = enabled
+        self.port = port
+        self.peers = peers if peers is not None else []
+        self.actions = actions if actions is not None else []
+        self.repeat = repeat
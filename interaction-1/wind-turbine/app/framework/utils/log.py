@@ -0,0 +1,269 @@
+import sys
+import time
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+_TAGS = {DEBUG: "D", INFO: "I", WARNING: "W", ERROR: "E"}
+
+# Frame asking the devices for their log, and the answer
+DUMP_ACTION = "00-log-dump"
+LOG_ACTION = "00-log"
+
+
+class RingBuffer:
+    """
+    Fixed-size byte ring: keeps the last `size` bytes written.
+    Positions are absolute byte counts (`written` never wraps), so a reader keeps its own cursor.
+    """
+
+    def __init__(self, size=4096):
+        self.size = size
+        self.buf = bytearray(size)
+        self.written = 0
+
+    @property
+    def start(self):
+        # Oldest byte still in the ring
+        return max(0, self.written - self.size)
+
+    def write(self, data):
+        n = len(data)
+        view = memoryview(data)
+        if n > self.size:
+            # Only the end fits
+            self.written += n - self.size
+            view = view[n - self.size:]
+            n = self.size
+        pos = self.written % self.size
+        first = min(n, self.size - pos)
+        self.buf[pos:pos + first] = view[:first]
+        if first < n:
+            self.buf[0:n - first] = view[first:]
+        self.written += n
+
+    def read(self, start, end=None):
+        """
+        Bytes between two absolute positions (clamped to what the ring still holds).
+        """
+        if end is None or end > self.written:
+            end = self.written
+        start = max(start, self.start)
+        if start >= end:
+            return b""
+        a = start % self.size
+        b = end % self.size
+        if a < b:
+            return bytes(self.buf[a:b])
+        return bytes(self.buf[a:]) + bytes(self.buf[:b])
+
+
+class Logger:
+    """
+    Named logger. The level is resolved by `configure()` into plain bools, so a disabled
+    call on a hot path costs one attribute test:
+
+        _log = log.get("ws")
+        if _log.debug_on:
+            _log.debug("read", n, "bytes")
+    """
+
+    def __init__(self, name, level=INFO):
+        self.name = name
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = level
+        # The floor (set under stress) raises the level without forgetting it
+        level = max(level, _floor)
+        self.debug_on = level <= DEBUG
+        self.info_on = level <= INFO
+        self.warning_on = level <= WARNING
+        self.error_on = level <= ERROR
+
+    def debug(self, *args):
+        if self.debug_on:
+            _write(DEBUG, self.name, args)
+
+    def info(self, *args):
+        if self.info_on:
+            _write(INFO, self.name, args)
+
+    def warning(self, *args):
+        if self.warning_on:
+            _write(WARNING, self.name, args)
+
+    def error(self, *args):
+        if self.error_on:
+            _write(ERROR, self.name, args)
+            # Errors often come right before a reset: print them now
+            drain(-1)
+
+
+ring = RingBuffer()
+uart = True
+_printed = 0          # ring position already printed on the UART
+_level = INFO
+_floor = DEBUG
+_overrides = {}
+_loggers = {}
+# The network worker thread logs too: writes and UART output hold this lock
+_lock = _thread.allocate_lock() if _thread is not None else None
+
+
+def get(name):
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = Logger(name, _overrides.get(name, _level))
+    return logger
+
+
+def configure(level=INFO, size=None, to_uart=True, overrides=None):
+    """
+    Set the level of every logger (`overrides` maps logger names to their own level),
+    the ring size and the UART output. Called once the config is loaded.
+    """
+    global ring, uart, _level, _overrides, _printed
+    _level = level
+    _overrides = overrides or {}
+    uart = to_uart
+    for name, logger in _loggers.items():
+        logger.set_level(_overrides.get(name, _level))
+
+    if size and size != ring.size:
+        # Keep what was logged during boot
+        old = ring
+        ring = RingBuffer(size)
+        pending = old.read(_printed)
+        ring.write(old.read(old.start))
+        _printed = ring.written - len(pending)
+
+
+def set_floor(level):
+    """
+    Lowest level logged by every logger, whatever its own level (DEBUG: no floor).
+    """
+    global _floor
+    _floor = level
+    for logger in _loggers.values():
+        logger.set_level(logger.level)
+
+
+def _write(level, name, args):
+    if len(args) == 1:
+        message = str(args[0])
+    else:
+        message = " ".join([str(a) for a in args])
+    line = "%d %s %s: %s\n" % (time.ticks_ms(), _TAGS[level], name, message)
+    if _lock is None:
+        ring.write(line.encode())
+        return
+    _lock.acquire()
+    try:
+        ring.write(line.encode())
+    finally:
+        _lock.release()
+
+
+def drain(max_bytes=256):
+    """
+    Print up to `max_bytes` of the pending log on the UART (all of it with -1), whole lines when possible.
+    Called by the App when the main loop is idle.
+    """
+    if _lock is None:
+        _drain(max_bytes)
+        return
+    _lock.acquire()
+    try:
+        _drain(max_bytes)
+    finally:
+        _lock.release()
+
+
+def _drain(max_bytes):
+    global _printed
+    if _printed >= ring.written:
+        return
+    if not uart:
+        _printed = ring.written
+        return
+
+    if _printed < ring.start:
+        # Overwritten before it was printed: restart at the next whole line
+        start = ring.start
+        head = ring.read(start, start + 256)
+        cut = head.find(b"\n")
+        start += cut + 1 if cut >= 0 else _skip_partial(head)
+        _out(("[log] %d bytes lost\n" % (start - _printed)).encode())
+        _printed = start
+        if _printed >= ring.written:
+            return
+
+    end = ring.written if max_bytes < 0 else min(ring.written, _printed + max_bytes)
+    data = ring.read(_printed, end)
+    if end < ring.written:
+        cut = data.rfind(b"\n")
+        if cut >= 0:
+            data = data[:cut + 1]
+        else:
+            # No whole line: never cut inside a character
+            data = data[:_whole_chars(data)]
+    _printed += len(data)
+    _out(data)
+
+
+def _skip_partial(data):
+    """
+    Number of UTF-8 continuation bytes at the start of `data` (the end of a character cut off).
+    """
+    i = 0
+    while i < len(data) and data[i] & 0xC0 == 0x80:
+        i += 1
+    return i
+
+
+def _whole_chars(data):
+    """
+    Length of `data` without its last character when that one is cut off.
+    """
+    n = len(data)
+    i = n - 1
+    while i >= 0 and n - i < 4 and data[i] & 0xC0 == 0x80:
+        i -= 1
+    if i < 0:
+        return n
+    lead = data[i]
+    size = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    return i if i + size > n else n
+
+
+def _out(data):
+    sys.stdout.write(data.decode())
+
+
+def dump():
+    """
+    Everything the ring still holds, as text.
+    """
+    if _lock is None:
+        data = ring.read(ring.start)
+    else:
+        _lock.acquire()
+        try:
+            data = ring.read(ring.start)
+        finally:
+            _lock.release()
+    if ring.start > 0:
+        # Drop the partial first line
+        cut = data.find(b"\n")
+        data = data[cut + 1:] if cut >= 0 else data[_skip_partial(data):]
+    return data.decode()
@@ -0,0 +1,118 @@
+import json
+import machine
+import time
+from time import ticks_ms, ticks_diff
+from framework.utils import log
+
+_log = log.get("state")
+
+# Where the snapshots go: RTC memory (kept by soft, watchdog and deep sleep resets, no wear, about 2 KB),
+# or a flash file (kept by every reset, written at most every FILE_PERIOD_MS)
+STORE_RTC = "rtc"
+STORE_FILE = "file"
+STORE_FILE_PATH = "warm_state.json"
+FILE_PERIOD_MS = 60000
+
+MAGIC = "MYST1"
+
+
+class WarmState:
+    """
+    Small state snapshots that survive a reboot, so a device reset mid-show resumes calibrated.
+
+        App().warm.register("rain.baseline", lambda: self.baseline, self.set_baseline)
+
+    `save()` returns a small JSON value, `restore(value)` is called right away when the previous boot
+    left a value for that name, less than `max_age_s` ago. Snapshots are written every `period_ms`
+    and when the app shuts down; unchanged snapshots aren't written to flash again (only refreshed
+    before they get too old). Nothing is restored after a power-on.
+    """
+
+    def __init__(self, store=STORE_RTC, period_ms=5000, max_age_s=600):
+        self.store = store
+        self.period_ms = max(period_ms, FILE_PERIOD_MS) if store == STORE_FILE else period_ms
+        self.max_age_s = max_age_s
+        self.entries = {}
+        self.writes = 0
+
+        self._last = ticks_ms()
+        self._written = None
+        self._written_at = None
+        self._saved = self._load()
+
+    def register(self, name, save, restore):
+        self.entries[name] = (save, restore)
+        if name not in self._saved:
+            return
+        value = self._saved.pop(name)
+        try:
+            restore(value)
+            _log.info("Restored", name)
+        except Exception as e:
+            _log.warning("Cannot restore", name, e)
+
+    def update(self):
+        now = ticks_ms()
+        if ticks_diff(now, self._last) < self.period_ms:
+            return
+        self._last = now
+        self.save()
+
+    def save(self):
+        if not self.entries:
+            return
+        values = {}
+        for name, (save, _) in self.entries.items():
+            try:
+                values[name] = save()
+            except Exception as e:
+                _log.warning("Cannot save", name, e)
+        data = json.dumps(values)
+
+        now = time.time()
+        if data == self._written and self.store == STORE_FILE \
+                and self._written_at is not None and now - self._written_at < self.max_age_s // 2:
+            # Same snapshot: spare the flash, it is only rewritten to stay fresh
+            return
+        try:
+            self._write(MAGIC + str(int(now)) + "\n" + data)
+        except Exception as e:
+            _log.warning("Cannot write the state:", e)
+            return
+        self._written = data
+        self._written_at = now
+        self.writes += 1
+
+    def _write(self, raw):
+        if self.store == STORE_FILE:
+            with open(STORE_FILE_PATH, "w") as f:
+                f.write(raw)
+        else:
+            machine.RTC().memory(raw.encode())
+
+    def _read(self):
+        if self.store == STORE_FILE:
+            try:
+                with open(STORE_FILE_PATH, "r") as f:
+                    return f.read()
+            except OSError:
+                return ""
+        return bytes(machine.RTC().memory()).decode()
+
+    def _load(self):
+        if machine.reset_cause() == machine.PWRON_RESET:
+            return {}
+        try:
+            raw = self._read()
+            if not raw.startswith(MAGIC):
+                return {}
+            header, data = raw.split("\n", 1)
+            age = time.time() - int(header[len(MAGIC):])
+            if not 0 <= age <= self.max_age_s:
+                _log.info("State too old:", age, "s")
+                return {}
+            values = json.loads(data)
+        except (UnicodeError, ValueError) as e:
+            _log.warning("Bad state:", e)
+            return {}
+        return values if isinstance(values, dict) else {}
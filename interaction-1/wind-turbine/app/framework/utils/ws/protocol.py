@@ -8,7 +8,8 @@ import urandom as random
 import usocket as socket
 import uselect
 from ucollections import namedtuple
-from framework.app import App
+from framework.utils import log
+from framework.utils import kernels
 
 try:
     import uasyncio as asyncio
@@ -41,6 +42,8 @@ CLOSE_TOO_BIG = const(1009)
 CLOSE_MISSING_EXTN = const(1010)
 CLOSE_BAD_CONDITION = const(1011)
 
+_log = log.get("ws")
+
 URL_RE = re.compile(r'(wss|ws)://([A-Za-z0-9-\.]+)(?:\:([0-9]+))?(/.+)?')
 URI = namedtuple('URI', ('protocol', 'hostname', 'port', 'path'))
 
@@ -101,8 +104,8 @@ class Websocket:
         # so the higher-level code can still read it from recv()/arecv().
         self._pending = None
 
-        if App().config.websocket.debug:
-            print("[ws] init: non-blocking socket, poll registered, rx buffer created")
+        if _log.debug_on:
+            _log.debug("init: non-blocking socket, poll registered, rx buffer created")
 
     def __enter__(self):
         return self
@@ -126,24 +129,24 @@ class Websocket:
         try:
             events = self.poll.poll(timeout)
         except Exception as e:
-            if App().config.websocket.debug:
-                print("[ws] _has_data: poll failed:", repr(e))
+            if _log.debug_on:
+                _log.debug("_has_data: poll failed:", repr(e))
             self._close()
             return False
 
-        if App().config.websocket.debug and events:
-            print("[ws] _has_data: events:", events)
+        if _log.debug_on and events:
+            _log.debug("_has_data: events:", events)
 
         for obj, flags in events:
             if obj is self.sock:
                 if flags & fatal_mask:
-                    if App().config.websocket.debug:
-                        print("[ws] _has_data: fatal flags:", flags)
+                    if _log.debug_on:
+                        _log.debug("_has_data: fatal flags:", flags)
                     self._close()
                     return False
                 ready = bool(flags & uselect.POLLIN)
-                if App().config.websocket.debug:
-                    print("[ws] _has_data: ready=", ready, "flags=", flags)
+                if _log.debug_on:
+                    _log.debug("_has_data: ready=", ready, "flags=", flags)
                 return ready
 
         return False
@@ -158,8 +161,8 @@ class Websocket:
         - Does NOT touch the raw socket outside the frame parser.
         """
         if not self.open:
-            if App().config.websocket.debug:
-                print("[ws] check_connection: not open")
+            if _log.debug_on:
+                _log.debug("check_connection: not open")
             return False
 
         POLLNVAL = getattr(uselect, "POLLNVAL", 0)
@@ -168,32 +171,32 @@ class Websocket:
         try:
             events = self.poll.poll(0)
         except Exception as e:
-            if App().config.websocket.debug:
-                print("[ws] check_connection: poll failed:", repr(e))
+            if _log.debug_on:
+                _log.debug("check_connection: poll failed:", repr(e))
             self._close()
             return False
 
         if not events:
-            if App().config.websocket.debug:
-                print("[ws] check_connection: no events -> ok")
+            if _log.debug_on:
+                _log.debug("check_connection: no events -> ok")
             return True
 
-        if App().config.websocket.debug:
-            print("[ws] check_connection: events:", events)
+        if _log.debug_on:
+            _log.debug("check_connection: events:", events)
 
         for obj, flags in events:
             if obj is not self.sock:
                 continue
 
             if flags & fatal_mask:
-                if App().config.websocket.debug:
-                    print("[ws] check_connection: fatal flags:", flags)
+                if _log.debug_on:
+                    _log.debug("check_connection: fatal flags:", flags)
                 self._close()
                 return False
 
             if flags & uselect.POLLIN:
-                if App().config.websocket.debug:
-                    print("[ws] check_connection: POLLIN -> calling recv() to process control frames")
+                if _log.debug_on:
+                    _log.debug("check_connection: POLLIN -> calling recv() to process control frames")
                 try:
                     val = self.recv()
                     # If recv() returned an actual data payload (not '' or None),
@@ -202,20 +205,20 @@ class Websocket:
                         self._pending = val
                 except OSError as e:
                     if e.args and e.args[0] == errno.EAGAIN:
-                        if App().config.websocket.debug:
-                            print("[ws] check_connection: recv() EAGAIN -> ok")
+                        if _log.debug_on:
+                            _log.debug("check_connection: recv() EAGAIN -> ok")
                     else:
-                        if App().config.websocket.debug:
-                            print("[ws] check_connection: recv() socket error:", repr(e))
+                        if _log.debug_on:
+                            _log.debug("check_connection: recv() socket error:", repr(e))
                         self._close()
                         return False
                 except ConnectionClosed:
-                    if App().config.websocket.debug:
-                        print("[ws] check_connection: ConnectionClosed from recv()")
+                    if _log.debug_on:
+                        _log.debug("check_connection: ConnectionClosed from recv()")
                     return False
                 except Exception as e:
-                    if App().config.websocket.debug:
-                        print("[ws] check_connection: recv() failed:", repr(e))
+                    if _log.debug_on:
+                        _log.debug("check_connection: recv() failed:", repr(e))
                     self._close()
                     return False
 
@@ -234,21 +237,21 @@ class Websocket:
             chunk = self.sock.recv(1024)
         except OSError as e:
             if e.args and e.args[0] == errno.EAGAIN:
-                if App().config.websocket.debug:
-                    print("[ws] _fill_rx: EAGAIN (no data right now)")
+                if _log.debug_on:
+                    _log.debug("_fill_rx: EAGAIN (no data right now)")
                 raise NoDataException()
-            if App().config.websocket.debug:
-                print("[ws] _fill_rx: socket error:", repr(e))
+            if _log.debug_on:
+                _log.debug("_fill_rx: socket error:", repr(e))
             raise
 
         if chunk == b"":
-            if App().config.websocket.debug:
-                print("[ws] _fill_rx: recv returned b'' -> peer closed")
+            if _log.debug_on:
+                _log.debug("_fill_rx: recv returned b'' -> peer closed")
             raise ConnectionClosed()
 
         self._rx.extend(chunk)
-        if App().config.websocket.debug:
-            print("[ws] _fill_rx: read", len(chunk), "bytes; rx_len=", len(self._rx))
+        if _log.debug_on:
+            _log.debug("_fill_rx: read", len(chunk), "bytes; rx_len=", len(self._rx))
 
     def _read_exactly(self, n: int) -> bytes:
         """
@@ -261,8 +264,8 @@ class Websocket:
         out = bytes(self._rx[:n])
         self._rx[:] = self._rx[n:]
 
-        if App().config.websocket.debug:
-            print("[ws] _read_exactly:", n, "bytes; remaining rx_len=", len(self._rx))
+        if _log.debug_on:
+            _log.debug("_read_exactly:", n, "bytes; remaining rx_len=", len(self._rx))
 
         return out
 
@@ -286,36 +289,37 @@ class Websocket:
         masked = bool(b2 & 0x80)
         length = (b2 & 0x7F)
 
-        if App().config.websocket.debug:
-            print("[ws] read_frame: fin=", fin, "opcode=", opcode, "masked=", masked, "len7=", length)
+        if _log.debug_on:
+            _log.debug("read_frame: fin=", fin, "opcode=", opcode, "masked=", masked, "len7=", length)
 
         if length == 126:
             (length,) = struct.unpack("!H", self._read_exactly(2))
-            if App().config.websocket.debug:
-                print("[ws] read_frame: extended len16=", length)
+            if _log.debug_on:
+                _log.debug("read_frame: extended len16=", length)
         elif length == 127:
             (length,) = struct.unpack("!Q", self._read_exactly(8))
-            if App().config.websocket.debug:
-                print("[ws] read_frame: extended len64=", length)
+            if _log.debug_on:
+                _log.debug("read_frame: extended len64=", length)
 
         if max_size is not None and length > max_size:
-            if App().config.websocket.debug:
-                print("[ws] read_frame: payload too big:", length, "max_size=", max_size, "-> closing")
+            if _log.debug_on:
+                _log.debug("read_frame: payload too big:", length, "max_size=", max_size, "-> closing")
             self.close(code=CLOSE_TOO_BIG)
             return True, OP_CLOSE, None
 
         mask_bits = b""
         if masked:
             mask_bits = self._read_exactly(4)
-            if App().config.websocket.debug:
-                print("[ws] read_frame: mask_bits read")
+            if _log.debug_on:
+                _log.debug("read_frame: mask_bits read")
 
         payload = self._read_exactly(length) if length else b""
-        if App().config.websocket.debug:
-            print("[ws] read_frame: payload_len=", len(payload))
+        if _log.debug_on:
+            _log.debug("read_frame: payload_len=", len(payload))
 
         if masked:
-            payload = bytes(b ^ mask_bits[i & 3] for i, b in enumerate(payload))
+            payload = bytearray(payload)
+            kernels.xor_mask(payload, mask_bits)
 
         return fin, opcode, payload
 
@@ -329,8 +333,8 @@ class Websocket:
 
         length = len(data)
 
-        if App().config.websocket.debug:
-            print("[ws] write_frame: opcode=", opcode, "len=", length, "mask=", mask)
+        if _log.debug_on:
+            _log.debug("write_frame: opcode=", opcode, "len=", length, "mask=", mask)
 
         # Frame header
         byte1 = 0x80 if fin else 0
@@ -353,7 +357,8 @@ class Websocket:
         if mask:
             mask_bits = struct.pack('!I', random.getrandbits(32))
             self.sock.write(mask_bits)
-            data = bytes(b ^ mask_bits[i % 4] for i, b in enumerate(data))
+            data = bytearray(data)
+            kernels.xor_mask(data, mask_bits)
 
         self.sock.write(data)
 
@@ -383,26 +388,27 @@ class Websocket:
             self._pending = None
             return val
 
-        if not self._has_data(0):
-            if App().config.websocket.debug:
-                print("[ws] recv: no data")
+        # Frames already buffered (several frames read at once) don't show up in poll()
+        if not self._rx and not self._has_data(0):
+            if _log.debug_on:
+                _log.debug("recv: no data")
             return ''
 
         while self.open:
             try:
                 fin, opcode, data = self.read_frame()
             except NoDataException:
-                if App().config.websocket.debug:
-                    print("[ws] recv: partial frame / no data yet")
+                if _log.debug_on:
+                    _log.debug("recv: partial frame / no data yet")
                 return ''
             except ConnectionClosed:
-                if App().config.websocket.debug:
-                    print("[ws] recv: underlying TCP closed")
+                if _log.debug_on:
+                    _log.debug("recv: underlying TCP closed")
                 self._close()
                 raise
             except ValueError as e:
-                if App().config.websocket.debug:
-                    print("[ws] recv: protocol error:", repr(e))
+                if _log.debug_on:
+                    _log.debug("recv: protocol error:", repr(e))
                 self._close()
                 raise ConnectionClosed()
 
@@ -410,45 +416,45 @@ class Websocket:
                 raise NotImplementedError()
 
             if opcode == OP_TEXT:
-                if App().config.websocket.debug:
-                    print("[ws] recv: TEXT frame")
+                if _log.debug_on:
+                    _log.debug("recv: TEXT frame")
                 return data.decode('utf-8')
 
             elif opcode == OP_BYTES:
-                if App().config.websocket.debug:
-                    print("[ws] recv: BYTES frame")
+                if _log.debug_on:
+                    _log.debug("recv: BYTES frame")
                 return data
 
             elif opcode == OP_CLOSE:
-                if App().config.websocket.debug:
-                    print("[ws] recv: CLOSE frame received")
+                if _log.debug_on:
+                    _log.debug("recv: CLOSE frame received")
 
                 close_code = CLOSE_OK
                 if data and len(data) >= 2:
                     close_code = struct.unpack('!H', data[:2])[0]
 
-                if App().config.websocket.debug:
-                    print("[ws] recv: close_code=", close_code)
+                if _log.debug_on:
+                    _log.debug("recv: close_code=", close_code)
 
                 # Reply with CLOSE (RFC 6455)
                 try:
                     payload = data[:2] if data and len(data) >= 2 else struct.pack('!H', CLOSE_OK)
                     self.write_frame(OP_CLOSE, payload)
                 except Exception as e:
-                    if App().config.websocket.debug:
-                        print("[ws] recv: failed to send CLOSE reply:", repr(e))
+                    if _log.debug_on:
+                        _log.debug("recv: failed to send CLOSE reply:", repr(e))
 
                 self._close()
                 return None
 
             elif opcode == OP_PONG:
-                if App().config.websocket.debug:
-                    print("[ws] recv: PONG frame (ignored)")
+                if _log.debug_on:
+                    _log.debug("recv: PONG frame (ignored)")
                 continue
 
             elif opcode == OP_PING:
-                if App().config.websocket.debug:
-                    print("[ws] recv: PING frame -> sending PONG")
+                if _log.debug_on:
+                    _log.debug("recv: PING frame -> sending PONG")
                 self.write_frame(OP_PONG, data)
                 continue
 
@@ -480,8 +486,8 @@ class Websocket:
                 self._close()
                 raise
             except ValueError as e:
-                if App().config.websocket.debug:
-                    print("[ws] arecv: protocol error:", repr(e))
+                if _log.debug_on:
+                    _log.debug("arecv: protocol error:", repr(e))
                 self._close()
                 raise ConnectionClosed()
 
@@ -493,14 +499,14 @@ class Websocket:
             elif opcode == OP_BYTES:
                 return data
             elif opcode == OP_CLOSE:
-                if App().config.websocket.debug:
-                    print("[ws] arecv: CLOSE received")
+                if _log.debug_on:
+                    _log.debug("arecv: CLOSE received")
                 try:
                     payload = data[:2] if data and len(data) >= 2 else struct.pack('!H', CLOSE_OK)
                     self.write_frame(OP_CLOSE, payload)
                 except Exception as e:
-                    if App().config.websocket.debug:
-                        print("[ws] arecv: failed to send CLOSE reply:", repr(e))
+                    if _log.debug_on:
+                        _log.debug("arecv: failed to send CLOSE reply:", repr(e))
                 self._close()
                 return None
             elif opcode == OP_PONG:
@@ -525,16 +531,16 @@ class Websocket:
         else:
             raise TypeError()
 
-        if App().config.websocket.debug:
-            print("[ws] send: opcode=", opcode, "len=", len(buf))
+        if _log.debug_on:
+            _log.debug("send: opcode=", opcode, "len=", len(buf))
 
         self.write_frame(opcode, buf)
 
     def close(self, code=CLOSE_OK, reason=''):
         """Close the websocket."""
         if not self.open:
-            if App().config.websocket.debug:
-                print("[ws] close: code=", code, "reason=", reason)
+            if _log.debug_on:
+                _log.debug("close: code=", code, "reason=", reason)
             return
 
         buf = struct.pack('!H', code) + reason.encode('utf-8')
@@ -542,25 +548,25 @@ class Websocket:
         try:
             self.write_frame(OP_CLOSE, buf)
         except Exception as e:
-            if App().config.websocket.debug:
-                print("[ws] close: failed to send CLOSE:", repr(e))
+            if _log.debug_on:
+                _log.debug("close: failed to send CLOSE:", repr(e))
 
         self._close()
 
     def _close(self):
-        if App().config.websocket.debug:
-            print("[ws] _close: Connection closed")
+        if _log.debug_on:
+            _log.debug("_close: Connection closed")
 
         self.open = False
 
         try:
             self.poll.unregister(self.sock)
         except Exception as e:
-            if App().config.websocket.debug:
-                print("[ws] _close: cannot unregister:", repr(e))
+            if _log.debug_on:
+                _log.debug("_close: cannot unregister:", repr(e))
 
         try:
             self.sock.close()
         except Exception as e:
-            if App().config.websocket.debug:
-                print("[ws] _close: sock.close failed:", repr(e))
+            if _log.debug_on:
+                _log.debug("_close: sock.close failed:", repr(e))
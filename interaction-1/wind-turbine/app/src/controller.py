@@ -4,13 +4,24 @@ from framework.utils.ws.interface import WebsocketInterface
 from framework.components.led_strip import LedStrip
 from framework.app import App
 from framework.utils.timer import Timer
+from framework.utils.dsp import Envelope, PeakDecay, GammaLut, coef, per_block, COEF_BITS
+from framework.utils.audio import BreathProfile
+from framework.utils.trace import Trace
+from framework.utils import log
 import time
 
+_log = log.get("wind-turbine")
+
 
 class WindTurbineController(Controller):
 
     MAX_LEVEL = 5
 
+    # Progression en virgule fixe: 1.0 == ONE
+    ONE = 1024
+
+    actions = ("01-reset",)
+
     def setup(self):
         # =====================================================
         # DEBUG
@@ -19,6 +30,10 @@ class WindTurbineController(Controller):
         self.debug_every_ms = 120        # log ~8 fois/sec
         self._last_debug_ms = 0
 
+        # Trace du niveau micro, pour régler la courbe hors ligne (devkit/python-detector-tuning)
+        self.trace_mic = False           # <- mets True pour enregistrer
+        self.trace = Trace("wind-turbine") if self.trace_mic else None
+
         # =====================================================
         # EXPERIENCE STATE (one-shot trigger)
         # =====================================================
@@ -29,6 +44,11 @@ class WindTurbineController(Controller):
         # =====================================================
         self.min_level = 20
 
+        # Les constantes de lissage ci-dessous sont réglées par mise à jour, à une mise à jour
+        # par tour de boucle (~1 ms). Elles sont appliquées une fois par bloc de 16 ms:
+        # block_steps les convertit (même trajectoire dans le temps, voir per_block)
+        self.tuned_period_ms = 1
+
         self.mic_attack = 0.25
         self.mic_release = 0.85
 
@@ -36,6 +56,19 @@ class WindTurbineController(Controller):
         self.mic_gate_ratio = 0.45
         self.mic_gate_offset = 2.0
 
+        # Echantillonnage par blocs: une analyse (rms, crête, bandes) par bloc de 16 ms
+        self.mic_rate = 2000
+        self.mic_block = 32
+        self.mic_bands = (150, 1000)   # Hz: grondement du souffle / aigus (voix, claquements)
+        self.block_steps = self.mic_block * 1000 // (self.mic_rate * self.tuned_period_ms)
+
+        # Profil souffle: bruit large bande, peu de crête, énergie surtout dans les graves
+        self.breath = BreathProfile(
+            min_rms=self.min_level // 2,
+            max_crest=64,       # crête <= 4x rms
+            min_low_ratio=16    # graves >= aigus
+        )
+
         # =====================================================
         # AUTO CALIBRATION (ROBUST PEAK TRACKING)
         # =====================================================
@@ -44,19 +77,26 @@ class WindTurbineController(Controller):
         self.peak_margin = 1.08
         self.peak_decay = 0.995
 
-        self.observed_peak = float(self.peak_min)
+        self.peak = PeakDecay(self.peak_decay ** self.block_steps, floor=self.peak_min, cap=self.peak_cap)
+        self.peak_margin_q = coef(self.peak_margin)
 
         # =====================================================
         # FEELING PROGRESSION (rampe + courbe)
         # =====================================================
-        self.progress = 0.0
+        self.progress = 0
         self.progress_up = 0.22
         self.progress_down = 0.20
+        self.ramp = Envelope(
+            per_block(self.progress_up, self.block_steps),
+            per_block(self.progress_down, self.block_steps)
+        )
+        self.ramp.reset(0)
 
         self.curve_gamma = 0.25
+        self.curve = GammaLut(self.curve_gamma, in_max=self.ONE, out_max=self.ONE)
 
-        self.level_hyst = 0.05
-        self.full_on_progress = 0.80
+        self.level_hyst = int(0.05 * self.ONE)
+        self.full_on_progress = int(0.80 * self.ONE)
 
         # =====================================================
         # TRIGGER
@@ -85,24 +125,43 @@ class WindTurbineController(Controller):
         # =====================================================
         # MICROPHONE
         # =====================================================
-        Microphone(
+        self.mic = Microphone(
             pin=32,
-            on_level=self.on_mic_level,
+            sample_rate=self.mic_rate,
+            block=self.mic_block,
+            bands=self.mic_bands,
+            on_block=self.on_mic_block,
 
             # envelope
-            attack=self.mic_attack,
-            release=self.mic_release,
+            attack=per_block(self.mic_attack, self.block_steps),
+            release=per_block(self.mic_release, self.block_steps),
 
             # baseline
             alpha_base=self.mic_alpha_base,
             gate_ratio=self.mic_gate_ratio,
             gate_offset=self.mic_gate_offset,
 
+            # redémarrage à chaud: baseline et enveloppe gardées
+            state="wind-turbine.mic",
+
             debug=False
         )
 
-        if App().config.debug:
-            print("[WindTurbine] Controller setup done")
+        # Redémarrage à chaud: la calibration du pic reprend où elle en était
+        App().warm.register("wind-turbine.peak", self.peak.snapshot, self.peak.restore)
+
+        # Réglage à chaud (00-config-set), sans redémarrer ni perdre la calibration
+        tunables = App().tunables
+        tunables.attr("wind-turbine.min_level", self, "min_level", min=0, max=4095)
+        tunables.register("wind-turbine.peak_margin", float, lambda: self.peak_margin, self.set_peak_margin, min=1.0, max=4.0)
+        tunables.attr("wind-turbine.trigger_cooldown_ms", self, "trigger_cooldown_ms", min=0, max=60000)
+        tunables.attr("wind-turbine.trigger_hold_ms", self, "trigger_hold_ms", min=0, max=60000)
+
+        _log.debug("Controller setup done")
+
+    def set_peak_margin(self, margin):
+        self.peak_margin = margin
+        self.peak_margin_q = coef(margin)
 
     # =====================================================
     # WEBSOCKET FRAME RECEIVED (RESET)
@@ -119,13 +178,14 @@ class WindTurbineController(Controller):
         self.completed = False
 
         # Reset visuel + progression
-        self.progress = 0.0
+        self.progress = 0
+        self.ramp.reset(0)
         self.level = 0
         self._full_since_ms = None
         self.last_trigger = 0
 
         # Reset auto-calibration
-        self.observed_peak = float(self.peak_min)
+        self.peak.reset()
 
         # Reset debug throttle
         self._last_debug_ms = 0
@@ -133,56 +193,55 @@ class WindTurbineController(Controller):
         self.strip.clear()
         self.strip.display()
 
-        if App().config.debug:
-            print("[WindTurbine] ✅ Reset done")
+        _log.debug("✅ Reset done")
 
     # =====================================================
-    # MICROPHONE CALLBACK
+    # MICROPHONE CALLBACKS
     # =====================================================
+    def on_mic_block(self, features):
+        # Un appel par bloc: tout ce qui ne ressemble pas à du souffle compte comme du silence
+        level = self.mic.level if self.breath(features) else 0
+        if self.trace is not None:
+            self.trace.add(level)
+        self.on_mic_level(level, self.mic.raw, features.mean)
+
     def on_mic_level(self, mic_level: int, raw: int, baseline: int):
         # Si l'expérience est terminée: on ignore tout et on garde LEDs off
         if self.completed:
             return
 
+        # Tout est en entiers: progress, x et x_eased vont de 0 à ONE
+
         # ---------------------------
         # 1) ROBUST PEAK UPDATE (cap outliers)
         # ---------------------------
         if mic_level > self.min_level:
-            mic_clip = mic_level if mic_level < self.peak_cap else self.peak_cap
-
-            if mic_clip > self.observed_peak:
-                self.observed_peak = float(mic_clip)
-            else:
-                self.observed_peak *= self.peak_decay
-
-        if self.observed_peak < self.peak_min:
-            self.observed_peak = float(self.peak_min)
+            self.peak.update(mic_level)
 
-        dyn_max = self.observed_peak * self.peak_margin
+        dyn_max = (self.peak.get() * self.peak_margin_q) >> COEF_BITS
 
         # ---------------------------
-        # 2) Normalize 0..1 using dyn_max
+        # 2) Normalize 0..ONE using dyn_max
         # ---------------------------
         span = dyn_max - self.min_level
         if span <= 1:
             return
 
-        x = (mic_level - self.min_level) / span
-        if x < 0.0:
-            x = 0.0
-        elif x > 1.0:
-            x = 1.0
+        x = ((mic_level - self.min_level) * self.ONE) // span
+        if x < 0:
+            x = 0
+        elif x > self.ONE:
+            x = self.ONE
 
         # ---------------------------
         # 3) Ease curve
         # ---------------------------
-        x_eased = x ** self.curve_gamma
+        x_eased = self.curve(x)
 
         # ---------------------------
         # 4) Slew-rate smoothing (rampe)
         # ---------------------------
-        a = self.progress_up if x_eased > self.progress else self.progress_down
-        self.progress = (1 - a) * self.progress + a * x_eased
+        self.progress = self.ramp.update(x_eased)
 
         # ---------------------------
         # 5) Progress -> target level (robuste)
@@ -190,7 +249,7 @@ class WindTurbineController(Controller):
         if self.progress >= self.full_on_progress:
             target_level = self.MAX_LEVEL
         else:
-            target_level = int(self.progress * self.MAX_LEVEL + 0.5)
+            target_level = (self.progress * self.MAX_LEVEL + self.ONE // 2) // self.ONE
             if target_level < 0:
                 target_level = 0
             if target_level > self.MAX_LEVEL:
@@ -213,7 +272,7 @@ class WindTurbineController(Controller):
         # ---------------------------
         # 7) DEBUG THROTTLED + BAR
         # ---------------------------
-        self.debug_log(mic_level, raw, baseline, dyn_max, x, x_eased, a)
+        self.debug_log(mic_level, raw, baseline, dyn_max, x, x_eased)
 
         # ---------------------------
         # 8) Trigger hold
@@ -223,8 +282,9 @@ class WindTurbineController(Controller):
     # =====================================================
     # DEBUG LOG
     # =====================================================
-    def debug_log(self, mic_level, raw, baseline, dyn_max, x, x_eased, a):
-        if not self.debug_progress:
+    def debug_log(self, mic_level, raw, baseline, dyn_max, x, x_eased):
+        # Niveau debug seulement: hors debug, ça ne coûte qu'un test
+        if not (self.debug_progress and _log.debug_on):
             return
 
         now = time.ticks_ms()
@@ -233,24 +293,24 @@ class WindTurbineController(Controller):
         self._last_debug_ms = now
 
         width = 20
-        filled = int(self.progress * width)
+        filled = self.progress * width // self.ONE
         if filled < 0:
             filled = 0
         if filled > width:
             filled = width
         bar = "[" + ("#" * filled) + ("-" * (width - filled)) + "]"
 
-        print(
-            f"[WindTurbineDBG] mic={mic_level:3d} raw={raw:4d} base={baseline:4d} "
-            f"peak={int(self.observed_peak):3d} dyn={int(dyn_max):3d} "
-            f"x={x:0.2f} eased={x_eased:0.2f} a={a:0.2f} "
-            f"prog={self.progress:0.2f} lvl={self.level} {bar}"
+        _log.debug(
+            f"mic={mic_level:3d} raw={raw:4d} base={baseline:4d} "
+            f"peak={self.peak.get():3d} dyn={dyn_max:3d} "
+            f"x={x / self.ONE:0.2f} eased={x_eased / self.ONE:0.2f} "
+            f"prog={self.progress / self.ONE:0.2f} lvl={self.level} {bar}"
         )
 
     # =====================================================
     # LEVEL HYSTERESIS (ANTI-FLICKER) - FIXED
     # =====================================================
-    def apply_level_hysteresis(self, p: float, target_level: int) -> int:
+    def apply_level_hysteresis(self, p: int, target_level: int) -> int:
         current = self.level
 
         # Force le niveau 5 quand on dépasse le seuil full
@@ -260,9 +320,9 @@ class WindTurbineController(Controller):
         if target_level == current:
             return current
 
-        # seuils "milieu" entre niveaux: 0.1,0.3,0.5,0.7,0.9
-        def mid_threshold(level_int: int) -> float:
-            return (level_int - 0.5) / self.MAX_LEVEL
+        # seuils "milieu" entre niveaux: 0.1,0.3,0.5,0.7,0.9 (en ONE)
+        def mid_threshold(level_int: int) -> int:
+            return ((2 * level_int - 1) * self.ONE) // (2 * self.MAX_LEVEL)
 
         if target_level > current:
             next_level = min(current + 1, self.MAX_LEVEL)
@@ -321,14 +381,14 @@ class WindTurbineController(Controller):
 
         self.last_trigger = now
 
-        if App().config.debug:
-            print("[WindTurbine] 🌬️ FULL CHARGE → WIND TRIGGER (ONE-SHOT)")
+        _log.info("🌬️ FULL CHARGE → WIND TRIGGER (ONE-SHOT)")
 
         WebsocketInterface().send_value("01-wind-toggle", True)
 
         # Marque l'expérience comme terminée + coupe les LEDs
         self.completed = True
-        self.progress = 0.0
+        self.progress = 0
+        self.ramp.reset(0)
         self.level = 0
         Timer(2000, self._light_off, autostart=True)
 
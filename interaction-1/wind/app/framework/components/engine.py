@@ -1,6 +1,5 @@
 from machine import Pin
 from framework.app import App
-from framework.utils.frames.frame import Frame
 
 class Engine:
     is_on = False
@@ -0,0 +1,108 @@
+"""
+Block-based audio features, computed in integers once per block of samples.
+"""
+import math
+from array import array
+
+# Goertzel coefficients are Q12, inputs are scaled down to 10 bits to keep the recurrence in small ints
+_COEF_BITS = 12
+_INPUT_SHIFT = 2
+
+
+class AudioFeatures:
+    """
+    Features of one block of 12-bit samples, refreshed in place by `compute`:
+        - mean  : DC level of the block
+        - rms   : RMS of the signal around the mean
+        - peak  : largest deviation from the mean
+        - zcr   : mean crossings per second
+        - bands : Goertzel energy per frequency of `bands` (relative units, compare them with each other)
+    """
+
+    def __init__(self, rate_hz, block, bands=()):
+        self.rate_hz = rate_hz
+        self.block = block
+        self.freqs = tuple(bands)
+
+        # Goertzel: the block is analysed at the bin closest to each frequency
+        self._coefs = array("i", [
+            int(2 * math.cos(2 * math.pi * round(block * f / rate_hz) / block) * (1 << _COEF_BITS))
+            for f in self.freqs
+        ])
+
+        self.mean = 0
+        self.rms = 0
+        self.peak = 0
+        self.zcr = 0
+        self.bands = array("i", bytes(4 * len(self.freqs)))
+
+    def compute(self, samples):
+        n = len(samples)
+        mean = sum(samples) // n
+
+        energy = 0
+        peak = 0
+        crossings = 0
+        above = samples[0] >= mean
+        for x in samples:
+            d = x - mean
+            energy += d * d
+            if d < 0:
+                d = -d
+                if above:
+                    crossings += 1
+                    above = False
+            elif not above:
+                crossings += 1
+                above = True
+            if d > peak:
+                peak = d
+
+        self.mean = mean
+        self.rms = int(math.sqrt(energy // n))
+        self.peak = peak
+        self.zcr = crossings * self.rate_hz // n
+
+        for b in range(len(self._coefs)):
+            self.bands[b] = self._goertzel(samples, mean, self._coefs[b])
+        return self
+
+    def _goertzel(self, samples, mean, c):
+        s1 = 0
+        s2 = 0
+        for x in samples:
+            s0 = ((x - mean) >> _INPUT_SHIFT) + ((c * s1) >> _COEF_BITS) - s2
+            s2 = s1
+            s1 = s0
+        # Squared magnitude, scaled down by the block length
+        return (s1 * s1 + s2 * s2 - ((c * s1) >> _COEF_BITS) * s2) // len(samples)
+
+
+class BreathProfile:
+    """
+    Tells sustained blowing apart from ambient noise and transients using block features.
+
+    - `min_rms`   : quieter blocks are ambient noise
+    - `max_crest` : peak / rms ratio (x16) above which the block is a transient (clap, knock, voice attack).
+                    Blowing is noise-like and keeps a low crest factor.
+    - `min_low_ratio` : with two bands (low, high), the low band energy must be at least this many times the
+                    high band energy (x16). Airflow on a capsule is mostly low-frequency rumble. None disables it.
+
+    Returns the breath strength (the block rms) or 0.
+    """
+
+    def __init__(self, min_rms=20, max_crest=80, min_low_ratio=None):
+        self.min_rms = int(min_rms)
+        self.max_crest = int(max_crest)
+        self.min_low_ratio = int(min_low_ratio) if min_low_ratio is not None else None
+
+    def __call__(self, features):
+        rms = features.rms
+        if rms < self.min_rms:
+            return 0
+        if (features.peak << 4) > self.max_crest * rms:
+            return 0
+        if self.min_low_ratio is not None and len(features.bands) >= 2:
+            if (features.bands[0] << 4) < self.min_low_ratio * features.bands[1]:
+                return 0
+        return rms
@@ -0,0 +1,63 @@
+# Plain Python kernels: reference behaviour of framework.utils.kernels.viper.
+
+
+def xor_mask(buf, mask):
+    """
+    buf[i] ^= mask[i % 4], in place (websocket masking, RFC 6455 section 5.3).
+    """
+    for i in range(len(buf)):
+        buf[i] ^= mask[i & 3]
+
+
+def fill_rgb(buf, start, end, rgb):
+    """
+    Pixels [start, end) of a GRB buffer set to the 0xRRGGBB color.
+    """
+    g = (rgb >> 8) & 0xFF
+    r = (rgb >> 16) & 0xFF
+    b = rgb & 0xFF
+    for o in range(start * 3, end * 3, 3):
+        buf[o] = g
+        buf[o + 1] = r
+        buf[o + 2] = b
+
+
+def scale(buf, factor):
+    """
+    Every byte multiplied by factor / 256 (factor: 0..256, 256 keeps the buffer as is).
+    """
+    for i in range(len(buf)):
+        buf[i] = (buf[i] * factor) >> 8
+
+
+def copy_pattern(dst, src, offset):
+    """
+    dst[i] = src[(i + offset) % len(src)]: `src` repeated over `dst`, rotated by `offset`.
+    Works on lists (of pixel tuples) as well as on buffers.
+    """
+    n = len(src)
+    j = offset % n
+    for i in range(len(dst)):
+        dst[i] = src[j]
+        j += 1
+        if j == n:
+            j = 0
+
+
+def sum_bytes(buf):
+    """
+    Sum of every byte: the total channel intensity of an LED buffer.
+    """
+    return sum(buf)
+
+
+def pack_rgb(buf, pixels):
+    """
+    List of (r, g, b) tuples -> GRB buffer.
+    """
+    o = 0
+    for c in pixels:
+        buf[o] = c[1]
+        buf[o + 1] = c[0]
+        buf[o + 2] = c[2]
+        o += 3
@@ -3,6 +3,10 @@ import time
 from framework.app import App
 from framework.components.led import Led
 from framework.utils.gpio import GPIO
+from framework.utils import log
+from framework.utils import boot_profile
+
+_log = log.get("wifi")
 
 class WifiManager:
     _config = {}
@@ -30,17 +34,17 @@ class WifiManager:
     def _update(self):
         if not self.wlan.isconnected():
             self.led.off()
-            print(f"Wifi connection lost. Trying to reconnect...")
+            _log.warning("Wifi connection lost. Trying to reconnect...")
             self._connect()
 
 
     def _setup(self):
-        print(f"{__name__} : WifiManager setup")
+        _log.info("WifiManager setup")
 
         if self._config == {}:
             raise ValueError("WifiManager cannot have an empty config.")
 
-        print(f"Configuring wifi interface on SSID {self._config['ssid']} ... ")
+        _log.info(f"Configuring wifi interface on SSID {self._config['ssid']} ... ")
         self._connect()
 
     def _connect(self):
@@ -52,7 +56,7 @@ class WifiManager:
             self.wlan.active(True)
 
         if not self.wlan.isconnected():
-            print('Connecting to network...')
+            _log.info('Connecting to network...')
             
             self.wlan.disconnect()
             self.wlan.connect(self._config["ssid"], self._config["password"])
@@ -69,4 +73,5 @@ class WifiManager:
 
         # Light the builtin led when wifi is connected
         self.led.on()
-        print('Network config:', self.wlan.ipconfig('addr4'))
+        boot_profile.mark("wifi")
+        _log.info('Network config:', self.wlan.ipconfig('addr4'))
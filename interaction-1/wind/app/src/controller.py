@@ -3,7 +3,8 @@ from framework.components.relay import Relay
 from framework.utils.gpio import GPIO
 
 class WindController(Controller):
-    
+    actions = ("01-wind-toggle", "01-reset")
+
     def setup(self):
         self.relay = Relay(GPIO.GPIO27)
     
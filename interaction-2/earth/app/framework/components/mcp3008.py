@@ -1,6 +1,8 @@
 from machine import SPI, Pin
+from array import array
 import time
 from framework.app import App
+from framework.utils.sampler import Sampler
 
 class Chanel:
     def __init__(self, pin, name, on_value=None) -> None:
@@ -24,7 +26,10 @@ class MCP3008:
             bauds=1_000_000,
             polarity=0,
             phase=0,
-            read_delay=20) -> None:
+            read_delay=20,
+            sample_rate=None,
+            block=8,
+            on_scan=None) -> None:
 
         self.spi = SPI(
             vspi,
@@ -39,22 +44,82 @@ class MCP3008:
         self.chanels = chanels
         self.last_read = time.ticks_ms()
         self.read_delay = read_delay
+
+        # SPI buffers reused by every read
+        self._tx = bytearray(3)
+        self._rx = bytearray(3)
+
+        # Scan vector: one value per channel, refreshed in place and passed whole to `on_scan`
+        self.on_scan = on_scan
+        self.scan = array("H", bytes(2 * len(self.chanels)))
+
+        # Fixed-rate sampling: every channel is read by a Sampler at `sample_rate` Hz
+        # and the values are dispatched by blocks, in acquisition order.
+        # Channels can be assigned after construction: the Sampler is built on the first update,
+        # and again whenever `chanels` is replaced (on the same hardware timer)
+        self.sample_rate = sample_rate
+        self.block = block
+        self.sampler = None
+        self.blocks = []
+        self._sampled = None
+        self._timer_id = None
+
         App().update.append(self.update)
 
+    def _reader(self, pin):
+        return lambda: self._read(pin)
+
+    def _start_sampler(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+            self._timer_id = self.sampler.timer_id
+        self._sampled = self.chanels
+        self.scan = array("H", bytes(2 * len(self.chanels)))
+        self.blocks = [array("H", bytes(2 * self.block)) for _ in self.chanels]
+        if not self.chanels:
+            self.sampler = None
+            return
+        self.sampler = Sampler(self.sample_rate, [self._reader(ch.pin) for ch in self.chanels],
+                               size=self.block * 8, timer_id=self._timer_id)
+        self.sampler.start()
+
     def update(self):
+        if self.sample_rate:
+            if self.chanels is not self._sampled or len(self.chanels) != len(self.blocks):
+                self._start_sampler()
+            if not self.blocks:
+                return
+            while self.sampler.read(self.blocks):
+                for i in range(len(self.blocks[0])):
+                    for k in range(len(self.blocks)):
+                        self.scan[k] = self.blocks[k][i]
+                    self._dispatch()
+            return
+
         now = time.ticks_ms()
         if time.ticks_diff(now, self.last_read) >= self.read_delay:
             self.last_read = now
-            for ch in self.chanels:
-                ch.update(self._read(ch.pin))
+            # Channels can be assigned after construction
+            if len(self.scan) != len(self.chanels):
+                self.scan = array("H", bytes(2 * len(self.chanels)))
+            for k in range(len(self.chanels)):
+                self.scan[k] = self._read(self.chanels[k].pin)
+            self._dispatch()
+
+    def _dispatch(self):
+        scan = self.scan
+        for k in range(len(self.chanels)):
+            self.chanels[k].update(scan[k])
+        if self.on_scan is not None:
+            self.on_scan(scan)
 
 
     def _read(self, ch: int) -> int:
         if not 0 <= ch <= 7:
             raise ValueError("channel must be 0..7")
 
-        tx = bytearray(3)
-        rx = bytearray(3)
+        tx = self._tx
+        rx = self._rx
         tx[0] = 0x01
         tx[1] = 0x80 | (ch << 4)  # single-ended + channel
         tx[2] = 0x00
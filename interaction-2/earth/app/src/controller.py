@@ -4,6 +4,7 @@ from framework.components.button import Button
 from framework.utils.ws.interface import WebsocketInterface
 
 class EarthController(Controller):
+    actions = ()
 
     def setup(self):
         print("Début de l'initialisation...")
@@ -15,21 +16,18 @@ class EarthController(Controller):
         )
 
         self.balance_status = False
-        self.last_status = None
+
+        # N'envoyer que si l'état a changé
+        WebsocketInterface().set_policy("02-balance-toggle", on_change=True)
 
         print("Controller initialisé - Bouton balance prêt sur GPIO 5")
         print("Attendez un appui sur le bouton...")
 
     def update(self):
-        # N'envoyer que si l'état a changé
-        if self.balance_status != self.last_status:
-            WebsocketInterface().send_value(
-                action="02-balance-toggle",
-                value=self.balance_status,
-            )
-
-            self.last_status = self.balance_status
-            print(f">> État changé - BALANCE: {self.balance_status}")
+        WebsocketInterface().send_value(
+            action="02-balance-toggle",
+            value=self.balance_status,
+        )
 
     def shutdown(self):
         print("Controller arrêté")
@@ -1,7 +1,23 @@
 import esp32
+from framework.utils import log
+
+_log = log.get("integrity")
+
+
+def temperature_c():
+    """
+    Chip temperature in °C: mcu_temperature() where the port has it (S2, S3, C3),
+    raw_temperature() (°F) on the original ESP32.
+    """
+    read = getattr(esp32, "mcu_temperature", None)
+    if read is not None:
+        return read()
+    return (esp32.raw_temperature() - 32) * 5 // 9
+
+
 def run_integrity_checks():
     temp = esp32.raw_temperature()
-    print("Current board temp : ",temp)
+    _log.info("Board temperature:", temp, "°F")
 
     if temp > 176:
-        raise SystemError("ESP Temperature exceeds 80°C (176.00°F)")
\ No newline at end of file
+        raise SystemError("ESP Temperature exceeds 80°C (176.00°F)")
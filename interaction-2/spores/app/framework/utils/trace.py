@@ -0,0 +1,60 @@
+import time
+from array import array
+from framework.utils.ws.interface import WebsocketInterface
+
+TRACE_ACTION = "00-trace"
+
+
+class Trace:
+    """
+    Raw sensor trace, streamed over the websocket for offline tuning (devkit/python-detector-tuning).
+
+    `add(value)` records one sample (an int, or one int per channel) with its timestamp.
+    Every `block` samples, a `00-trace` frame is sent:
+
+        {"name": <name>, "channels": <n>, "t0": <ticks_ms of the first sample>,
+         "dt": [<ms since t0>, ...], "v": [<samples, channel by channel>, ...]}
+
+    Meant for tuning sessions only: it adds one frame per block to the websocket traffic.
+    """
+
+    def __init__(self, name, channels=1, block=32):
+        self.name = name
+        self.channels = channels
+        self.block = block
+
+        self._values = array("H", bytes(2 * block * channels))
+        self._dt = array("H", bytes(2 * block))
+        self._count = 0
+        self._t0 = 0
+
+    def add(self, value, now_ms=None):
+        if now_ms is None:
+            now_ms = time.ticks_ms()
+        if self._count == 0:
+            self._t0 = now_ms
+
+        self._dt[self._count] = min(time.ticks_diff(now_ms, self._t0), 65535)
+        base = self._count * self.channels
+        if self.channels == 1:
+            self._values[base] = value
+        else:
+            for k in range(self.channels):
+                self._values[base + k] = value[k]
+
+        self._count += 1
+        if self._count >= self.block:
+            self.flush()
+
+    def flush(self):
+        if not self._count:
+            return
+        n = self._count
+        self._count = 0
+        WebsocketInterface().send_value(TRACE_ACTION, {
+            "name": self.name,
+            "channels": self.channels,
+            "t0": self._t0,
+            "dt": list(self._dt[:n]),
+            "v": list(self._values[:n * self.channels]),
+        })
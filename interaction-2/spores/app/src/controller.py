@@ -21,6 +21,7 @@ class FanController(Controller):
 
         # Register manual dispatcher
         App().on_frame_received.append(self.dispatch_frame)
+        App().subscribe(("02-fan-toggle", "01-interaction-done"))
 
     def dispatch_frame(self, frame):
         if frame.action == "02-fan-toggle":
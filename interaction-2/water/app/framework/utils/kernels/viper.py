@@ -0,0 +1,72 @@
+# MicroPython kernels (viper / native emitters). Same behaviour as framework.utils.kernels.fallback.
+# Viper functions take at most 4 arguments, and buffers must be bytearray / memoryview / array.
+import sys
+import micropython
+
+if sys.implementation.name != "micropython":
+    # ptr8 and the emitters only exist in MicroPython (the host emulator stubs them out)
+    raise ImportError("viper kernels need MicroPython")
+
+
+@micropython.viper
+def xor_mask(buf, mask):
+    p = ptr8(buf)
+    m = ptr8(mask)
+    n = int(len(buf))
+    for i in range(n):
+        p[i] = p[i] ^ m[i & 3]
+
+
+@micropython.viper
+def fill_rgb(buf, start: int, end: int, rgb: int):
+    p = ptr8(buf)
+    g = (rgb >> 8) & 0xFF
+    r = (rgb >> 16) & 0xFF
+    b = rgb & 0xFF
+    o = start * 3
+    stop = end * 3
+    while o < stop:
+        p[o] = g
+        p[o + 1] = r
+        p[o + 2] = b
+        o += 3
+
+
+@micropython.viper
+def scale(buf, factor: int):
+    p = ptr8(buf)
+    n = int(len(buf))
+    for i in range(n):
+        p[i] = (p[i] * factor) >> 8
+
+
+@micropython.native
+def copy_pattern(dst, src, offset):
+    # native, not viper: dst and src can be lists of tuples
+    n = len(src)
+    j = offset % n
+    for i in range(len(dst)):
+        dst[i] = src[j]
+        j += 1
+        if j == n:
+            j = 0
+
+
+@micropython.viper
+def sum_bytes(buf) -> int:
+    p = ptr8(buf)
+    n = int(len(buf))
+    s = 0
+    for i in range(n):
+        s += p[i]
+    return s
+
+
+@micropython.native
+def pack_rgb(buf, pixels):
+    o = 0
+    for c in pixels:
+        buf[o] = c[1]
+        buf[o + 1] = c[0]
+        buf[o + 2] = c[2]
+        o += 3
@@ -0,0 +1,270 @@
+import os
+import json
+import machine
+from time import ticks_ms, ticks_diff
+from framework.utils import log
+
+try:
+    import uhashlib as hashlib
+except ImportError:
+    import hashlib
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+_log = log.get("ota")
+
+# Frames, their value always holds the target "device"
+MANIFEST_REQUEST_ACTION = "00-ota-manifest-request"
+MANIFEST_ACTION = "00-ota-manifest"
+BEGIN_ACTION = "00-ota-begin"
+COMMIT_ACTION = "00-ota-commit"
+ABORT_ACTION = "00-ota-abort"
+STATUS_ACTION = "00-ota-status"
+ACTIONS = (MANIFEST_REQUEST_ACTION, BEGIN_ACTION, COMMIT_ACTION, ABORT_ACTION)
+
+# File chunk: a binary websocket message (little endian)
+#   magic 0xF3, file index in the 00-ota-begin list (H), offset (I), then the bytes
+MAGIC = 0xF3
+
+# Files received are written next to their target, renamed at commit through the journal
+TMP_SUFFIX = ".ota"
+JOURNAL = "ota.journal"  # also checked by name in App, which only imports this module when it exists
+
+# Device files, not part of the app: never listed nor replaced
+EXCLUDE = ("config.json", "config.cache.json", "warm_state.json", "tunables.json", JOURNAL, "__pycache__")
+
+# Time left to the last status frame before the reboot
+REBOOT_DELAY_MS = 500
+
+
+def file_hash(path):
+    """
+    First 8 bytes of the SHA-256 of the file, in hex: the hash of the manifests.
+    """
+    h = hashlib.sha256()
+    buf = bytearray(512)
+    mv = memoryview(buf)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(mv[:n])
+    return binascii.hexlify(h.digest()[:8]).decode()
+
+
+def _is_dir(path):
+    return os.stat(path)[0] & 0x4000
+
+
+def manifest(root=""):
+    """
+    {path: hash} of every app file under `root` (the device root by default).
+    """
+    files = {}
+    for name in os.listdir(root or "."):
+        if name in EXCLUDE or name.endswith(TMP_SUFFIX):
+            continue
+        path = root + "/" + name if root else name
+        if _is_dir(path):
+            files.update(manifest(path))
+        else:
+            files[path] = file_hash(path)
+    return files
+
+
+def _makedirs(path):
+    parts = path.split("/")[:-1]
+    for i in range(len(parts)):
+        d = "/".join(parts[:i + 1])
+        try:
+            os.stat(d)
+        except OSError:
+            os.mkdir(d)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def recover():
+    """
+    Finish an update interrupted while its files were being moved in place (called at boot).
+    """
+    try:
+        with open(JOURNAL, "r") as f:
+            journal = json.loads(f.read())
+    except (OSError, ValueError):
+        return
+    _log.warning("Finishing an interrupted update")
+    _apply(journal)
+
+
+def _apply(journal):
+    for path in journal["files"]:
+        tmp = path + TMP_SUFFIX
+        try:
+            os.stat(tmp)
+        except OSError:
+            # Already in place
+            continue
+        _remove(path)
+        os.rename(tmp, path)
+    for path in journal["delete"]:
+        _remove(path)
+    _remove(JOURNAL)
+
+
+class Ota:
+    """
+    Over-the-air update of the app files, driven by the server (see the communication spec):
+
+    - `00-ota-manifest-request`: answer the {path: hash} of the files
+    - `00-ota-begin` {"files": [[path, size, hash], ...], "delete": [...]}: the files that changed follow,
+      as binary chunks, each one written to `<path>.ota` and checked against its hash
+    - `00-ota-commit`: move every file in place (through a journal, replayed at boot if the board
+      resets in between), delete the others and reboot
+
+    Every step is answered with a `00-ota-status` frame: {"state": "ready" | "file" | "done" | "error", ...}.
+    """
+
+    def __init__(self, interface, enabled=False):
+        self.interface = interface
+        self.enabled = enabled
+        self._files = None
+        self._delete = ()
+        self._index = 0
+        self._offset = 0
+        self._file = None
+        self._hash = None
+        self._reboot_at = None
+
+    def handle(self, frame):
+        value = frame.value if isinstance(frame.value, dict) else {}
+        # Imported here: the App imports the websocket interface
+        from framework.app import App
+        if value.get("device") != App().config.device_id:
+            return
+        if not self.enabled:
+            self._status("error", error="OTA disabled")
+            return
+        try:
+            if frame.action == MANIFEST_REQUEST_ACTION:
+                self.interface.send_value(MANIFEST_ACTION, {"device": App().config.device_id, "files": manifest()})
+            elif frame.action == BEGIN_ACTION:
+                self.begin(value["files"], value.get("delete", ()))
+            elif frame.action == COMMIT_ACTION:
+                self.commit()
+            elif frame.action == ABORT_ACTION:
+                self.abort()
+                self._status("aborted")
+        except Exception as e:
+            _log.error("Update failed:", e)
+            self.abort()
+            self._status("error", error=str(e))
+
+    def begin(self, files, delete=()):
+        self.abort()
+        for path, _, _ in files:
+            self._check_path(path)
+        for path in delete:
+            self._check_path(path)
+        self._files = files
+        self._delete = delete
+        self._index = 0
+        _log.info("Update:", len(files), "file(s),", len(delete), "to delete")
+        # Before _open(): the empty files are acknowledged right away, after "ready"
+        self._status("ready")
+        self._open()
+
+    def _check_path(self, path):
+        if not path or path.startswith("/") or ".." in path.split("/") or path.split("/")[-1] in EXCLUDE:
+            raise ValueError("bad path " + path)
+
+    def _open(self):
+        # Next file, the empty ones are complete right away
+        while self._index < len(self._files):
+            path, size, _ = self._files[self._index]
+            _makedirs(path)
+            self._file = open(path + TMP_SUFFIX, "wb")
+            self._hash = hashlib.sha256()
+            self._offset = 0
+            if size:
+                return
+            self._close()
+
+    def _close(self):
+        path, _, expected = self._files[self._index]
+        self._file.close()
+        self._file = None
+        got = binascii.hexlify(self._hash.digest()[:8]).decode()
+        if got != expected:
+            raise ValueError("hash mismatch " + path)
+        self._status("file", index=self._index)
+        self._index += 1
+
+    def receive(self, data):
+        """
+        A file chunk (binary message). Chunks must come in order.
+        """
+        if self._file is None:
+            return
+        try:
+            index = data[1] | (data[2] << 8)
+            offset = data[3] | (data[4] << 8) | (data[5] << 16) | (data[6] << 24)
+            if index != self._index or offset != self._offset:
+                raise ValueError("unexpected chunk %d@%d" % (index, offset))
+            chunk = memoryview(data)[7:]
+            size = self._files[index][1]
+            if offset + len(chunk) > size:
+                raise ValueError("chunk past the end of " + self._files[index][0])
+            self._file.write(chunk)
+            self._hash.update(chunk)
+            self._offset += len(chunk)
+            if self._offset == size:
+                self._close()
+                self._open()
+        except Exception as e:
+            _log.error("Update failed:", e)
+            self.abort()
+            self._status("error", error=str(e))
+
+    def commit(self):
+        if self._files is None or self._index < len(self._files):
+            raise ValueError("files missing")
+        journal = {"files": [path for path, _, _ in self._files], "delete": list(self._delete)}
+        with open(JOURNAL, "w") as f:
+            f.write(json.dumps(journal))
+        _apply(journal)
+        self._files = None
+        _log.info("Update done, rebooting")
+        self._status("done")
+        # Reboot once the status frame is out
+        from framework.app import App
+        self._reboot_at = ticks_ms()
+        App().update.append(self.update)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._files is not None:
+            for path, _, _ in self._files:
+                _remove(path + TMP_SUFFIX)
+        self._files = None
+
+    def update(self):
+        if self._reboot_at is not None and ticks_diff(ticks_ms(), self._reboot_at) >= REBOOT_DELAY_MS:
+            self.interface.flush_batch()
+            machine.reset()
+
+    def _status(self, state, **extra):
+        from framework.app import App
+        extra["device"] = App().config.device_id
+        extra["state"] = state
+        self.interface.send_value(STATUS_ACTION, extra)
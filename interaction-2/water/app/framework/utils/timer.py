@@ -1,6 +1,9 @@
 from framework.app import App
+from framework.utils import log
 import time
 
+_log = log.get("timer")
+
 class Timer:
     def __init__(self, duration_ms, on_timeout, autostart=False):
         self.duration_ms = int(duration_ms)
@@ -65,4 +68,4 @@ class Timer:
             try:
                 self.on_timeout()
             except Exception as e:
-                print("Timer on_timeout error:", e)
\ No newline at end of file
+                _log.error("Timer on_timeout error:", e)
\ No newline at end of file
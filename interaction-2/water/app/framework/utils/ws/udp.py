@@ -0,0 +1,126 @@
+"""
+UDP datagram transport, for the frames that go straight from device to device on the LAN
+"""
+
+import usocket as socket
+import ustruct as struct
+import urandom as random
+import network
+from framework.utils import log
+
+try:
+    import uerrno as errno
+except ImportError:
+    import errno
+
+_log = log.get("udp")
+
+# Datagram (little endian): magic 0xF4, boot id (H), sequence number (H), then a JSON frame
+MAGIC = 0xF4
+HEADER = "<BHH"
+HEADER_SIZE = 5
+
+MAX_DATAGRAM = 1024
+
+# lwIP value, when the port does not export it
+SO_BROADCAST = getattr(socket, "SO_BROADCAST", 0x20)
+
+
+def broadcast_address():
+    """
+    Broadcast address of the station subnet.
+    """
+    ip, mask = network.WLAN(network.STA_IF).ifconfig()[:2]
+    ip = [int(b) for b in ip.split(".")]
+    mask = [int(b) for b in mask.split(".")]
+    return ".".join(str(i | (~m & 0xFF)) for i, m in zip(ip, mask))
+
+
+class UdpTransport:
+    """
+    Same surface as the websocket (`send`, `recv`, `close`), over non-blocking datagrams:
+
+    - `send` writes the frame to every peer ("host" or "host:port"), or to the subnet broadcast
+      address without peers, `repeat` times
+    - `recv` returns the next frame received (None when there is none), each datagram once:
+      the copies (repeats, broadcast and unicast) and the late ones are dropped by sequence number
+
+    Datagrams can be lost: the frames sent over it also go over the websocket (see WebsocketInterface).
+    """
+
+    def __init__(self, port, peers=(), repeat=1):
+        self.port = port
+        self.repeat = max(1, repeat)
+        self.boot_id = random.getrandbits(16)
+        self.seq = 0
+        # Counters
+        self.sent = 0
+        self.received = 0
+        self.duplicates = 0
+
+        # Last sequence number per (source address, boot id)
+        self._last = {}
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, SO_BROADCAST, 1)
+        self.sock.bind(socket.getaddrinfo("0.0.0.0", port)[0][-1])
+        self.sock.setblocking(False)
+
+        self.peers = [self._resolve(peer) for peer in peers] or [(broadcast_address(), port)]
+        _log.info(f"UDP on port {port}, peers: {self.peers}")
+
+    def _resolve(self, peer):
+        host, _, port = peer.partition(":")
+        return socket.getaddrinfo(host, int(port) if port else self.port)[0][-1]
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        datagram = struct.pack(HEADER, MAGIC, self.boot_id, self.seq) + data
+        self.seq = (self.seq + 1) & 0xFFFF
+        for _ in range(self.repeat):
+            for peer in self.peers:
+                try:
+                    self.sock.sendto(datagram, peer)
+                except OSError as e:
+                    # Full lwIP buffers: the websocket copy still goes
+                    _log.warning(f"Datagram to {peer} not sent: {e}")
+        self.sent += 1
+
+    def recv(self):
+        while True:
+            try:
+                datagram, addr = self.sock.recvfrom(MAX_DATAGRAM)
+            except OSError as e:
+                if e.args[0] not in (errno.EAGAIN, getattr(errno, "EWOULDBLOCK", errno.EAGAIN)):
+                    _log.warning(f"Receive failed: {e}")
+                return None
+            if len(datagram) <= HEADER_SIZE or datagram[0] != MAGIC:
+                continue
+            _, boot_id, seq = struct.unpack(HEADER, datagram[:HEADER_SIZE])
+            if not self._fresh(addr, boot_id, seq):
+                self.duplicates += 1
+                continue
+            try:
+                data = datagram[HEADER_SIZE:].decode()
+            except UnicodeError:
+                continue
+            self.received += 1
+            return data
+
+    def _fresh(self, addr, boot_id, seq):
+        # One window per sender boot: boards sharing an address (emulators) keep apart.
+        # Sent again or late: at most half the sequence space behind the last one
+        key = (addr, boot_id)
+        last = self._last.get(key)
+        if last is not None and not 0 < ((seq - last) & 0xFFFF) < 0x8000:
+            return False
+        self._last[key] = seq
+        return True
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
@@ -0,0 +1,195 @@
+"""
+Integer / fixed-point filter blocks for sensor processing.
+
+MicroPython allocates every float result on the heap, small ints are free. These blocks only do
+int math in the hot path (floats are converted once, in the constructors):
+
+    - coefficients are Q12: `alpha` becomes round(alpha * 4096)
+    - filter states are Q6: the value 100 is stored as 6400, so slow filters don't stall on rounding
+
+Inputs must fit in 12 bits (0..4095, the ESP32 ADC and MCP3008 range) to keep every product
+below the MicroPython small int limit (2**30).
+
+Each block holds `n` channels of state in preallocated `array("i")`, `ch` selects the channel.
+"""
+from array import array
+
+COEF_BITS = 12
+COEF_ONE = 1 << COEF_BITS
+
+VALUE_BITS = 6
+
+_HALF = COEF_ONE >> 1
+
+
+def coef(alpha):
+    """
+    Float coefficient (0..1) to Q12.
+    """
+    return int(alpha * COEF_ONE + 0.5)
+
+
+def per_block(alpha, steps):
+    """
+    Smoothing factor that, applied once, moves as far as `alpha` applied `steps` times.
+    For a decay factor (kept share) use `decay ** steps` instead.
+    """
+    return 1 - (1 - alpha) ** steps
+
+
+class Ema:
+    """
+    Exponential moving average: y += alpha * (x - y).
+    The first sample of each channel initializes it.
+    """
+
+    def __init__(self, alpha, n=1):
+        self.a = coef(alpha)
+        self.state = array("i", bytes(4 * n))
+        self.primed = bytearray(n)
+
+    def reset(self, value=None, ch=0):
+        if value is None:
+            self.primed[ch] = 0
+        else:
+            self.state[ch] = int(value) << VALUE_BITS
+            self.primed[ch] = 1
+
+    def update(self, x, ch=0):
+        xq = x << VALUE_BITS
+        if not self.primed[ch]:
+            self.state[ch] = xq
+            self.primed[ch] = 1
+            return x
+        y = self.state[ch]
+        y += ((xq - y) * self.a + _HALF) >> COEF_BITS
+        self.state[ch] = y
+        return y >> VALUE_BITS
+
+    def get(self, ch=0):
+        return self.state[ch] >> VALUE_BITS
+
+    def snapshot(self):
+        """
+        Raw state of every channel (None: not primed yet), for `restore` after a reboot.
+        """
+        return [self.state[i] if self.primed[i] else None for i in range(len(self.primed))]
+
+    def restore(self, values):
+        for i, v in enumerate(values[:len(self.primed)]):
+            if v is not None:
+                self.state[i] = int(v)
+                self.primed[i] = 1
+
+
+class Envelope(Ema):
+    """
+    Asymmetric EMA: `attack` when the input rises above the state, `release` when it falls under.
+    """
+
+    def __init__(self, attack, release, n=1):
+        super().__init__(attack, n)
+        self.release = coef(release)
+
+    def update(self, x, ch=0):
+        xq = x << VALUE_BITS
+        if not self.primed[ch]:
+            self.state[ch] = xq
+            self.primed[ch] = 1
+            return x
+        y = self.state[ch]
+        a = self.a if xq > y else self.release
+        y += ((xq - y) * a + _HALF) >> COEF_BITS
+        self.state[ch] = y
+        return y >> VALUE_BITS
+
+
+class Baseline(Envelope):
+    """
+    Tracking baseline: follows the input up at `alpha_up` and down at `alpha_down`.
+    A slow `alpha_down` keeps the baseline high while the signal drops (light-drop detection),
+    a slow `alpha_up` keeps it low while the signal rises (noise floor).
+    """
+
+    def __init__(self, alpha_up, alpha_down, n=1):
+        super().__init__(alpha_up, alpha_down, n)
+
+
+class PeakDecay:
+    """
+    Peak follower: jumps to any higher input, otherwise decays by `decay` per update.
+    Clamped to [floor, cap].
+    """
+
+    def __init__(self, decay, floor=0, cap=4095, n=1):
+        self.decay = coef(decay)
+        self.floor = int(floor) << VALUE_BITS
+        self.cap = int(cap) << VALUE_BITS
+        self.state = array("i", [self.floor] * n)
+
+    def reset(self, value=None, ch=0):
+        self.state[ch] = self.floor if value is None else int(value) << VALUE_BITS
+
+    def update(self, x, ch=0):
+        xq = x << VALUE_BITS
+        if xq > self.cap:
+            xq = self.cap
+        p = self.state[ch]
+        if xq > p:
+            p = xq
+        else:
+            p = (p * self.decay) >> COEF_BITS
+        if p < self.floor:
+            p = self.floor
+        self.state[ch] = p
+        return p >> VALUE_BITS
+
+    def get(self, ch=0):
+        return self.state[ch] >> VALUE_BITS
+
+    def snapshot(self):
+        return list(self.state)
+
+    def restore(self, values):
+        for i, v in enumerate(values[:len(self.state)]):
+            self.state[i] = min(max(int(v), self.floor), self.cap)
+
+
+class Hysteresis:
+    """
+    Two-threshold switch: turns on at `x >= on`, back off at `x <= off`.
+    """
+
+    def __init__(self, on, off, n=1):
+        self.on = int(on)
+        self.off = int(off)
+        self.state = bytearray(n)
+
+    def reset(self, ch=0):
+        self.state[ch] = 0
+
+    def update(self, x, ch=0):
+        if self.state[ch]:
+            if x <= self.off:
+                self.state[ch] = 0
+        elif x >= self.on:
+            self.state[ch] = 1
+        return self.state[ch]
+
+
+class GammaLut:
+    """
+    Gamma curve `out_max * (x / in_max) ** gamma` from a lookup table of `size` entries.
+    """
+
+    def __init__(self, gamma, in_max=1024, out_max=1024, size=256):
+        self.in_max = int(in_max)
+        self.last = size - 1
+        self.lut = array("H", [int(out_max * (i / self.last) ** gamma + 0.5) for i in range(size)])
+
+    def __call__(self, x):
+        if x <= 0:
+            return self.lut[0]
+        if x >= self.in_max:
+            return self.lut[self.last]
+        return self.lut[(x * self.last) // self.in_max]
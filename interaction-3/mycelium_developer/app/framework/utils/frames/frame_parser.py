@@ -1,6 +1,89 @@
 import json
 
 from framework.utils.frames.frame import Frame
+from framework.utils.json.schema import Schema
+
+# Compiled once: every received JSON frame is checked against it
+FRAME_SCHEMA = Schema({
+    "metadata": {"type": "dict", "children": {
+        "senderId": {"type": "object"},
+        "timestamp": {"type": "object"},
+    }},
+    "action": {"type": "string"},
+    "value": {"type": "object"},
+}, "frame")
+
+# Value schemas per action, see register_value_schema
+_value_schemas = {}
+
+
+def register_value_schema(action, spec):
+    """
+    Check the value of every `action` frame against `spec`, a template field:
+        register_value_schema("02-fan-speed", {"type": "int"})
+        register_value_schema("03-color", {"type": "dict", "children": {"r": {"type": "int"}, ...}})
+    Missing optional fields of the value get their default.
+    """
+    _value_schemas[action] = Schema({"value": spec}, action)
+
+
+def validate_value(frame):
+    """
+    Errors of the frame value against the schema of its action (none without schema).
+    """
+    schema = _value_schemas.get(frame.action)
+    if schema is None:
+        return ()
+    holder = {"value": frame.value}
+    errors = schema.validate(holder)
+    frame.value = holder["value"]
+    return errors
+
+
+def peek_action(raw_frame):
+    """
+    Extract the "action" value of a raw JSON frame with a plain string scan.
+    Returns None when the action cannot be found unambiguously, in which case
+    the caller has to fall back to the full FrameParser.
+    """
+    if not isinstance(raw_frame, str):
+        return None
+
+    start = raw_frame.find('"action"')
+    if start < 0:
+        return None
+    # A second "action" key (nested in the value) makes the scan ambiguous
+    if raw_frame.find('"action"', start + 8) >= 0:
+        return None
+
+    quote = raw_frame.find('"', start + 8)
+    if quote < 0 or raw_frame[start + 8:quote].strip() != ":":
+        return None
+
+    end = raw_frame.find('"', quote + 1)
+    if end < 0:
+        return None
+
+    action = raw_frame[quote + 1:end]
+    if "\\" in action:
+        return None
+    return action
+
+
+def parse_frames(raw_payload):
+    """
+    Parse a raw payload holding either one frame or a batch (JSON array) of frames.
+    Always returns a list of Frame, in payload order.
+    """
+    try:
+        data = json.loads(raw_payload)
+    except Exception as e:
+        raise RuntimeError(f"FrameParser: Cannot load payload. Reason: {e}")
+
+    if isinstance(data, list):
+        return [FrameParser(item).parse() for item in data]
+    return [FrameParser(data).parse()]
+
 
 class FrameParser:
     frame = None
@@ -19,39 +102,17 @@ class FrameParser:
             raise RuntimeError(f"FrameParser: Cannot validate frame. Reason: {e}")
 
     def load(self, raw_frame):
+        # Frames coming from an already decoded batch
+        if isinstance(raw_frame, dict):
+            return raw_frame
         return json.loads(raw_frame)
 
     def validate(self):
         if self.frame is None:
             raise RuntimeError(f"FrameParser: Cannot validate frame. Reason: frame is None")
 
-        errors = {}
-
-        # --- frame level ---
-        if "metadata" not in self.frame:
-            errors["metadata"] = "Missing 'metadata' key"
-        else:
-            metadata = self.frame["metadata"]
-
-            if "senderId" not in metadata:
-                errors["senderId"] = "Missing 'senderId' key"
-            if "timestamp" not in metadata:
-                errors["timestamp"] = "Missing 'timestamp' key"
-
-        # --- action ---
-        if "action" not in self.frame:
-            errors["action"] = "Missing 'action' key"
-        else:
-            action = self.frame["action"]
-            if not isinstance(action, str):
-                errors["action"] = "'action' must be a string"
-
-        # --- value ---
-        if "value" not in self.frame:
-            errors["value"] = "Missing 'value' key"
-
-        if errors != {}:
-            print(errors)
+        errors = FRAME_SCHEMA.validate(self.frame)
+        if errors:
             raise RuntimeError(f"FrameParser: Cannot load frame. Errors: {errors}")
 
     def parse(self):
@@ -0,0 +1,22 @@
+"""
+Byte-level loops of the hot paths (websocket masking, LED buffers).
+
+On MicroPython the kernels are compiled with the viper / native emitters (framework.utils.kernels.viper),
+anywhere else (host emulator, benchmarks on CPython, firmware built without the native emitters)
+the plain Python versions of framework.utils.kernels.fallback are used. Both give the same results.
+
+Colors are packed ints (0xRRGGBB) and LED buffers are NeoPixel buffers: 3 bytes per pixel, GRB order.
+"""
+try:
+    from framework.utils.kernels.viper import xor_mask, fill_rgb, scale, copy_pattern, sum_bytes, pack_rgb
+    IMPLEMENTATION = "viper"
+except (ImportError, SyntaxError, NameError):
+    from framework.utils.kernels.fallback import xor_mask, fill_rgb, scale, copy_pattern, sum_bytes, pack_rgb
+    IMPLEMENTATION = "python"
+
+
+def rgb(color):
+    """
+    (r, g, b) tuple -> 0xRRGGBB
+    """
+    return (color[0] << 16) | (color[1] << 8) | color[2]
@@ -10,6 +10,7 @@ import ubinascii as binascii
 import urandom as random
 
 from framework.utils.ws.protocol import Websocket, urlparse
+from framework.utils import log
 
 
 class WebsocketClient(Websocket):
@@ -23,14 +24,16 @@ def connect(uri):
     uri = urlparse(uri)
     assert uri
 
-    print(f"Opening connection {uri.hostname}:{uri.port}")
+    log.get("ws").info(f"Opening connection {uri.hostname}:{uri.port}")
 
     sock = socket.socket()
     addr = socket.getaddrinfo(uri.hostname, uri.port)
     sock.connect(addr[0][4])
 
     def send_header(header, *args):
-        sock.write(header % args + '\r\n')
+        # bytes % str only works on MicroPython: encode the arguments
+        args = tuple(a if isinstance(a, bytes) else str(a).encode() for a in args)
+        sock.write(header % args + b'\r\n')
 
     # Sec-WebSocket-Key is 16 bytes of random base64 encoded
     key = binascii.b2a_base64(bytes(random.getrandbits(8)
@@ -42,10 +45,7 @@ def connect(uri):
     send_header(b'Upgrade: websocket')
     send_header(b'Sec-WebSocket-Key: %s', key)
     send_header(b'Sec-WebSocket-Version: 13')
-    send_header(b'Origin: http://{hostname}:{port}'.format(
-        hostname=uri.hostname,
-        port=uri.port)
-    )
+    send_header(b'Origin: http://%s:%s', uri.hostname, uri.port)
     send_header(b'')
 
     header = sock.readline()[:-2]
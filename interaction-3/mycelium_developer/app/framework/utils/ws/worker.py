@@ -0,0 +1,89 @@
+import time
+import _thread
+from framework.utils import log
+
+_log = log.get("ws")
+
+
+class FrameQueue:
+    """
+    Bounded FIFO shared between the main loop and the network worker.
+    When full, the oldest item is dropped and counted in `dropped`.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.dropped = 0
+        self._items = []
+        self._lock = _thread.allocate_lock()
+
+    def put(self, item):
+        self._lock.acquire()
+        try:
+            if len(self._items) >= self.size:
+                self._items.pop(0)
+                self.dropped += 1
+            self._items.append(item)
+        finally:
+            self._lock.release()
+
+    def drain(self):
+        """
+        Return every queued item, oldest first, and empty the queue.
+        """
+        self._lock.acquire()
+        try:
+            items = self._items
+            self._items = []
+        finally:
+            self._lock.release()
+        return items
+
+
+class NetworkWorker:
+    """
+    Runs the socket side of a WebsocketInterface in a `_thread`:
+    connection, recv, frame decoding and filtering, frame encoding and send.
+
+    The main loop only exchanges Frame objects with it:
+        - inbox  : frames already parsed and filtered, drained by WebsocketInterface.update.
+                   Pixel streams and OTA chunks are queued raw: the strip and flash writes happen on the main loop
+        - outbox : lists of frames to encode and send
+    """
+    STACK_SIZE = 16 * 1024
+
+    def __init__(self, interface, queue_size=32, idle_ms=2):
+        self.interface = interface
+        self.inbox = FrameQueue(queue_size)
+        self.outbox = FrameQueue(queue_size)
+        self.idle_ms = idle_ms
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        previous = _thread.stack_size(self.STACK_SIZE)
+        try:
+            _thread.start_new_thread(self._run, ())
+        finally:
+            _thread.stack_size(previous)
+
+    def stop(self):
+        self.running = False
+
+    def _send_queued(self):
+        for frames in self.outbox.drain():
+            self.interface._write_frames(frames)
+
+    def _run(self):
+        _log.info("Network worker started")
+        self.interface.connect()
+        while self.running and not self.interface.CLOSED:
+            try:
+                self.interface.poll(self.inbox.put, self._send_queued)
+            except Exception as e:
+                _log.error(f"Network worker error: {e}")
+            time.sleep_ms(self.idle_ms)
+        self.running = False
+        _log.info("Network worker stopped")
@@ -0,0 +1,208 @@
+import json
+import struct
+
+from framework.utils.frames.frame import Frame
+
+# First byte of every binary message holding frames
+MAGIC = 0xF1
+
+# Action sent by the server (as JSON) with the action-ID table
+ACTION_TABLE = "00-action-table"
+
+# <DEVICE TYPE>-<HEX Color code>, see documentations/communication/spec
+SENDER_TYPES = ("ESP32", "RVR", "SPHERO", "IPHONE", "SERVER", "ARD", "STM32")
+SENDER_INLINE = 7
+
+# Value tags
+T_NULL = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_FLOAT = 4
+T_STR = 5
+T_JSON = 6
+
+
+def _write_varint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(buf, i):
+    n = 0
+    shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _write_str(out, s):
+    data = s.encode("utf-8")
+    _write_varint(out, len(data))
+    out.extend(data)
+
+
+def _read_str(buf, i):
+    n, i = _read_varint(buf, i)
+    return bytes(buf[i:i + n]).decode("utf-8"), i + n
+
+
+def _skip_str(buf, i):
+    n, i = _read_varint(buf, i)
+    return i + n
+
+
+def _sender_code(sender_id):
+    """(hex color << 3) | type index, or None when the id doesn't follow the naming convention."""
+    sep = sender_id.rfind("-")
+    if sep < 0 or sender_id[:sep] not in SENDER_TYPES or len(sender_id) - sep - 1 != 6:
+        return None
+    try:
+        color = int(sender_id[sep + 1:], 16)
+    except ValueError:
+        return None
+    # Decoded as uppercase hex: other spellings (lowercase) are sent inline to come back unchanged
+    if "%06X" % color != sender_id[sep + 1:]:
+        return None
+    return (color << 3) | SENDER_TYPES.index(sender_id[:sep])
+
+
+def _is_float32(value):
+    """True when the value survives float32 (always on the devices): the others go as JSON."""
+    try:
+        return value != value or struct.unpack("<f", struct.pack("<f", value))[0] == value
+    except OverflowError:
+        return False
+
+
+def _write_value(out, value):
+    if value is None:
+        out.append(T_NULL)
+    elif value is False:
+        out.append(T_FALSE)
+    elif value is True:
+        out.append(T_TRUE)
+    elif isinstance(value, int):
+        out.append(T_INT)
+        _write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)
+    elif isinstance(value, float) and _is_float32(value):
+        out.append(T_FLOAT)
+        out.extend(struct.pack("<f", value))
+    elif isinstance(value, str):
+        out.append(T_STR)
+        _write_str(out, value)
+    else:
+        out.append(T_JSON)
+        _write_str(out, json.dumps(value))
+
+
+def _read_value(buf, i):
+    tag = buf[i]
+    i += 1
+    if tag == T_NULL:
+        return None, i
+    if tag == T_FALSE:
+        return False, i
+    if tag == T_TRUE:
+        return True, i
+    if tag == T_INT:
+        n, i = _read_varint(buf, i)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), i
+    if tag == T_FLOAT:
+        return struct.unpack("<f", bytes(buf[i:i + 4]))[0], i + 4
+    if tag == T_STR:
+        return _read_str(buf, i)
+    if tag == T_JSON:
+        raw, i = _read_str(buf, i)
+        return json.loads(raw), i
+    raise RuntimeError(f"BinaryFrame: Unknown value tag {tag}")
+
+
+def _skip_value(buf, i):
+    tag = buf[i]
+    i += 1
+    if tag == T_INT:
+        return _read_varint(buf, i)[1]
+    if tag == T_FLOAT:
+        return i + 4
+    if tag == T_STR or tag == T_JSON:
+        return _skip_str(buf, i)
+    return i
+
+
+def encode(frames, action_ids):
+    """
+    Encode a list of Frame as one binary message.
+    `action_ids` maps an action to its id in the table announced by the server.
+    Actions missing from the table are sent inline.
+    """
+    out = bytearray()
+    out.append(MAGIC)
+    for frame in frames:
+        action_id = action_ids.get(frame.action, 0)
+        _write_varint(out, action_id)
+        if action_id == 0:
+            _write_str(out, frame.action)
+
+        _write_varint(out, max(0, int(frame.metadata.timestamp)))
+
+        code = _sender_code(frame.metadata.sender_id)
+        if code is None:
+            _write_varint(out, SENDER_INLINE)
+            _write_str(out, frame.metadata.sender_id)
+        else:
+            _write_varint(out, code)
+
+        _write_value(out, frame.value)
+    return bytes(out)
+
+
+def decode(buf, table, wanted=None):
+    """
+    Decode a binary message into a list of Frame.
+    The action is decoded first: frames for which `wanted(action)` is False are skipped
+    without decoding their value. Returns (frames, skipped).
+    """
+    if len(buf) == 0 or buf[0] != MAGIC:
+        raise RuntimeError("BinaryFrame: Bad magic")
+
+    frames = []
+    skipped = 0
+    i = 1
+    end = len(buf)
+    while i < end:
+        action_id, i = _read_varint(buf, i)
+        if action_id == 0:
+            action, i = _read_str(buf, i)
+        elif action_id <= len(table):
+            action = table[action_id - 1]
+        else:
+            raise RuntimeError(f"BinaryFrame: Unknown action id {action_id}")
+
+        timestamp, i = _read_varint(buf, i)
+
+        code, i = _read_varint(buf, i)
+        sender_type = code & 0x07
+        if sender_type == SENDER_INLINE:
+            sender_id, i = _read_str(buf, i)
+        else:
+            sender_id = "%s-%06X" % (SENDER_TYPES[sender_type], code >> 3)
+
+        if wanted is not None and not wanted(action):
+            i = _skip_value(buf, i)
+            skipped += 1
+            continue
+
+        value, i = _read_value(buf, i)
+        frames.append(Frame(
+            metadata={"senderId": sender_id, "timestamp": timestamp},
+            action=action,
+            value=value,
+        ))
+    return frames, skipped
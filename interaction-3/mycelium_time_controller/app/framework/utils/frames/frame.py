@@ -12,8 +12,8 @@ class Frame:
         self.action = action
         self.value = value
     
-    def to_json(self):
-        data = {
+    def to_dict(self):
+        return {
             "metadata": {
                 "senderId": self.metadata.sender_id,
                 "timestamp": self.metadata.timestamp,
@@ -22,7 +22,8 @@ class Frame:
             "value": self.value,
         }
 
-        return json.dumps(data)
+    def to_json(self):
+        return json.dumps(self.to_dict())
 
     def __str__(self):
         return f"""
@@ -66,8 +66,15 @@ class TemplateBuilder:
 
 
 class Template:
+    """
+    Template interpreted on every validate() call.
+    framework.utils.json.schema.Schema compiles the same templates once, applies the defaults, and is
+    what the config and the frame parser use.
+    """
     name = ""
-    _fields = {}
+
+    def __init__(self):
+        self._fields = {}
 
     def __str__(self):
         return f"Template: {self.name}"
@@ -88,9 +95,10 @@ class Template:
             # Field is not found in data dict
             if field_name not in data:
                 errors.append(f"Cannot validate json: {field_name} is missing.")
+                continue
 
             # Field is a parent - validate children
-            if isinstance(data[field_name], dict):
+            if isinstance(data[field_name], dict) and template_field.children:
                 errors.extend(self.validate(data[field_name], field_name, template_field.children.items()))
 
             if not isinstance(data[field_name], JsonTypes.get_type(template_field.type)):
@@ -0,0 +1,109 @@
+import micropython
+from array import array
+from machine import Timer
+from framework.app import App
+
+
+class Sampler:
+    """
+    Fixed-rate sampling service.
+
+    A `machine.Timer` ticks at `rate_hz`. Each tick reads every source (a callable returning an int
+    0..65535, e.g. `adc.read`) into its own preallocated `array` ring buffer. The acquisition runs through
+    `micropython.schedule` by default, or directly in the timer callback with `hard=True`
+    (only for allocation-free sources on ports where the callback is a hard ISR).
+
+    Consumers drain whole blocks from the main loop with `read`. A slow loop doesn't drop samples
+    as long as the ring holds them; otherwise the oldest are dropped and counted in `overruns`.
+    """
+
+    # Next hardware timer id handed out when none is given
+    _next_timer = 0
+
+    def __init__(self, rate_hz, sources, size=256, timer_id=None, hard=False):
+        self.rate_hz = rate_hz
+        self.sources = tuple(sources)
+        self.size = size
+        self.hard = hard
+
+        if timer_id is None:
+            timer_id = Sampler._next_timer
+            Sampler._next_timer += 1
+        self.timer_id = timer_id
+        self.timer = Timer(timer_id)
+
+        self._rings = [array("H", bytes(2 * size)) for _ in self.sources]
+        self._views = [memoryview(ring) for ring in self._rings]
+
+        # Monotonic positions wrapped on `_span`: only the timer moves `_head`, only `read` moves `_tail`
+        self._span = size * 1024
+        self._head = 0
+        self._tail = 0
+
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.running = False
+
+        # Bound once so the timer callback doesn't allocate
+        self._acquire_ref = self._acquire
+
+        App().shutdown.append(self.stop)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.timer.init(freq=self.rate_hz, mode=Timer.PERIODIC, callback=self._on_tick)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.timer.deinit()
+
+    def _on_tick(self, _timer):
+        if self.hard:
+            self._acquire(0)
+            return
+        try:
+            micropython.schedule(self._acquire_ref, 0)
+        except RuntimeError:
+            # Schedule queue full: the tick is lost
+            self.missed_ticks += 1
+
+    def _acquire(self, _arg):
+        i = self._head % self.size
+        for k in range(len(self.sources)):
+            self._rings[k][i] = self.sources[k]()
+        self._head = (self._head + 1) % self._span
+
+    def available(self):
+        return min((self._head - self._tail) % self._span, self.size)
+
+    def read(self, blocks):
+        """
+        Copy the next block of samples into `blocks`, one preallocated array per source, all of the same length.
+        Returns the block length, or 0 (and copies nothing) while fewer samples are available.
+        """
+        n = len(blocks[0])
+        head = self._head
+        pending = (head - self._tail) % self._span
+        if pending > self.size:
+            # The timer went around the ring: keep the newest samples
+            self.overruns += pending - self.size
+            self._tail = (head - self.size) % self._span
+            pending = self.size
+        if pending < n:
+            return 0
+
+        start = self._tail % self.size
+        first = min(n, self.size - start)
+        for k in range(len(blocks)):
+            out = memoryview(blocks[k])
+            view = self._views[k]
+            out[0:first] = view[start:start + first]
+            if first < n:
+                out[first:n] = view[0:n - first]
+
+        self._tail = (self._tail + n) % self._span
+        return n
@@ -5,6 +5,8 @@ from framework.utils.ws.interface import WebsocketInterface
 
 class MainController(Controller):
     def setup(self):
+        # One frame per 100ms carrying the number of detents instead of one frame per detent
+        WebsocketInterface().set_policy("03-grow-mycelium", coalesce_ms=100)
         Encoder(pinA=GPIO.GPIO25, pinB=GPIO.GPIO26, onCw=self.increment_mycelium)
 
     def increment_mycelium(self):
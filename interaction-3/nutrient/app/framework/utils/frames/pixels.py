@@ -0,0 +1,173 @@
+from framework.utils import log
+
+_log = log.get("pixels")
+
+# Pixel stream message: a binary websocket message sent by the server to a strip segment (little endian)
+#
+#   magic 0xF2, flags (B), sequence (H), segment name (B length + ASCII), then the pixels:
+#   - raw (flags bit 0 clear): first pixel (H), then n * 3 bytes GRB
+#   - delta (flags bit 0 set): runs of (skip (H), count (H), count * 3 bytes GRB) until the end,
+#     the skipped pixels keep the previous frame
+#   flags bit 1 (key): accept the sequence whatever it is (first frame, server restart)
+#
+# The pixel bytes are in the NeoPixel buffer order: they are copied as is.
+MAGIC = 0xF2
+FLAG_DELTA = 1
+FLAG_KEY = 2
+
+# Segments, by name (bytes), and the strips they are on
+_segments = {}
+_targets = []
+_registered = False
+
+
+class Segment:
+    """
+    `count` pixels of a strip, from `start`, fed by the server. The frames received are kept in
+    `frame`, and copied to the strip buffer when the strip shows a frame.
+    """
+
+    def __init__(self, name, strip, start, count):
+        self.name = name
+        self.start = start
+        self.count = count
+        self.frame = bytearray(count * 3)
+        self._view = memoryview(strip.np.buf)[start * 3:(start + count) * 3]
+        self.seq = None
+        self.fresh = False
+
+        self.received = 0
+        self.late = 0          # older than the last frame applied: dropped
+        self.superseded = 0    # replaced by a newer frame before it was shown
+        self.errors = 0
+
+    def copy(self):
+        self._view[:] = self.frame
+        self.fresh = False
+
+    def stats(self):
+        return {"received": self.received, "late": self.late, "superseded": self.superseded, "errors": self.errors}
+
+
+class _Target:
+    # The segments of one strip, shown together
+
+    def __init__(self, strip):
+        self.strip = strip
+        self.segments = []
+        self.dirty = False
+
+    def fill(self):
+        # Every segment is copied: write_buffer scales the strip buffer in place
+        for segment in self.segments:
+            segment.copy()
+
+
+def register(name, strip, start=0, count=None):
+    """
+    Let the server stream pixels to `count` pixels (default: up to the end) of `strip`, from `start`.
+    The segment is announced to the server in the `00-new-connection` frame.
+
+    The strip shouldn't be displayed by anything else while the server streams to it.
+    """
+    if not strip._packed:
+        raise ValueError("Pixel stream: the strip buffer must be 3 bytes per pixel, GRB")
+    if count is None:
+        count = strip.pixel_num - start
+    if start < 0 or count <= 0 or start + count > strip.pixel_num:
+        raise ValueError(f"Pixel stream: {name} is out of the strip")
+
+    target = None
+    for t in _targets:
+        if t.strip is strip:
+            target = t
+    if target is None:
+        target = _Target(strip)
+        _targets.append(target)
+    segment = Segment(name, strip, start, count)
+    target.segments.append(segment)
+    _segments[name.encode()] = (segment, target)
+
+    global _registered
+    if not _registered:
+        _registered = True
+        # Imported here: the App imports the websocket interface, which imports this module
+        from framework.app import App
+        App().update.append(update)
+    return segment
+
+
+def segments():
+    """
+    {name: pixels} of the registered segments.
+    """
+    return {segment.name: segment.count for segment, _ in _segments.values()}
+
+
+def stats():
+    return {segment.name: segment.stats() for segment, _ in _segments.values()}
+
+
+def receive(data):
+    """
+    Apply a pixel stream message to its segment. Runs on the network thread with a worker:
+    it only writes the segment frame, the strip is written by `update` on the main loop.
+    """
+    if len(data) < 5:
+        return
+    n = data[4]
+    entry = _segments.get(bytes(data[5:5 + n]))
+    if entry is None:
+        return
+    segment, target = entry
+    segment.received += 1
+
+    try:
+        flags = data[1]
+        seq = data[2] | (data[3] << 8)
+        if segment.seq is not None and not flags & FLAG_KEY:
+            d = (seq - segment.seq) & 0xFFFF
+            if d == 0 or d >= 0x8000:
+                segment.late += 1
+                return
+        segment.seq = seq
+
+        mv = memoryview(data)
+        frame = segment.frame
+        size = len(frame)
+        i = 5 + n
+        if flags & FLAG_DELTA:
+            o = 0
+            end = len(data)
+            while i < end:
+                o += (data[i] | (data[i + 1] << 8)) * 3
+                c = (data[i + 2] | (data[i + 3] << 8)) * 3
+                i += 4
+                if o + c > size or i + c > end:
+                    raise ValueError("run out of the segment")
+                frame[o:o + c] = mv[i:i + c]
+                o += c
+                i += c
+        else:
+            o = (data[i] | (data[i + 1] << 8)) * 3
+            i += 2
+            c = min(len(data) - i, size - o)
+            if c > 0:
+                frame[o:o + c] = mv[i:i + c]
+    except (IndexError, ValueError) as e:
+        segment.errors += 1
+        _log.warning("Bad pixel stream message:", e)
+        return
+
+    if segment.fresh:
+        segment.superseded += 1
+    segment.fresh = True
+    target.dirty = True
+
+
+def update():
+    # Main loop: a segment that received a frame has it shown at the strip's next render tick
+    for target in _targets:
+        if target.dirty:
+            target.dirty = False
+            target.strip.show_buffer(target.fill)
@@ -1,10 +1,20 @@
 import time
 import gc
+import json
 from .client import connect as ws_connect
 from framework.app import App
-from framework.utils.frames.frame_parser import FrameParser
+from framework.utils.frames.frame_parser import parse_frames, peek_action, validate_value
 from framework.utils.frames.frame import Frame, Metadata
+from framework.utils.frames import binary
+from framework.utils.frames import pixels
 from framework.utils.abstract_singleton import SingletonBase
+from framework.utils.ws.policy import SendPolicy
+from framework.utils import log
+from framework.utils import boot_profile
+from framework.utils import loop_monitor
+from framework.utils import tunables
+
+_log = log.get("ws")
 
 class WebsocketInterface(SingletonBase):
     CONNECTED = False
@@ -13,26 +23,150 @@ class WebsocketInterface(SingletonBase):
 
     ws = None
 
-    def __init__(self):
-        App().setup.append(self.connect)
-        App().update.append(self.update)
+    # Frames discarded by the action pre-filter
+    filtered_frames = 0
+
+    # Flush the outbox before it grows past this many frames
+    BATCH_MAX = 16
+
+    # Network worker thread, only used when websocket.threaded is set
+    worker = None
+
+    # UDP fast path, only used when udp.enabled is set
+    udp = None
+
+    # Over-the-air updates, only used when ota.enabled is set
+    ota = None
+
+    # Set by close() on the worker thread: the main loop drops the outbox (and UDP) on its next update
+    _release_pending = False
+
+    # Datagrams read per loop iteration at most
+    UDP_MAX_PER_TICK = 8
+
+    # A frame received over UDP and over the websocket: the second copy within this window is dropped
+    COPY_WINDOW_MS = 2000
+
+    def _init_once(self):
         self.RECONNECT = App().config.websocket.reconnect
 
+        if App().config.websocket.threaded:
+            from framework.utils.ws.worker import NetworkWorker
+            self.worker = NetworkWorker(self)
+            App().setup.append(self.worker.start)
+            App().shutdown.append(self.worker.stop)
+        else:
+            App().setup.append(self.connect)
+        App().update.append(self.update)
+
+        # UDP fast path: the actions listed in udp.actions also go straight to the LAN peers.
+        # Opened once the Wi-Fi is up.
+        udp = App().config.udp
+        self._udp_actions = set(udp.actions)
+        if udp.enabled:
+            App().setup.append(self.open_udp)
+        # Actions received over UDP at least once, and their copies waiting for a twin, see _first_copy
+        self._fast_actions = set()
+        self._copies = {}
+
+        # Outbound policies per action
+        self._policies = {}
+
+        # Batching: None sends every frame right away, 0 batches per tick, > 0 per window (ms)
+        self.batch_ms = App().config.websocket.batch_ms
+        self._outbox = []
+        self._batch_start = None
+
+        # Log dump and loop stats requests are answered by every device
+        App().subscribe((log.DUMP_ACTION, loop_monitor.STATS_REQUEST_ACTION))
+
+        # Over-the-air updates: without ota.enabled the module is not even imported, the OTA frames
+        # are filtered out and the server gets no answer
+        self._raw_magics = (pixels.MAGIC,)
+        self._ota_actions = ()
+        if App().config.ota.enabled:
+            from framework.utils import ota
+            self.ota = ota.Ota(self, True)
+            self._raw_magics = (pixels.MAGIC, ota.MAGIC)
+            self._ota_actions = ota.ACTIONS
+            App().subscribe(ota.ACTIONS)
+        App().subscribe(tunables.ACTIONS)
+
+        # Binary frames: offered at connection, used once the server sent its action table
+        self.binary = App().config.websocket.binary
+        self._action_table = None
+        self._action_ids = None
+
+    @classmethod
+    def connected(cls):
+        """
+        The interface when it exists and is connected, else None. For framework services
+        (stall and health reports) that must not create it.
+        """
+        ws = cls._instance
+        if ws is None or ws.ws is None:
+            return None
+        return ws
+
     def connect(self):
-        print("Websocket connecting ...")
+        _log.info("Websocket connecting ...")
         try:
             self.ws = ws_connect(App().config.websocket.server)
         except Exception as e:
-            print(f"An error occured while connecting websocket: {e}")
+            _log.error(f"An error occured while connecting websocket: {e}")
             return
+        boot_profile.mark("ws")
         self.CONNECTED = True
-        print("Websocket connected - sending auth frame ...")
-        self.send_value("00-new-connection")
-        print("Auth frame sent")
+        # The action table is announced again on every connection
+        self._action_table = None
+        self._action_ids = None
+        _log.info("Websocket connected - sending auth frame ...")
+        # Tell the server which payloads this device understands, and the strip segments it can stream to.
+        # Written directly: it must go first and bypass the batching outbox.
+        capabilities = {"batch": True, "binary": self.binary}
+        segments = pixels.segments()
+        if segments:
+            capabilities["pixels"] = segments
+        self._write_frames((self._make_frame("00-new-connection", capabilities),))
+        _log.info("Auth frame sent")
+
+
+    def open_udp(self):
+        # Imported here: boards without udp.enabled never load the socket code
+        from framework.utils.ws.udp import UdpTransport
+        udp = App().config.udp
+        try:
+            self.udp = UdpTransport(udp.port, udp.peers, udp.repeat)
+        except OSError as e:
+            _log.error(f"Cannot open the UDP transport: {e}")
 
+    def set_policy(self, action: str, on_change=False, min_interval_ms=0, deadband=None, coalesce_ms=None):
+        """
+        Configure once how send_value handles an action. See SendPolicy.
+        """
+        self._policies[action] = SendPolicy(
+            on_change=on_change,
+            min_interval_ms=min_interval_ms,
+            deadband=deadband,
+            coalesce_ms=coalesce_ms,
+        )
 
     def send_value(self, action: str, value: any=None):
-        frame = Frame(
+        policy = self._policies.get(action)
+        if policy is not None:
+            now = time.ticks_ms()
+            if not policy.offer(value, now):
+                return
+            self._send_value(action, value)
+            policy.sent(value, now)
+            return
+        self._send_value(action, value)
+
+    def _send_value(self, action, value):
+        self.send_frame(self._make_frame(action, value))
+
+    def _make_frame(self, action, value):
+        return Frame(
             metadata={
                 "senderId": App().config.device_id,
                 "timestamp": int(time.time()),
@@ -40,16 +174,112 @@ class WebsocketInterface(SingletonBase):
             action=action,
             value=value,
         )
-        self.send_frame(frame)
 
     def send_frame(self, frame):
-        self.ws.send(frame.to_json())
+        if self.udp is not None and frame.action in self._udp_actions:
+            # Right away to the peers, the websocket copy follows: the server sees it and it makes up for lost datagrams
+            self.udp.send(frame.to_json())
+        if self.batch_ms is None:
+            self._send_frames((frame,))
+            return
+        if not self._outbox:
+            self._batch_start = time.ticks_ms()
+        self._outbox.append(frame)
+        if len(self._outbox) >= self.BATCH_MAX:
+            self.flush_batch()
+
+    def _send_frames(self, frames):
+        # The worker encodes and writes them on its own thread
+        if self.worker is not None:
+            self.worker.outbox.put(frames)
+        else:
+            self._write_frames(frames)
+
+    def _write_frames(self, frames):
+        if self.ws is None:
+            # Not connected (yet): the frames are lost, like on a closed socket
+            if _log.debug_on:
+                _log.debug(f"Not connected, {len(frames)} frame(s) dropped")
+            return
+        if self._action_ids is not None:
+            self.ws.send(binary.encode(frames, self._action_ids))
+        elif len(frames) == 1:
+            self.ws.send(frames[0].to_json())
+        else:
+            self.ws.send(json.dumps([frame.to_dict() for frame in frames]))
+        if not boot_profile.done:
+            boot_profile.finish("first frame")
+
+    def set_action_table(self, table):
+        """
+        Switch to binary frames with the action-ID table announced by the server.
+        """
+        if not self.binary:
+            return
+        self._action_table = tuple(table)
+        self._action_ids = {action: i + 1 for i, action in enumerate(self._action_table)}
+        _log.info(f"Binary frames enabled, {len(self._action_table)} actions")
+
+    def flush_batch(self):
+        """
+        Send the frames collected by the batching mode as one message.
+        A single JSON frame is sent as a plain frame, several as a JSON array.
+        """
+        if not self._outbox:
+            return
+        frames = self._outbox
+        self._outbox = []
+        self._batch_start = None
+        self._send_frames(frames)
+
+    def flush_policies(self):
+        """
+        Send the values kept pending by a throttling or coalescing policy.
+        """
+        now = time.ticks_ms()
+        for action, policy in self._policies.items():
+            if policy.due(now):
+                value = policy.take()
+                self._send_value(action, value)
+                policy.sent(value, now)
+
+    def flush_pending(self):
+        """
+        Send the policy values and the batched frames that are due.
+        """
+        self.flush_policies()
+        if self._outbox and time.ticks_diff(time.ticks_ms(), self._batch_start) >= self.batch_ms:
+            self.flush_batch()
 
     def update(self):
+        """
+        Main loop hook.
+        Without worker it runs the socket loop itself (see poll). With a worker it only
+        dispatches the frames the worker already parsed and queues the pending ones.
+        The UDP datagrams are always read here.
+        """
+        if self._release_pending:
+            self._release()
+        if self.udp is not None:
+            self.poll_udp()
+        if self.worker is None:
+            self.poll(self.dispatch_frame, self.flush_pending)
+            return
+        for item in self.worker.inbox.drain():
+            if isinstance(item, Frame):
+                self.dispatch_frame(item)
+            else:
+                # Pixel stream or OTA chunk, queued raw by the worker
+                self.handle_raw(item)
+        self.flush_pending()
+
+    def poll(self, on_frame, flush):
         """
         Non-blocking ws loop.
             - Send a heartbeat message
             - Check for incoming messages (recv is now non-blocking)
+            - Pass every decoded frame to on_frame
+            - Call flush to send the outgoing frames
             - Print a message when server gets disconnected
         """
         # The self.ws only exist when we establish connection. Otherwise it's None
@@ -61,19 +291,160 @@ class WebsocketInterface(SingletonBase):
             try:
                 # Check for incoming messages (non-blocking)
                 data = self.ws.recv()
-                if data:  # Only process if data is available
-                    frame = FrameParser(data).parse()
-                    if App().DEBUG:
-                        print(f"[ws] Frame received:{frame}")
-                    App().broadcast_frame(frame)
+                if data and self.worker is not None and self.is_raw(data):
+                    # Strip and flash writes stay on the main loop
+                    on_frame(data)
+                elif data:  # Only process if data is available
+                    for frame in self.decode(data):
+                        on_frame(frame)
+                flush()
             except Exception as e:
-                print(f"An error occured while updating websocket: {e}")
+                _log.error(f"An error occured while updating websocket: {e}")
                 if self.CONNECTED:
-                    print("Websocket server disconnected.")
+                    _log.warning("Websocket server disconnected.")
                 self.close(not self.RECONNECT)
         elif self.RECONNECT:
             self.connect()
 
+    def poll_udp(self):
+        """
+        Dispatch the frames received over UDP, before the websocket ones.
+        """
+        device_id = App().config.device_id
+        for _ in range(self.UDP_MAX_PER_TICK):
+            data = self.udp.recv()
+            if data is None:
+                return
+            try:
+                frames = self.decode(data)
+            except Exception as e:
+                _log.warning(f"Bad datagram dropped: {e}")
+                continue
+            for frame in frames:
+                # Our own broadcasts
+                if frame.metadata.sender_id == device_id:
+                    continue
+                self._fast_actions.add(frame.action)
+                self.dispatch_frame(frame, True)
+
+    def _first_copy(self, frame, fast):
+        """
+        False for the second copy of a frame received over both transports.
+        The copies are paired by sender and action, in order, within COPY_WINDOW_MS:
+        whichever arrives first is dispatched, a copy lost on the way leaves nothing to drop.
+        """
+        now = time.ticks_ms()
+        key = (frame.metadata.sender_id, frame.action)
+        pending = [c for c in self._copies.get(key, ()) if time.ticks_diff(now, c[1]) < self.COPY_WINDOW_MS]
+        for i in range(len(pending)):
+            if pending[i][0] != fast:
+                del pending[i]
+                break
+        else:
+            pending.append((fast, now))
+            self._copies[key] = pending
+            return True
+        if pending:
+            self._copies[key] = pending
+        else:
+            del self._copies[key]
+        return False
+
+    def handle_data(self, data):
+        """
+        Parse a raw payload and broadcast each frame, in order, to the frame handlers.
+        """
+        for frame in self.decode(data):
+            self.dispatch_frame(frame)
+
+    def decode(self, data):
+        """
+        Decode a raw payload (one frame, a batch or a binary message) into the list of frames
+        some handler subscribed to. Other frames are dropped before their value is decoded.
+        Pixel stream messages go straight to their strip segment, OTA chunks to their file: they hold no frame.
+        """
+        if isinstance(data, (bytes, bytearray)):
+            if self.is_raw(data):
+                self.handle_raw(data)
+                return ()
+            frames, skipped = binary.decode(data, self._action_table or (), self._wants)
+            self.filtered_frames += skipped
+        else:
+            action = peek_action(data)
+            if action is not None and not self._wants(action):
+                self.filtered_frames += 1
+                return ()
+            frames = parse_frames(data)
+
+        wanted = []
+        for frame in frames:
+            if frame.action == binary.ACTION_TABLE:
+                self.set_action_table(frame.value)
+                continue
+            if not App().is_subscribed(frame.action):
+                self.filtered_frames += 1
+                continue
+            errors = validate_value(frame)
+            if errors:
+                _log.warning(f"Frame {frame.action} dropped: {errors}")
+                continue
+            wanted.append(frame)
+        return wanted
+
+    def is_raw(self, data):
+        """
+        True for the binary messages that hold no frame: pixel streams and OTA chunks.
+        """
+        return isinstance(data, (bytes, bytearray)) and len(data) > 0 and data[0] in self._raw_magics
+
+    def handle_raw(self, data):
+        if data[0] == pixels.MAGIC:
+            pixels.receive(data)
+        else:
+            self.ota.receive(data)
+
+    def dispatch_frame(self, frame, fast=False):
+        """
+        `fast`: the frame came over UDP.
+        """
+        if frame.action in self._fast_actions and not self._first_copy(frame, fast):
+            return
+        if _log.debug_on:
+            _log.debug(f"Frame received:{frame}")
+        if frame.action == log.DUMP_ACTION:
+            self.send_log(frame.value)
+            return
+        if frame.action == loop_monitor.STATS_REQUEST_ACTION:
+            self.send_loop_stats(frame.value)
+            return
+        if frame.action in self._ota_actions:
+            self.ota.handle(frame)
+            return
+        if frame.action in tunables.ACTIONS:
+            App().tunables.handle(frame, self)
+            return
+        App().broadcast_frame(frame)
+
+    def send_log(self, device_id=None):
+        """
+        Answer a `00-log-dump` frame (for every device, or the one whose id is the value)
+        with the content of the log ring buffer.
+        """
+        if device_id not in (None, "", App().config.device_id):
+            return
+        self.send_value(log.LOG_ACTION, log.dump())
+
+    def send_loop_stats(self, device_id=None):
+        """
+        Answer a `00-loop-stats-dump` frame (same targeting as `send_log`) with the loop time histogram.
+        """
+        if device_id not in (None, "", App().config.device_id):
+            return
+        self.send_value(loop_monitor.STATS_ACTION, App().monitor.stats())
+
+    def _wants(self, action):
+        return action == binary.ACTION_TABLE or App().is_subscribed(action)
+
     async def aupdate(self):
         """
         Async update method using arecv().
@@ -90,24 +461,38 @@ class WebsocketInterface(SingletonBase):
             try:
                 data = await self.ws.arecv()
                 if data:  # Only process if data is available
-                    frame = FrameParser(data).parse()
-                    print(f"Recv: {frame.action} from {frame.metadata.sender_id}")
-                    App().broadcast_frame(frame)
+                    self.handle_data(data)
             except Exception as e:
-                print(f"An error occured while updating websocket: {e}")
+                _log.error(f"An error occured while updating websocket: {e}")
                 if self.CONNECTED:
-                    print("Websocket server disconnected.")
+                    _log.warning("Websocket server disconnected.")
                 self.close(not self.RECONNECT)
         elif self.RECONNECT:
             self.connect()
 
     def close(self, shutdown=True):
+        """
+        Close the websocket. The outbox and the UDP transport belong to the main loop:
+        with a worker (which calls this from its thread) they are released on the next update.
+        """
         self.CONNECTED = False
         self.CLOSED = shutdown
+        if self.worker is None:
+            self._release()
+        else:
+            self._release_pending = True
         try:
             self.ws.close()
         except Exception as e:
-            print(f"An error occured when closing websocket: {e}")
+            _log.error(f"An error occured when closing websocket: {e}")
             del self.ws
             gc.collect()
             pass
+
+    def _release(self):
+        # Main loop only: the pending frames are dropped, UDP closes with the interface
+        self._release_pending = False
+        self._outbox = []
+        if self.CLOSED and self.udp is not None:
+            self.udp.close()
+            self.udp = None
@@ -9,11 +9,14 @@ class MainController(Controller):
     animation_duration = 10000  # ms
     animated = False
 
+    actions = ("03-nutrient-animate-on", "03-nutrient-animate-off", "03-nutrient-start-animation")
+
     def setup(self):
-        self.led_strip = LedStrip(GPIO.GPIO27, 200)
+        # 30 images/s: le flow calcule sa position avec le temps écoulé, pas besoin de plus
+        self.led_strip = LedStrip(GPIO.GPIO27, 200, fps=30)
         self.pixels = self.led_strip.pixels
         
-        self.reverse_led_strip = LedStrip(GPIO.GPIO26, 100)
+        self.reverse_led_strip = LedStrip(GPIO.GPIO26, 100, fps=30)
         self.reverse_pixels = self.reverse_led_strip.pixels
 
         self.flow = NutrientFlow(
@@ -38,23 +41,18 @@ class MainController(Controller):
         # Timer qui stoppera l'animation après animation_duration
         self.animation_timer = Timer(self.animation_duration, self.stop_animation)
 
-    def update(self):
-        if self.animated:
-            self.handle_animation()
-
-    def handle_animation(self):
-        self.flow.step(self.pixels)
-        self.reverse_flow.step(self.reverse_pixels)
-
-        self.led_strip.display()
-        self.reverse_led_strip.display()
+    def set_animated(self, animated):
+        # Les strips appellent flow.step à chaque image affichée
+        self.animated = animated
+        self.led_strip.animate(self.flow.step if animated else None)
+        self.reverse_led_strip.animate(self.reverse_flow.step if animated else None)
 
     def start_animation(self):
-        self.animated = True
+        self.set_animated(True)
         self.animation_timer.start()
 
     def stop_animation(self):
-        self.animated = False
+        self.set_animated(False)
 
         # Clear les leds
         self.led_strip.clear()
@@ -67,10 +65,10 @@ class MainController(Controller):
 
     def on_frame_received(self, frame):
         if frame.action == "03-nutrient-animate-on":
-            self.animated = True
+            self.set_animated(True)
             
         elif frame.action == "03-nutrient-animate-off":
-            self.animated = False
+            self.set_animated(False)
             self.led_strip.clear()
             self.reverse_led_strip.clear()
 
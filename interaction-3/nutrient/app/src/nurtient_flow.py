@@ -1,4 +1,5 @@
 import time
+from framework.utils import kernels
 
 class NutrientFlow:
     """
@@ -23,6 +24,10 @@ class NutrientFlow:
         self.pos = 0.0
         self._last = time.ticks_ms()
 
+        # Un motif complet (period pixels), recalculé seulement quand couleur / motif changent
+        self._pattern = None
+        self._pattern_key = None
+
     def set_speed(self, speed):
         self.speed = float(speed)
 
@@ -43,6 +48,26 @@ class NutrientFlow:
         # k: 0..1
         return (int(c[0]*k), int(c[1]*k), int(c[2]*k))
 
+    def _get_pattern(self):
+        key = (self.color, self.wave_len, self.gap_len, self.fade)
+        if key != self._pattern_key:
+            pattern = [(0, 0, 0)] * self.period
+            for j in range(self.wave_len):
+                if self.fade and self.wave_len >= 3:
+                    # bords adoucis: 20% -> 100% -> 20%
+                    if j == 0 or j == self.wave_len - 1:
+                        k = 0.2
+                    elif j == 1 or j == self.wave_len - 2:
+                        k = 0.6
+                    else:
+                        k = 1.0
+                    pattern[j] = self._scale(self.color, k)
+                else:
+                    pattern[j] = self.color
+            self._pattern = pattern
+            self._pattern_key = key
+        return self._pattern
+
     def step(self, pixels):
         # delta time
         now = time.ticks_ms()
@@ -53,29 +78,9 @@ class NutrientFlow:
         direction = -1.0 if self.reverse else 1.0
         self.pos = (self.pos + direction * self.speed * dt) % self.period
 
-        # Nettoyage buffer
-        for i in range(self.n):
-            pixels[i] = (0, 0, 0)
-
-        # Dessin des vagues (motif répété sur tout le strip)
+        # Le motif est répété sur tout le strip, décalé de pos:
+        # le pixel i affiche pattern[(i - pos) % period]
         base = int(self.pos)  # décalage entier
-        for start in range(-self.period, self.n + self.period, self.period):
-            head = start + base
-
-            # wave_len leds allumées à partir de head
-            for j in range(self.wave_len):
-                idx = head + j
-                if 0 <= idx < self.n:
-                    if self.fade and self.wave_len >= 3:
-                        # bords adoucis: 20% -> 100% -> 20%
-                        if j == 0 or j == self.wave_len - 1:
-                            k = 0.2
-                        elif j == 1 or j == self.wave_len - 2:
-                            k = 0.6
-                        else:
-                            k = 1.0
-                        pixels[idx] = self._scale(self.color, k)
-                    else:
-                        pixels[idx] = self.color
+        kernels.copy_pattern(pixels, self._get_pattern(), -base)
 
         return pixels
\ No newline at end of file
@@ -1,4 +1,5 @@
 from framework.app import App
+from framework.utils import health
 from dht import DHT11
 from machine import Pin
 import time
@@ -7,7 +8,10 @@ class DHTSensor:
     temperature = None
     humidity = None
 
-    def __init__(self, pin, onChange=None, onTemperatureChange=None, onHumidityChange=None):
+    def __init__(self, pin, onChange=None, onTemperatureChange=None, onHumidityChange=None, interval_ms=1000):
+        # The DHT11 measures at most once per second, measure() blocks the loop meanwhile
+        self.interval_ms = interval_ms
+        self._last = None
         self.onChange = onChange
         self.onTemperatureChange = onTemperatureChange
         self.onHumidityChange = onHumidityChange
@@ -17,6 +21,12 @@ class DHTSensor:
         App().update.append(self.update)
 
     def update(self):
+        now = time.ticks_ms()
+        interval = self.interval_ms * health.policy.interval_scale
+        if self._last is not None and time.ticks_diff(now, self._last) < interval:
+            return
+        self._last = now
+
         try:
             self.d.measure()
             t = self.d.temperature()
@@ -0,0 +1,47 @@
+import time
+from framework.utils import log
+
+_log = log.get("boot")
+
+# (phase, ticks_ms at its end). ticks_ms starts at 0 on power-on.
+phases = []
+done = False
+
+
+def mark(phase):
+    """
+    End of a boot phase. Ignored once the boot is over.
+    """
+    if not done:
+        phases.append((phase, time.ticks_ms()))
+
+
+def finish(phase):
+    """
+    Last boot phase (first frame sent, or end of setup without websocket): log the profile once.
+    """
+    global done
+    if done:
+        return
+    mark(phase)
+    done = True
+    _log.info("Boot profile:", summary())
+
+
+def durations():
+    """
+    [(phase, ms spent in it), ...], the first phase counting from power-on.
+    """
+    out = []
+    last = 0
+    for phase, t in phases:
+        out.append((phase, time.ticks_diff(t, last)))
+        last = t
+    return out
+
+
+def summary():
+    parts = ["%s=%dms" % (phase, ms) for phase, ms in durations()]
+    if phases:
+        parts.append("total=%dms" % phases[-1][1])
+    return " ".join(parts)
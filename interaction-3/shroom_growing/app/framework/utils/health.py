@@ -0,0 +1,148 @@
+import gc
+from time import ticks_ms, ticks_diff
+from framework.utils import log
+from framework.utils.integrity import temperature_c
+
+_log = log.get("health")
+
+# Sent on every level change
+HEALTH_ACTION = "00-health"
+
+
+class Policy:
+    """
+    What a degradation level allows. Read by the components where they use it:
+
+    - frame_ms: minimum time between two LED frames (0: no limit)
+    - brightness, current: LED brightness and current budget, /256
+    - log_floor: lowest log level (debug traces dropped above DEBUG)
+    - interval_scale: factor applied to the sensor polling intervals
+    """
+
+    def __init__(self, name, frame_ms, brightness, current, log_floor, interval_scale):
+        self.name = name
+        self.frame_ms = frame_ms
+        self.brightness = brightness
+        self.current = current
+        self.log_floor = log_floor
+        self.interval_scale = interval_scale
+
+
+# Level 0 to 3. The level is the worst of the temperature and heap levels.
+POLICIES = (
+    Policy("normal", 0, 256, 256, log.DEBUG, 1),
+    Policy("reduced", 33, 256, 256, log.INFO, 1),
+    Policy("low", 50, 192, 192, log.INFO, 2),
+    Policy("critical", 100, 128, 128, log.WARNING, 4),
+)
+
+# Active policy, read by the components
+level = 0
+policy = POLICIES[0]
+
+# A level is left once the reading is back past its threshold by this much
+TEMP_HYSTERESIS_C = 3
+HEAP_HYSTERESIS = 4096
+
+
+def _grade(value, thresholds, current, margin, rising):
+    """
+    Level of `value` against ascending thresholds (descending for the free heap: rising=False),
+    staying at `current` until the value is `margin` past the threshold below it.
+    """
+    grade = 0
+    for t in thresholds:
+        if (value >= t) if rising else (value <= t):
+            grade += 1
+    if grade < current:
+        t = thresholds[current - 1]
+        still = (value > t - margin) if rising else (value < t + margin)
+        if still:
+            return current
+    return grade
+
+
+class HealthMonitor:
+    """
+    Samples the chip temperature and the free heap every `period_ms` and moves the global level
+    (`framework.utils.health.level` / `policy`) up and down the POLICIES table.
+    Each change is logged and sent as a `00-health` frame (or when the websocket is back).
+    """
+
+    def __init__(self, period_ms=5000, temp_c=(60, 70, 78), heap_free=(32768, 16384, 8192)):
+        self.period_ms = period_ms
+        # One threshold per level above "normal"
+        self.temp_c = tuple(temp_c)[:len(POLICIES) - 1]
+        self.heap_free = tuple(heap_free)[:len(POLICIES) - 1]
+
+        self.temp = None
+        self.free = None
+        self._temp_level = 0
+        self._heap_level = 0
+        self._last = None
+        self._report = None
+        # Called with the new level on every change
+        self.listeners = []
+
+    def update(self):
+        now = ticks_ms()
+        if self._last is not None and ticks_diff(now, self._last) < self.period_ms:
+            if self._report is not None:
+                self._send()
+            return
+        self._last = now
+        self.sample()
+
+    def sample(self):
+        try:
+            self.temp = temperature_c()
+        except Exception:
+            # No sensor on this port: the heap alone drives the level
+            self.temp = None
+        self.free = gc.mem_free()
+
+        if self.temp is not None:
+            self._temp_level = _grade(self.temp, self.temp_c, self._temp_level, TEMP_HYSTERESIS_C, True)
+        self._heap_level = _grade(self.free, self.heap_free, self._heap_level, HEAP_HYSTERESIS, False)
+
+        new = max(self._temp_level, self._heap_level)
+        if new != level:
+            self.apply(new)
+
+    def apply(self, new):
+        global level, policy
+        old = level
+        level = new
+        policy = POLICIES[new]
+        log.set_floor(policy.log_floor)
+        if new >= len(POLICIES) - 1:
+            gc.collect()
+
+        cause = "temperature" if self._temp_level >= self._heap_level else "heap"
+        message = ("Health %s -> %s (%s): temp=%s°C free=%s" %
+                   (POLICIES[old].name, policy.name, cause, self.temp, self.free))
+        if new > old:
+            _log.warning(message)
+        else:
+            _log.info(message)
+
+        self._report = {
+            "level": new,
+            "policy": policy.name,
+            "cause": cause,
+            "temp_c": self.temp,
+            "heap_free": self.free,
+        }
+        self._send()
+        for listener in self.listeners:
+            listener(new)
+
+    def _send(self):
+        # Imported here: the websocket interface imports the App
+        from framework.utils.ws.interface import WebsocketInterface
+        ws = WebsocketInterface.connected()
+        if ws is None:
+            return
+        report = self._report
+        self._report = None
+        ws.send_value(HEALTH_ACTION, report)
@@ -0,0 +1,100 @@
+import json
+from framework.utils.json.types import JsonTypes
+
+# Accepted Python types per template type. None: anything (null included).
+_TYPES = dict(JsonTypes.types)
+_TYPES["float"] = (int, float)
+_TYPES["object"] = None
+
+
+def _copy(value):
+    # Defaults are shared by every validation: never hand out the template's own dict or list
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class Schema:
+    """
+    A JSON template (same format as templates/config.template.json) compiled once into a flat list of steps.
+
+    validate(data) runs the steps in order: presence, type, and defaults written into `data` in the same pass.
+    Nested dicts are handled with slots: the step of a dict field stores the dict in its slot,
+    the steps of its children (which come right after) read their container from that slot.
+    When a missing dict gets its default, its children get their defaults but are not required.
+    """
+
+    def __init__(self, fields, name="schema"):
+        self.name = name
+        # (parent slot, key, path, types, required, has_default, default, child slot or -1)
+        self.steps = []
+        self.slots = 1
+        self._compile(fields, 0, "")
+
+    @classmethod
+    def from_file(cls, filepath, name=None):
+        with open(filepath, "r") as f:
+            return cls(json.loads(f.read()), name or filepath)
+
+    def _compile(self, fields, parent, prefix):
+        for key, spec in fields.items():
+            kind = spec["type"]
+            if kind not in _TYPES:
+                raise ValueError(f"Schema {self.name}: {prefix}{key}: unknown type {kind}")
+            children = spec.get("children")
+            child = -1
+            if kind == "dict" and children:
+                child = self.slots
+                self.slots += 1
+            self.steps.append((
+                parent, key, prefix + key, _TYPES[kind],
+                spec.get("required", True), "default" in spec, spec.get("default"), child,
+            ))
+            if child >= 0:
+                self._compile(children, child, prefix + key + ".")
+
+    def validate(self, data):
+        """
+        Returns the list of errors (empty when valid). Missing optional fields get their default.
+        """
+        if not isinstance(data, dict):
+            return [f"{self.name}: expected an object"]
+
+        errors = []
+        slots = [None] * self.slots
+        lenient = [False] * self.slots
+        slots[0] = data
+        for parent, key, path, types, required, has_default, default, child in self.steps:
+            container = slots[parent]
+            if container is None:
+                continue
+
+            from_default = False
+            if key in container:
+                value = container[key]
+                if types is not None and not isinstance(value, types):
+                    errors.append(f"{path}: type does not match")
+                    value = None
+            elif has_default:
+                value = container[key] = _copy(default)
+                from_default = True
+            else:
+                if required and not lenient[parent]:
+                    errors.append(f"{path}: is missing")
+                value = None
+
+            if child >= 0:
+                slots[child] = value if isinstance(value, dict) else None
+                lenient[child] = from_default or lenient[parent]
+        return errors
+
+    def check(self, data):
+        """
+        validate() raising a ValueError with every error.
+        """
+        errors = self.validate(data)
+        if errors:
+            raise ValueError(f"Cannot validate {self.name}: {errors}")
+        return data
@@ -5,6 +5,8 @@ from framework.utils.timer import Timer
 
 class MainController(Controller):
     animation_duration = 1000   # ms
+
+    actions = ("03-grow-shroom",)
     
     def setup(self):
         self.relay = Relay(GPIO.GPIO27)
@@ -2,12 +2,19 @@ from framework.app import App
 from framework.utils.frames.frame import Frame
 
 class Controller:
+    # Actions handled in on_frame_received. None means every action.
+    actions = None
+
     def __init__(self):
         App().setup.append(self.setup)
         App().update.append(self.update)
         App().shutdown.append(self.shutdown)
         App().on_frame_received.append(self.on_frame_received)
 
+        # Controllers that don't override on_frame_received don't need any frame
+        if type(self).on_frame_received is not Controller.on_frame_received:
+            App().subscribe(self.actions)
+
     def setup(self):
         pass
 
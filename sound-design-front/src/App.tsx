@@ -61,12 +61,14 @@ function AppContent() {
             }
 
             videoRef.current.play().catch(e => console.error("Video play failed", e));
-            
+
+            // Coalesced frames carry the number of encoder steps: play the video for each of them
+            const steps = typeof lastFrame.value === 'number' && lastFrame.value > 1 ? lastFrame.value : 1;
             playTimeoutRef.current = setTimeout(() => {
                 if (videoRef.current) {
                     videoRef.current.pause();
                 }
-            }, videoPlayTime);
+            }, videoPlayTime * steps);
         }
     } else if (lastFrame.action === 'connected-clients') {
         if (Array.isArray(lastFrame.value)) {
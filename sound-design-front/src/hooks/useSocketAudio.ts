@@ -52,7 +52,8 @@ export const useSocketAudio = () => {
 
     const sound = soundInstances.current[frame.action];
     if (sound) {
-      if (frame.value === true || frame.value === null) {
+      // Coalesced counters (e.g. 03-grow-mycelium) carry a number of events
+      if (frame.value === true || frame.value === null || typeof frame.value === 'number') {
           console.log(`Lancement du son: ${frame.action}`);
           sound.play();
       }